@@ -0,0 +1,92 @@
+"""
+Бенчмарк пиковой памяти (RSS) при отправке крупных вложений:
+сборка письма в памяти против потоковой отправки.
+
+Каждый режим запускается в отдельном процессе, пиковый RSS берется
+из getrusage. SMTP stand-in работает в родительском процессе.
+
+Запуск: python -m benchmarks.bench_attachment_memory [--size-mb 20] [--concurrency 4]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.fake_smtp import FakeSMTPServer
+
+MODES = {
+    # Порог выше любого вложения - прежний путь через msg.as_string()
+    'buffered': 1024 * 1024,
+    'streamed': 0,
+}
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса в МБ (ru_maxrss: КБ в Linux, байты в macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def child(port: int, attachment: str, mode: str, concurrency: int, messages: int):
+    from src.core.message import Message, MessageType
+    from src.providers.email_sender import EmailSender
+
+    baseline = peak_rss_mb()
+    sender = EmailSender(
+        smtp_server='127.0.0.1', port=port, username='bench@example.com', password='secret',
+        use_tls=False, use_ssl=False, pool_size=concurrency, max_retries=1,
+        attachment_cache_mb=0, stream_threshold_mb=MODES[mode]
+    )
+    message = Message(
+        message_type=MessageType.EMAIL, recipient='user@example.com',
+        subject='Report', content='See attachment', attachments=[attachment]
+    )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: sender.send(message), range(messages)))
+    elapsed = time.perf_counter() - start
+    sender.close()
+
+    print(
+        f"{mode:<10} ok={sum(r.success for r in results)}/{messages}  "
+        f"peak RSS={peak_rss_mb():>7.1f} MB (+{peak_rss_mb() - baseline:.1f} MB after imports)  "
+        f"{elapsed:.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size-mb', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--messages', type=int, default=8)
+    parser.add_argument('--child', nargs=3, metavar=('PORT', 'ATTACHMENT', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        port, attachment, mode = args.child
+        child(int(port), attachment, mode, args.concurrency, args.messages)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp, FakeSMTPServer() as server:
+        attachment = Path(tmp) / 'attachment.bin'
+        attachment.write_bytes(os.urandom(args.size_mb * 1024 * 1024))
+        print(f"Вложение {args.size_mb} МБ, параллельных отправок: {args.concurrency}")
+        for mode in MODES:
+            subprocess.run([
+                sys.executable, '-m', 'benchmarks.bench_attachment_memory',
+                '--concurrency', str(args.concurrency), '--messages', str(args.messages),
+                '--child', str(server.port), str(attachment), mode
+            ], check=True, cwd=Path(__file__).parent.parent)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Бенчмарк журнала доставки (SQLite, WAL): стоимость record() в пути отправки,
+скорость фоновой записи и время типовых запросов на большом журнале.
+
+Запуск: python -m benchmarks.bench_delivery_log [--rows 1000000] [--recipients 100000]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.delivery_log import DeliveryLog, STATUS_FAILED
+from src.core.message import DeliveryResult, Message, MessageType
+
+PROVIDERS = [msg_type.value for msg_type in MessageType]
+
+
+def timed(call, repeat: int = 20) -> float:
+    """Медиана времени вызова, мс"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--recipients', type=int, default=100000)
+    parser.add_argument('--hours', type=float, default=72, help='Период, на который распределены записи')
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = DeliveryLog(str(Path(tmp) / 'deliveries.db'), max_queue=options.rows + 1).start()
+        now = time.time()
+        rng = random.Random(1)
+        messages = [
+            Message(MessageType.SMS, f'+7999{i:07d}', 'Текст')
+            for i in range(options.recipients)
+        ]
+        results = [
+            DeliveryResult(success=True, message_id='id', attempts=1, delivery_time=0.05),
+            DeliveryResult(success=False, error='Ошибка провайдера', error_type='NetworkError', attempts=3),
+        ]
+
+        start = time.perf_counter()
+        for i in range(options.rows):
+            result = results[rng.random() < 0.05]
+            # Записи поступают в порядке времени, как при реальной отправке
+            result.timestamp = now - options.hours * 3600 * (1 - i / options.rows)
+            log.record(PROVIDERS[i % len(PROVIDERS)], messages[i % len(messages)], result)
+        enqueued = time.perf_counter() - start
+        log.flush(timeout=None)
+        written = time.perf_counter() - start
+
+        print(f"record():        {enqueued / options.rows * 1e6:.2f} мкс на запись")
+        print(f"фоновая запись:  {options.rows / written:,.0f} записей/с ({log.written:,} записей, потеряно {log.dropped})")
+
+        hour_ago = now - 3600
+        queries = {
+            'история получателя': lambda: log.query(recipient=messages[rng.randrange(len(messages))].recipient, limit=50),
+            'неудачные SMS за час': lambda: log.count(provider='sms', status=STATUS_FAILED, since=hour_ago),
+            'все неудачные за час': lambda: log.query(status=STATUS_FAILED, since=hour_ago, limit=100),
+            'итоги за час': lambda: log.summary(since=hour_ago),
+        }
+        for name, query in queries.items():
+            print(f"{name:<22} {timed(query):>8.2f} мс")
+        log.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Бенчмарк холодного импорта по данным python -X importtime.
+
+Каждый модуль импортируется в новом процессе интерпретатора; фиксируется
+суммарное время импорта (медиана по запускам), самые тяжелые зависимости
+и тяжелые пакеты (брокер, HTTP-клиенты), которые не должны загружаться
+при синхронной отправке. Результаты пишутся в JSON; сравнение с прошлым
+прогоном (--baseline) показывает регрессии.
+
+Запуск: python -m benchmarks.bench_import [--runs 7] [--baseline old.json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+ROOT = Path(__file__).parent.parent
+
+# Точки входа: синхронный API, пакет src и модули брокера
+TARGETS = ('main', 'src', 'src.tasks')
+
+# Пакеты, которые импорт main не должен загружать
+HEAVY_MODULES = ('celery', 'kombu', 'redis', 'aiohttp', 'requests', 'urllib3', 'jinja2', 'asyncio', 'http.server')
+
+
+class ImportRecord(NamedTuple):
+    """Строка вывода -X importtime, мкс"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        records.append(ImportRecord(name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def measure(target: str) -> Dict[str, Any]:
+    """Один холодный импорт модуля: суммарное время и загруженные тяжелые пакеты"""
+    code = (
+        f"import sys, {target}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=True, cwd=ROOT
+    )
+    records = parse_importtime(completed.stderr)
+    top = [record for record in records if record.module == target and record.depth == 0]
+    return {
+        'total_us': top[-1].cumulative_us if top else None,
+        'records': records,
+        'heavy': [name for name in completed.stdout.strip().split(',') if name],
+    }
+
+
+def run_target(target: str, runs: int, top: int) -> Dict[str, Any]:
+    samples = [measure(target) for _ in range(runs)]
+    totals = [sample['total_us'] for sample in samples if sample['total_us'] is not None]
+    last = samples[-1]
+    heaviest = sorted(last['records'], key=lambda record: record.self_us, reverse=True)[:top]
+    return {
+        'median_ms': statistics.median(totals) / 1000 if totals else None,
+        'min_ms': min(totals) / 1000 if totals else None,
+        'heavy_modules': last['heavy'],
+        'heaviest': [{'module': record.module, 'self_ms': record.self_us / 1000} for record in heaviest],
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Регрессии: рост медианы времени импорта больше tolerance или новые тяжелые пакеты"""
+    regressions = []
+    for target, result in current['targets'].items():
+        previous = baseline.get('targets', {}).get(target)
+        if not previous:
+            continue
+        if previous.get('median_ms') and result['median_ms'] > previous['median_ms'] * (1 + tolerance):
+            regressions.append(f"{target}: {previous['median_ms']:.1f} -> {result['median_ms']:.1f} ms")
+        added = sorted(set(result['heavy_modules']) - set(previous.get('heavy_modules', [])))
+        if added:
+            regressions.append(f"{target}: загружаются {', '.join(added)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--top', type=int, default=5, help='Число самых тяжелых модулей в отчете')
+    parser.add_argument('--targets', nargs='+', default=list(TARGETS))
+    parser.add_argument('--output', help='Файл для JSON с результатами; не задан - вывод в stdout')
+    parser.add_argument('--baseline', help='Файл результатов прошлого прогона для сравнения')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    options = parser.parse_args()
+
+    results = {'python': sys.version.split()[0], 'runs': options.runs, 'targets': {}}
+    for target in options.targets:
+        result = run_target(target, options.runs, options.top)
+        results['targets'][target] = result
+        heaviest = ', '.join(f"{item['module']} {item['self_ms']:.1f}" for item in result['heaviest'])
+        print(f"{target:<12} median={result['median_ms']:>7.1f} ms  heavy=[{', '.join(result['heavy_modules'])}]")
+        print(f"{'':<12} top: {heaviest}")
+
+    report = json.dumps(results, indent=2, ensure_ascii=False)
+    if options.output:
+        output = Path(options.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(report, encoding='utf-8')
+        print(f"Результаты записаны в {output}")
+    else:
+        print(report)
+
+    if options.baseline:
+        baseline = json.loads(Path(options.baseline).read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, options.tolerance)
+        for line in regressions:
+            print(f"РЕГРЕССИЯ {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
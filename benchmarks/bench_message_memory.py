@@ -0,0 +1,90 @@
+"""
+Бенчмарк памяти на сообщение при массовой рассылке: прежний dataclass
+с __dict__ против слотового Message с общими строками.
+
+Сообщения восстанавливаются из JSON-нагрузки, как в воркере Celery:
+без общих строк каждое сообщение хранит свою копию темы и текста.
+
+Запуск: python -m benchmarks.bench_message_memory [--count 1000000]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.message import Message, MessagePriority, MessageType
+
+SUBJECT = "Весенняя распродажа: скидки до 50%"
+CONTENT = "Здравствуйте! Только до конца недели скидки до 50% на весь каталог. " * 3
+
+
+@dataclass
+class LegacyMessage:
+    """Message до перехода на __slots__"""
+    message_type: MessageType
+    recipient: str
+    content: str
+    subject: Optional[str] = None
+    attachments: Optional[List[str]] = None
+    priority: MessagePriority = MessagePriority.NORMAL
+    metadata: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LegacyMessage':
+        data = dict(data)
+        data['message_type'] = MessageType(data['message_type'])
+        data['priority'] = MessagePriority[data['priority']]
+        return cls(**data)
+
+
+def legacy_payloads(count: int):
+    for i in range(count):
+        yield json.dumps({
+            'message_type': 'email', 'recipient': f'user{i}@example.com',
+            'content': CONTENT, 'subject': SUBJECT, 'priority': 'NORMAL',
+        })
+
+
+def compact_payloads(count: int):
+    for i in range(count):
+        yield json.dumps(('email', f'user{i}@example.com', CONTENT, SUBJECT))
+
+
+def measure(name: str, build, payloads) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    messages = [build(json.loads(payload)) for payload in payloads]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_message = current / len(messages)
+    print(f"{name:<28} {per_message:>8.0f} B/msg  total={current / 2 ** 20:>8.1f} MB  decode={elapsed:.2f}s")
+    del messages
+    return per_message
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    legacy_size = len(next(legacy_payloads(1)).encode('utf-8'))
+    compact_size = len(next(compact_payloads(1)).encode('utf-8'))
+    print(f"Сообщений: {args.count}; JSON-нагрузка: dict {legacy_size} B, tuple {compact_size} B")
+
+    before = measure('dataclass + __dict__', LegacyMessage.from_dict, legacy_payloads(args.count))
+    after = measure('slotted + shared strings', Message.from_tuple, compact_payloads(args.count))
+    print(f"Экономия: {before - after:.0f} B/msg ({before / after:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Бенчмарк пакетной отправки разных писем через одну SMTP-сессию
+(EmailSender.send_batch) с ESMTP PIPELINING и без него.
+
+Запуск: python -m benchmarks.bench_smtp_batch [--messages 500] [--rtt 0.002]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.message import Message, MessageType
+from src.providers.email_sender import EmailSender
+from benchmarks.fake_smtp import FakeSMTPServer
+
+BATCH_SIZES = (1, 10, 50, 100, 500)
+
+
+def run(server: FakeSMTPServer, messages: int, batch_size: int) -> dict:
+    sender = EmailSender(
+        smtp_server='127.0.0.1',
+        port=server.port,
+        username='bench@example.com',
+        password='secret',
+        use_tls=False,
+        use_ssl=False,
+        pool_size=1,
+        max_messages_per_session=1000,
+        max_retries=1
+    )
+    batch = [
+        Message(
+            message_type=MessageType.EMAIL,
+            recipient=f'user{i}@example.com',
+            subject=f'Счет №{i}',
+            content=f'Персональное письмо {i}\n' + 'x' * 512
+        )
+        for i in range(messages)
+    ]
+
+    start = time.perf_counter()
+    ok = 0
+    for offset in range(0, messages, batch_size):
+        ok += sum(1 for r in sender.send_batch(batch[offset:offset + batch_size]) if r.success)
+    elapsed = time.perf_counter() - start
+    sender.close()
+    return {'ok': ok, 'elapsed': elapsed, 'rate': messages / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--rtt', type=float, default=0.002,
+                        help='Сетевая задержка одного обмена с сервером, секунд')
+    args = parser.parse_args()
+
+    for pipelining in (False, True):
+        with FakeSMTPServer(round_trip_latency=args.rtt, pipelining=pipelining) as server:
+            mode = 'pipelining' if pipelining else 'lock-step'
+            for batch_size in BATCH_SIZES:
+                stats = run(server, args.messages, batch_size)
+                print(
+                    f"{mode:<10} batch={batch_size:<4} {stats['ok']:>5}/{args.messages} ok  "
+                    f"{stats['rate']:>8.1f} msg/s"
+                )
+
+
+if __name__ == '__main__':
+    main()
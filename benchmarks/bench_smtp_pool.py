@@ -0,0 +1,80 @@
+"""
+Бенчмарк пула SMTP-сессий EmailSender против локального SMTP stand-in.
+
+Запуск: python -m benchmarks.bench_smtp_pool [--messages 200] [--threads 4]
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.message import Message, MessageType
+from src.providers.email_sender import EmailSender
+from benchmarks.fake_smtp import FakeSMTPServer
+
+
+def run(server: FakeSMTPServer, messages: int, threads: int, max_messages_per_session: int) -> dict:
+    sender = EmailSender(
+        smtp_server='127.0.0.1',
+        port=server.port,
+        username='bench@example.com',
+        password='secret',
+        use_tls=False,
+        use_ssl=False,
+        pool_size=threads,
+        max_messages_per_session=max_messages_per_session,
+        max_retries=1
+    )
+    message = Message(
+        message_type=MessageType.EMAIL,
+        recipient='user@example.com',
+        subject='Benchmark',
+        content='x' * 512
+    )
+    logins_before = server.logins
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda _: sender.send(message), range(messages)))
+    elapsed = time.perf_counter() - start
+    sender.close()
+
+    return {
+        'ok': sum(1 for r in results if r.success),
+        'elapsed': elapsed,
+        'rate': messages / elapsed,
+        'logins': server.logins - logins_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--handshake-latency', type=float, default=0.01,
+                        help='Имитация TCP+TLS+AUTH, секунд на соединение')
+    args = parser.parse_args()
+
+    with FakeSMTPServer(connect_latency=args.handshake_latency / 2,
+                        auth_latency=args.handshake_latency / 2) as server:
+        modes = [
+            ('per-message connection', 1),
+            ('pooled sessions', 100),
+        ]
+        baseline = None
+        for name, per_session in modes:
+            stats = run(server, args.messages, args.threads, per_session)
+            baseline = baseline or stats['rate']
+            print(
+                f"{name:<24} {stats['ok']:>5}/{args.messages} ok  "
+                f"{stats['rate']:>8.1f} msg/s  logins={stats['logins']:<4} "
+                f"x{stats['rate'] / baseline:.1f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
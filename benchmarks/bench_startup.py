@@ -0,0 +1,108 @@
+"""
+Бенчмарк холодного запуска MessageDeliverySystem против локальных stand-in
+(SMTP, Telegram Bot API, Yandex Cloud Notification Service).
+
+Сравниваются последовательная проверка провайдеров (прежнее поведение)
+и режимы startup.mode с пустым и заполненным кешем проверок.
+Измеряется время создания системы и время до первой отправки.
+
+Запуск: python -m benchmarks.bench_startup [--latency 0.2]
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from main import MessageDeliverySystem
+from src.core.message import Message, MessageType
+from src.providers.factory import SenderFactory
+from benchmarks.fake_http import FakeProviderServer
+from benchmarks.fake_smtp import FakeSMTPServer
+
+
+def write_config(directory: Path, smtp: FakeSMTPServer, http: FakeProviderServer, cache_file: Path) -> str:
+    config = {
+        'logging': {'level': 'ERROR'},
+        'startup': {'validation_ttl': 3600, 'cache_file': str(cache_file)},
+        'retry': {'max_retries': 1},
+        'email': {
+            'smtp_server': '127.0.0.1', 'port': smtp.port,
+            'username': 'bench@example.com', 'password': 'secret',
+            'use_tls': False, 'use_ssl': False,
+        },
+        'sms': {
+            'api_key': 'key', 'folder_id': 'folder',
+            'base_url': http.url,
+        },
+        'telegram': {
+            'bot_token': 'token',
+            'base_url': f"{http.url}/bot",
+        },
+    }
+    path = directory / 'bench.yaml'
+    path.write_text(yaml.safe_dump(config), encoding='utf-8')
+    return str(path)
+
+
+def serial_startup(config_path: str) -> float:
+    """Прежнее поведение: создание и проверка провайдеров друг за другом"""
+    system = MessageDeliverySystem(config_path, startup_mode='offline')
+    start = time.perf_counter()
+    for msg_type in MessageType:
+        sender = SenderFactory.create_sender(msg_type, system._get_provider_config(msg_type))
+        sender.validate_credentials()
+        sender.close()
+    elapsed = time.perf_counter() - start
+    system.close()
+    return elapsed
+
+
+def measure(config_path: str, mode: str) -> tuple:
+    """Время создания системы и время до первой доставленной телеграммы"""
+    message = Message(message_type=MessageType.TELEGRAM, recipient='42', content='hello')
+    start = time.perf_counter()
+    system = MessageDeliverySystem(config_path, startup_mode=mode)
+    ready = time.perf_counter() - start
+    delivered = system.send_message(message)
+    first_send = time.perf_counter() - start
+    system.close()
+    return ready, first_send, delivered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.2,
+                        help='Имитация сетевой задержки проверки, секунд на провайдера')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            FakeSMTPServer(connect_latency=args.latency / 2, auth_latency=args.latency / 2) as smtp, \
+            FakeProviderServer(latency=args.latency) as http:
+        directory = Path(tmp)
+        cache_file = directory / 'credentials.json'
+        config_path = write_config(directory, smtp, http, cache_file)
+
+        print(f"{'serial (baseline)':<24} ready={serial_startup(config_path):>7.3f}s")
+        for mode in MessageDeliverySystem.STARTUP_MODES:
+            for cache in ('cold', 'warm'):
+                if cache == 'cold' and cache_file.exists():
+                    cache_file.unlink()
+                elif cache == 'warm' and mode == 'offline':
+                    continue
+                ready, first_send, delivered = measure(config_path, mode)
+                print(
+                    f"{mode + ' (' + cache + ' cache)':<24} ready={ready:>7.3f}s  "
+                    f"first send={first_send:>7.3f}s  delivered={delivered}"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Локальные HTTP stand-in для Telegram Bot API и Yandex Cloud Notification Service
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов к обоим API"""
+
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело ответа уходят одной записью (как у реальных серверов);
+    # handle_one_request сбрасывает буфер после каждого запроса
+    wbufsize = 64 * 1024
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: dict, headers: Optional[dict] = None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        server = self.server
+        self._read_body()
+        if server.latency:
+            time.sleep(server.latency)
+        request_number = server.count_request()
+        path = self.path.rstrip('/')
+        is_telegram = path.startswith('/bot')
+
+        if path.endswith('/getMe'):
+            self._reply(200, {'ok': True, 'result': {'id': 1, 'is_bot': True, 'username': 'fake_bot'}})
+            return
+        if path.endswith('/senders'):
+            self._reply(200, {'senders': []})
+            return
+
+        if server.rate_limit_every and request_number % server.rate_limit_every == 0:
+            server.count('rate_limited')
+            if is_telegram:
+                self._reply(429, {
+                    'ok': False, 'error_code': 429,
+                    'description': f'Too Many Requests: retry after {server.retry_after}',
+                    'parameters': {'retry_after': server.retry_after}
+                })
+            else:
+                self._reply(429, {'message': 'Too many requests'}, {'Retry-After': str(server.retry_after)})
+            return
+
+        if server.error_rate and random.random() < server.error_rate:
+            server.count('errors')
+            if is_telegram:
+                self._reply(500, {'ok': False, 'error_code': 500, 'description': 'Internal Server Error'})
+            else:
+                self._reply(500, {'message': 'Internal error'})
+            return
+
+        server.count('delivered')
+        if path.endswith('/sendMessage'):
+            self._reply(200, {'ok': True, 'result': {'message_id': request_number}})
+        elif path.endswith('/messages'):
+            self._reply(200, {'id': f'msg-{request_number}'})
+        else:
+            self._reply(404, {'ok': False, 'error_code': 404, 'description': 'Not Found'})
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    """
+    Многопоточный HTTP stand-in с настраиваемыми задержкой, долей ошибок
+    и инъекцией ответов 429 (каждый rate_limit_every-й запрос на отправку).
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: float = 1
+    ):
+        super().__init__((host, port), FakeProviderHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.stats = {'delivered': 0, 'errors': 0, 'rate_limited': 0}
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def count_request(self) -> int:
+        with self._stats_lock:
+            self.requests += 1
+            return self.requests
+
+    def count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def start(self) -> 'FakeProviderServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,233 @@
+"""
+Локальный SMTP-сервер для бенчмарков и тестов
+"""
+
+import socketserver
+import threading
+import time
+from typing import List, Optional, Set
+
+
+class LineReader:
+    """Построчное чтение сокета с признаком уже полученных, но не прочитанных данных"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = bytearray()
+        self.position = 0
+
+    @property
+    def pending(self) -> bool:
+        return self.position < len(self.buffer)
+
+    def readline(self) -> bytes:
+        while True:
+            end = self.buffer.find(b"\n", self.position)
+            if end >= 0:
+                line = bytes(self.buffer[self.position:end + 1])
+                self.position = end + 1
+                return line
+            del self.buffer[:self.position]
+            self.position = 0
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                line = bytes(self.buffer)
+                self.buffer.clear()
+                return line
+            self.buffer += chunk
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Обработчик одной SMTP-сессии"""
+
+    def setup(self):
+        super().setup()
+        self.reader = LineReader(self.connection)
+        self.replies: List[bytes] = []
+        self.mail_from = None
+        self.rcpt_to: List[str] = []
+
+    def finish(self):
+        self.flush()
+        super().finish()
+
+    def readline(self) -> bytes:
+        # Ответы накапливаются, пока от клиента есть неразобранные команды
+        # (как у MTA с PIPELINING), и уходят одной записью перед ожиданием
+        if not self.reader.pending:
+            self.flush()
+            if self.server.round_trip_latency:
+                time.sleep(self.server.round_trip_latency)
+        return self.reader.readline()
+
+    def reply(self, line: str):
+        self.replies.append(line.encode('ascii') + b"\r\n")
+
+    def flush(self):
+        if self.replies:
+            self.wfile.write(b''.join(self.replies))
+            self.replies = []
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        if server.connect_latency:
+            time.sleep(server.connect_latency)
+        self.reply("220 fake-smtp ESMTP ready")
+
+        while True:
+            raw = self.readline()
+            if not raw:
+                return
+            line = raw.decode('utf-8', 'replace').rstrip("\r\n")
+            command, _, argument = line.partition(' ')
+            command = command.upper()
+            server.commands += 1
+            if server.command_latency:
+                time.sleep(server.command_latency)
+
+            if command == 'EHLO':
+                extensions = ["AUTH PLAIN LOGIN", "8BITMIME"]
+                if server.pipelining:
+                    extensions.append("PIPELINING")
+                lines = ["fake-smtp"] + extensions
+                for extension in lines[:-1]:
+                    self.reply(f"250-{extension}")
+                self.reply(f"250 {lines[-1]}")
+            elif command == 'HELO':
+                self.reply("250 fake-smtp")
+            elif command == 'AUTH':
+                self._handle_auth(argument)
+            elif command == 'MAIL':
+                self.mail_from = argument
+                self.rcpt_to = []
+                self.reply("250 OK")
+            elif command == 'RCPT':
+                address = argument.split(':', 1)[-1].strip('<> ')
+                if address in server.refused_recipients:
+                    self.reply("550 No such user")
+                else:
+                    self.rcpt_to.append(address)
+                    self.reply("250 OK")
+            elif command == 'DATA':
+                if not self.rcpt_to:
+                    self.reply("503 No valid recipients")
+                    continue
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                size, data = self._read_data()
+                server.record_message(self.rcpt_to, size, data)
+                self.reply("250 OK queued")
+                if server.drop_after and server.messages % server.drop_after == 0:
+                    return
+            elif command == 'RSET':
+                self.mail_from = None
+                self.rcpt_to = []
+                self.reply("250 OK")
+            elif command == 'NOOP':
+                self.reply("250 OK")
+            elif command == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+    def _handle_auth(self, argument: str):
+        mechanism, _, initial = argument.partition(' ')
+        if self.server.auth_latency:
+            time.sleep(self.server.auth_latency)
+        if mechanism.upper() == 'PLAIN' and not initial:
+            self.reply("334 ")
+            self.readline()
+        elif mechanism.upper() == 'LOGIN':
+            self.reply("334 VXNlcm5hbWU6")
+            self.readline()
+            self.reply("334 UGFzc3dvcmQ6")
+            self.readline()
+        self.server.logins += 1
+        self.reply("235 Authentication successful")
+
+    def _read_data(self) -> tuple:
+        size = 0
+        lines = [] if self.server.keep_messages else None
+        raw = self.readline()
+        while True:
+            if not raw or raw == b".\r\n":
+                return size, b''.join(lines) if lines is not None else None
+            size += len(raw)
+            if lines is not None:
+                lines.append(raw[1:] if raw.startswith(b'.') else raw)
+            raw = self.reader.readline()
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Многопоточный SMTP stand-in без TLS.
+
+    Задержки имитируют стоимость установки TCP+TLS соединения и AUTH
+    у реального релея; round_trip_latency - сетевую задержку каждого
+    обмена, в котором клиент ждет ответа (ее сокращает PIPELINING).
+    drop_after закрывает соединение после каждого N-го письма для
+    проверки переподключения.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        connect_latency: float = 0.0,
+        auth_latency: float = 0.0,
+        command_latency: float = 0.0,
+        round_trip_latency: float = 0.0,
+        pipelining: bool = False,
+        refused_recipients: Optional[Set[str]] = None,
+        drop_after: int = 0,
+        keep_messages: bool = False
+    ):
+        super().__init__((host, port), FakeSMTPHandler)
+        self.connect_latency = connect_latency
+        self.auth_latency = auth_latency
+        self.command_latency = command_latency
+        self.round_trip_latency = round_trip_latency
+        self.pipelining = pipelining
+        self.refused_recipients = set(refused_recipients or ())
+        self.drop_after = drop_after
+        self.keep_messages = keep_messages
+        self.received: List[bytes] = []
+        self.connections = 0
+        self.logins = 0
+        self.commands = 0
+        self.messages = 0
+        self.recipients = 0
+        self.bytes_received = 0
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def record_message(self, recipients: List[str], size: int, data: Optional[bytes] = None):
+        with self._stats_lock:
+            if data is not None:
+                self.received.append(data)
+            self.messages += 1
+            self.recipients += len(recipients)
+            self.bytes_received += size
+
+    def start(self) -> 'FakeSMTPServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
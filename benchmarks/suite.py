@@ -0,0 +1,316 @@
+"""
+Набор бенчмарков системы доставки против локальных stand-in провайдеров
+(SMTP, Telegram Bot API, Yandex Cloud Notification Service).
+
+Сценарии: send_message по каждому каналу, send_with_fallback, broadcast
+и задачи Celery в eager-режиме. Для каждого сценария измеряются
+сообщения/сек и задержка p50/p99; результаты пишутся в JSON, сравнение
+с результатами прошлого релиза (--baseline) показывает регрессии.
+
+Запуск: python -m benchmarks.suite [--messages 200] [--latency 0.005]
+        [--error-rate 0.05] [--rate-limit-every 50] [--baseline old.json]
+"""
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from main import MessageDeliverySystem
+from src import __version__
+from src.core.message import Message, MessageType
+from src.core.metrics import DELIVERY_METRICS, REGISTRY
+from benchmarks.fake_http import FakeProviderServer
+from benchmarks.fake_smtp import FakeSMTPServer
+
+# Формат файла результатов; меняется при несовместимом изменении структуры
+RESULTS_FORMAT = 1
+
+SCENARIOS = (
+    'send_message.email', 'send_message.sms', 'send_message.telegram',
+    'send_with_fallback', 'broadcast', 'celery.send_notification', 'celery.send_batch',
+)
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p99/среднее/максимум по точным замерам, сек"""
+    if not samples:
+        return {'p50': None, 'p99': None, 'mean': None, 'max': None}
+    ordered = sorted(samples)
+
+    def rank(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+    return {'p50': rank(0.50), 'p99': rank(0.99), 'mean': sum(ordered) / len(ordered), 'max': ordered[-1]}
+
+
+def provider_latency() -> Dict[str, Optional[float]]:
+    """p50/p99 времени отправки провайдером по гистограмме метрик (оценка по корзинам)"""
+    merged = None
+    for counts in DELIVERY_METRICS.latency.collect().values():
+        if merged is None:
+            merged = list(counts)
+        else:
+            merged = [total + value for total, value in zip(merged, counts)]
+    if merged is None:
+        return {'p50': None, 'p99': None}
+    return {
+        'p50': DELIVERY_METRICS.latency._quantile(merged, 0.50),
+        'p99': DELIVERY_METRICS.latency._quantile(merged, 0.99),
+    }
+
+
+def write_config(directory: Path, smtp: FakeSMTPServer, http: FakeProviderServer, options) -> str:
+    config = {
+        'logging': {'level': 'ERROR', 'file': str(directory / 'bench.log')},
+        'startup': {'cache_file': str(directory / 'credentials.json')},
+        'retry': {'max_retries': options.max_retries, 'delay': 0.01, 'jitter': 'none'},
+        'templates': {'file': None},
+        'email': {
+            'smtp_server': '127.0.0.1', 'port': smtp.port,
+            'username': 'bench@example.com', 'password': 'secret',
+            'use_tls': False, 'use_ssl': False, 'pool_size': 4,
+        },
+        'sms': {'api_key': 'key', 'folder_id': 'folder', 'base_url': http.url},
+        'telegram': {'bot_token': 'token', 'base_url': f"{http.url}/bot"},
+        'broadcast': {'concurrent': True, 'email_group_size': 1, 'email_batch_size': 50},
+        'circuit_breaker': {'enabled': False},
+    }
+    path = directory / 'suite.yaml'
+    path.write_text(yaml.safe_dump(config), encoding='utf-8')
+    return str(path)
+
+
+def make_messages(count: int, message_type: MessageType) -> List[Message]:
+    recipients = {
+        MessageType.EMAIL: lambda i: f'user{i}@example.com',
+        MessageType.SMS: lambda i: f'+7999{i:07d}',
+        MessageType.TELEGRAM: lambda i: str(100000 + i),
+    }[message_type]
+    return [
+        Message(message_type, recipients(i), f'Сообщение {i}', subject='Бенчмарк')
+        for i in range(count)
+    ]
+
+
+def mixed_messages(count: int) -> List[Message]:
+    types = list(MessageType)
+    return [
+        make_messages(1, types[i % len(types)])[0]
+        for i in range(count)
+    ]
+
+
+def timed_calls(messages: List[Message], call: Callable[[Message], bool]) -> Dict[str, Any]:
+    """Последовательные вызовы с точным замером задержки каждого"""
+    samples = []
+    successful = 0
+    start = time.perf_counter()
+    for message in messages:
+        call_start = time.perf_counter()
+        successful += bool(call(message))
+        samples.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+    return {
+        'messages': len(messages),
+        'successful': successful,
+        'elapsed': elapsed,
+        'throughput': len(messages) / elapsed,
+        'latency': percentiles(samples),
+        'latency_source': 'call',
+    }
+
+
+def bulk_run(count: int, run: Callable[[], int]) -> Dict[str, Any]:
+    """Массовая отправка: пропускная способность и задержка провайдера по метрикам"""
+    start = time.perf_counter()
+    successful = run()
+    elapsed = time.perf_counter() - start
+    return {
+        'messages': count,
+        'successful': successful,
+        'elapsed': elapsed,
+        'throughput': count / elapsed,
+        'latency': provider_latency(),
+        'latency_source': 'metrics_histogram',
+    }
+
+
+def run_scenario(name: str, config_path: str, options) -> Dict[str, Any]:
+    REGISTRY.reset()
+    count = options.messages
+
+    if name.startswith('celery.'):
+        from src import tasks
+        eager = tasks.app.conf.task_always_eager
+        tasks.app.conf.task_always_eager = True
+        system = MessageDeliverySystem(config_path, validate_credentials=False, inline_retries=False)
+        tasks._system = system
+        try:
+            if name == 'celery.send_notification':
+                return timed_calls(
+                    make_messages(count, MessageType.SMS),
+                    lambda message: tasks.send_notification_task.apply(
+                        (message.to_dict(), ['sms', 'telegram'])
+                    ).successful()
+                )
+            payloads = [message.to_tuple() for message in mixed_messages(count)]
+
+            def send_batches() -> int:
+                successful = 0
+                for offset in range(0, count, options.batch_size):
+                    chunk = payloads[offset:offset + options.batch_size]
+                    summary = tasks.send_batch_task.apply((chunk, [])).get()
+                    successful += summary['successful']
+                return successful
+
+            return bulk_run(count, send_batches)
+        finally:
+            tasks.app.conf.task_always_eager = eager
+            tasks._system = None
+            system.close()
+
+    with MessageDeliverySystem(config_path, validate_credentials=False) as system:
+        if name.startswith('send_message.'):
+            message_type = MessageType(name.split('.', 1)[1])
+            return timed_calls(make_messages(count, message_type), system.send_message)
+        if name == 'send_with_fallback':
+            chain = [MessageType.TELEGRAM, MessageType.SMS]
+            return timed_calls(
+                make_messages(count, MessageType.TELEGRAM),
+                lambda message: system.send_with_fallback(message, chain)
+            )
+        if name == 'broadcast':
+            messages = mixed_messages(count)
+            return bulk_run(count, lambda: system.broadcast(messages, concurrent=True)['successful'])
+    raise ValueError(f"Неизвестный сценарий: {name}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(options) -> Dict[str, Any]:
+    """Запуск выбранных сценариев; возвращает документ результатов"""
+    logging.disable(logging.CRITICAL)
+    results = {
+        'format': RESULTS_FORMAT,
+        'version': __version__,
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'messages': options.messages,
+            'latency': options.latency,
+            'error_rate': options.error_rate,
+            'rate_limit_every': options.rate_limit_every,
+            'retry_after': options.retry_after,
+            'max_retries': options.max_retries,
+            'batch_size': options.batch_size,
+        },
+        'scenarios': {},
+    }
+    try:
+        with tempfile.TemporaryDirectory() as tmp, ExitStack() as stack:
+            smtp = stack.enter_context(FakeSMTPServer(round_trip_latency=options.latency, pipelining=True))
+            http = stack.enter_context(FakeProviderServer(
+                latency=options.latency,
+                error_rate=options.error_rate,
+                rate_limit_every=options.rate_limit_every,
+                retry_after=options.retry_after
+            ))
+            config_path = write_config(Path(tmp), smtp, http, options)
+            for name in options.scenarios:
+                results['scenarios'][name] = run_scenario(name, config_path, options)
+            results['stand_in'] = {'smtp_messages': smtp.messages, 'http': dict(http.stats)}
+    finally:
+        logging.disable(logging.NOTSET)
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Регрессии относительно baseline: падение пропускной способности или рост p99 больше tolerance"""
+    regressions = []
+    for name, result in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if result['throughput'] < previous['throughput'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['throughput']:.1f} -> {result['throughput']:.1f} msg/s"
+            )
+        p99, previous_p99 = result['latency'].get('p99'), previous['latency'].get('p99')
+        if p99 is not None and previous_p99 and p99 > previous_p99 * (1 + tolerance):
+            regressions.append(f"{name}: p99 {previous_p99 * 1000:.1f} -> {p99 * 1000:.1f} ms")
+    return regressions
+
+
+def format_row(name: str, result: Dict[str, Any]) -> str:
+    latency = result['latency']
+    p50 = f"{latency['p50'] * 1000:.1f}" if latency.get('p50') is not None else '-'
+    p99 = f"{latency['p99'] * 1000:.1f}" if latency.get('p99') is not None else '-'
+    return (
+        f"{name:<26} {result['successful']:>5}/{result['messages']:<5} "
+        f"{result['throughput']:>8.1f} msg/s  p50={p50:>7} ms  p99={p99:>7} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.005, help='Задержка ответа stand-in, сек')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов 500 HTTP stand-in')
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='Каждый N-й запрос получает 429')
+    parser.add_argument('--retry-after', type=float, default=0.05, help='Retry-After ответа 429, сек')
+    parser.add_argument('--max-retries', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=100, help='Сообщений в задаче send_batch_task')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--output', help='Файл для JSON с результатами; не задан - вывод в stdout')
+    parser.add_argument('--baseline', help='Файл результатов прошлого релиза для сравнения')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    options = parser.parse_args()
+
+    results = run_suite(options)
+    for name, result in results['scenarios'].items():
+        print(format_row(name, result))
+
+    report = json.dumps(results, indent=2, ensure_ascii=False)
+    if options.output:
+        output = Path(options.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(report, encoding='utf-8')
+        print(f"Результаты записаны в {output}")
+    else:
+        print(report)
+
+    if options.baseline:
+        baseline = json.loads(Path(options.baseline).read_text(encoding='utf-8'))
+        if baseline.get('parameters') != results['parameters']:
+            print("Параметры прогона отличаются от baseline, сравнение может быть некорректным")
+        regressions = compare(results, baseline, options.tolerance)
+        for line in regressions:
+            print(f"РЕГРЕССИЯ {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,7 @@
+import sys
 from celery import Celery
+from kombu import Queue
+from src.core.message import MessagePriority
 from src.utils.config import Config
 
 # Загрузка конфигурации
@@ -13,6 +16,17 @@ app = Celery(
     include=['src.tasks']
 )
 
+# Отдельная очередь для каждого приоритета сообщений: рассылки LOW
+# не задерживают срочные уведомления HIGH
+PRIORITY_QUEUES = {
+    priority.value: (celery_conf.get('queues') or {}).get(priority.value, f"notifications.{priority.value}")
+    for priority in MessagePriority
+}
+
+# Число процессов воркера, выделяемых очереди каждого приоритета
+WORKER_CONCURRENCY = {'high': 4, 'normal': 2, 'low': 1}
+WORKER_CONCURRENCY.update(celery_conf.get('worker_concurrency') or {})
+
 # Загрузка конфигурации из объекта
 app.conf.update(
     task_serializer='json',
@@ -20,7 +34,28 @@ app.conf.update(
     accept_content=['json'],
     timezone=celery_conf.get('timezone', 'Europe/Moscow'),
     enable_utc=True,
+    task_queues=[Queue(name) for name in PRIORITY_QUEUES.values()],
+    task_default_queue=PRIORITY_QUEUES[MessagePriority.NORMAL.value],
 )
 
+def queue_for(priority: MessagePriority) -> str:
+    """Имя очереди Celery для приоритета сообщения"""
+    return PRIORITY_QUEUES[(priority or MessagePriority.NORMAL).value]
+
+def priority_worker_argv(priority: str) -> list:
+    """Аргументы запуска воркера, обслуживающего очередь одного приоритета"""
+    return [
+        'worker',
+        '--queues', PRIORITY_QUEUES[priority],
+        '--concurrency', str(WORKER_CONCURRENCY[priority]),
+        '--hostname', f"{priority}@%h",
+        # Воркер не резервирует задачи впрок, чтобы они не ждали занятый процесс
+        '--prefetch-multiplier', '1',
+    ]
+
 if __name__ == '__main__':
-    app.start()
+    # python celery_app.py priority-worker high - воркер очереди HIGH
+    if len(sys.argv) == 3 and sys.argv[1] == 'priority-worker':
+        app.worker_main(priority_worker_argv(sys.argv[2]))
+    else:
+        app.start()
@@ -3,113 +3,819 @@
 Основной модуль системы доставки сообщений
 """
 
+import dataclasses
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Iterable, List, NamedTuple, Optional
 
 # Добавляем src в путь для импорта
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
 from src import Message, MessageType, MessagePriority, SenderFactory, Config, setup_logger
-from src.tasks import send_message_async as send_async
+from src.core.circuit_breaker import CircuitBreaker
+from src.core.delivery_log import DeliveryLog
+from src.core.exceptions import ConfigurationError
+from src.core.concurrency import ProviderConcurrencyLimiter, ProviderWorkerPool
+from src.core.latency import QueueLatencyTracker
+from src.core.metrics import DELIVERY_METRICS, REGISTRY, MetricsExporter
+from src.core.tracing import set_tracer, span, tracer_from_config
+from src.core.streaming import BroadcastStream
+from src.core.message import DeliveryResult
+from src.core.retry import RetryPolicy
+from src.core.templates import TemplateRegistry
+from src.utils.credentials_cache import CredentialsCache
+from src.utils.logger import ROOT_LOGGER
+
+if TYPE_CHECKING:  # pragma: no cover - только для анализаторов типов
+    import asyncio
+
+
+class SendUnit(NamedTuple):
+    """Единица отправки рассылки: single - одно сообщение, group - одинаковые письма, batch - разные письма одной сессией"""
+    kind: str
+    indices: List[int]
 
 class MessageDeliverySystem:
     """Основная система доставки сообщений"""
     
-    def __init__(self, config_path: str = None):
+    # Минимальный интервал между перепроверками учетных данных провайдера, сек
+    REVALIDATION_INTERVAL = 60.0
+    
+    # Ошибки, не указывающие на неисправность провайдера (не размыкают выключатель)
+    NON_PROVIDER_ERRORS = frozenset({'RecipientError', 'ValidationError'})
+    
+    # Режимы запуска: eager - параллельная проверка всех провайдеров при создании;
+    # background - проверка в фоне, отправка ждет только своего провайдера;
+    # lazy - создание и проверка при первом использовании;
+    # offline - создание при первом использовании без сетевых проверок
+    STARTUP_MODES = ('eager', 'background', 'lazy', 'offline')
+    
+    # Секции, изменения которых при перечитывании конфигурации применяются только после перезапуска
+    RESTART_SECTIONS = frozenset({
+        'startup', 'metrics', 'tracing', 'circuit_breaker', 'celery', 'priority', 'reload', 'delivery_log'
+    })
+    
+    def __init__(
+        self,
+        config_path: str = None,
+        validate_credentials: bool = True,
+        inline_retries: bool = True,
+        startup_mode: Optional[str] = None
+    ):
         self.config = Config(config_path)
-        self.logger = setup_logger("MessageSystem", log_file=self.config.get("logging.file", "logs/message_system.log"))
+        self.validate_credentials = validate_credentials
+        if not validate_credentials:
+            startup_mode = 'offline'
+        self.startup_mode = startup_mode or self.config.get('startup.mode', 'eager')
+        if self.startup_mode not in self.STARTUP_MODES:
+            raise ValueError(f"Неизвестный режим запуска: {self.startup_mode}")
+        # При inline_retries=False отправщики делают одну попытку,
+        # а повтор планирует вызывающая сторона (задачи Celery)
+        self.inline_retries = inline_retries
+        self.retry_policy = RetryPolicy.from_config(self.config.get('retry', {})).with_inline(inline_retries)
+        self.logger = self._setup_logging()
+        
+        # Лимиты одновременных отправок по типам сообщений
+        self.concurrency = ProviderConcurrencyLimiter.from_config(self.config.get('broadcast', {}))
+        
+        # Задержка от постановки в очередь до начала отправки по приоритетам
+        self.queue_latency = QueueLatencyTracker.from_config(self.config.get('priority', {}))
+        
+        # Метрики доставки процесса и их публикация (HTTP /metrics и/или файл)
+        REGISTRY.enabled = self.config.get('metrics.enabled', True)
+        self.metrics = DELIVERY_METRICS
+        self.metrics_exporter = MetricsExporter.from_config(REGISTRY, self.config.get('metrics', {}))
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.start()
+        
+        # Трассировка стадий отправки (по умолчанию - без накладных расходов)
+        tracing_config = self.config.get('tracing', {})
+        self.tracer = None
+        if tracing_config and tracing_config.get('exporter', 'none') != 'none':
+            self.tracer = tracer_from_config(tracing_config)
+            set_tracer(self.tracer)
+        
+        # Журнал итогов доставки (SQLite, запись в фоновом потоке)
+        self.delivery_log = DeliveryLog.from_config(self.config.get('delivery_log', {}))
+        if self.delivery_log is not None:
+            self.delivery_log.start()
+        
+        # Шаблоны сообщений, скомпилированные при загрузке
+        self.templates = TemplateRegistry.from_config(self.config.get('templates', {}))
+        
+        # Автоматические выключатели провайдеров
+        breaker_config = self.config.get('circuit_breaker', {})
+        self.breakers = {
+            msg_type: CircuitBreaker.from_config(breaker_config, name=msg_type.value)
+            for msg_type in MessageType
+        }
         
         # Инициализация отправщиков
         self.senders = {}
+        self._unavailable = set()
+        self._pending_validations = {}
+        self._init_locks = {msg_type: threading.Lock() for msg_type in MessageType}
+        self.credentials_cache = CredentialsCache(
+            ttl=self.config.get('startup.validation_ttl', 3600),
+            path=self.config.get('startup.cache_file')
+        )
+        self._revalidated_at = {}
+        self._revalidation_lock = threading.Lock()
         self._initialize_senders()
+        
+        # Асинхронные отправщики создаются при первом вызове внутри event loop
+        self.async_senders = None
+        self._async_slots = {}
+        self._stale_async = set()
+        self._retired_async = []
+        
+        # Перечитывание конфигурации без перезапуска: пересоздаются только затронутые отправщики
+        self.config.subscribe(self._apply_config)
+        self.config_watcher = None
+        if config_path and self.config.get('reload.enabled', False):
+            self.config_watcher = self.config.watch(float(self.config.get('reload.interval', 5)))
+    
+    def _setup_logging(self):
+        return setup_logger(
+            ROOT_LOGGER,
+            log_level=self.config.get("logging.level", "INFO"),
+            log_file=self.config.get("logging.file", "logs/message_system.log"),
+            json_format=self.config.get("logging.format", "text") == "json",
+            async_logging=self.config.get("logging.async", False)
+        )
+    
+    def _get_provider_config(self, msg_type: MessageType) -> dict:
+        """
+        Конфигурация провайдера с политикой повторов.
+        Секция retry провайдера дополняет общую секцию retry.
+        """
+        provider_config = self.config.get_provider_config(msg_type.value)
+        if not provider_config:
+            return {}
+        
+        provider_config = dict(provider_config)
+        provider_retry = provider_config.pop('retry', None)
+        if provider_retry:
+            retry_config = dict(self.config.get('retry', {}))
+            retry_config.update(provider_retry)
+            policy = RetryPolicy.from_config(retry_config).with_inline(self.inline_retries)
+        else:
+            policy = self.retry_policy
+        provider_config['retry_policy'] = policy
+        return provider_config
     
     def _initialize_senders(self):
-        """Инициализация всех отправщиков"""
+        """Создание и проверка отправщиков согласно режиму запуска"""
+        if self.startup_mode in ('lazy', 'offline'):
+            return
+        
+        # Проверки провайдеров выполняются параллельно, а не друг за другом
+        executor = ThreadPoolExecutor(max_workers=len(MessageType), thread_name_prefix="validate")
         for msg_type in MessageType:
-            provider_config = self.config.get_provider_config(msg_type.value)
-            if provider_config:
-                try:
-                    # Добавляем общие настройки retry
-                    retry_config = self.config.get('retry', {})
-                    provider_config.update(retry_config)
-                    
-                    sender = SenderFactory.create_sender(msg_type, provider_config)
-                    if sender.validate_credentials():
-                        self.senders[msg_type] = sender
-                        self.logger.info(f"Отправщик {msg_type.value} инициализирован")
-                    else:
-                        self.logger.warning(f"Не удалось валидировать отправщик {msg_type.value}")
-                except Exception as e:
-                    self.logger.error(f"Ошибка инициализации отправщика {msg_type.value}: {e}")
+            self._pending_validations[msg_type] = executor.submit(self._build_sender, msg_type, True)
+        executor.shutdown(wait=False)
+        
+        if self.startup_mode == 'eager':
+            for msg_type in MessageType:
+                self._get_sender(msg_type)
     
-    def send_message(self, message: Message) -> bool:
-        """Отправка сообщения через одного провайдера."""
-        if message.message_type not in self.senders:
-            self.logger.error(f"Отправщик для типа {message.message_type} не настроен")
-            return False
+    def _build_sender(self, msg_type: MessageType, validate: bool):
+        """Создание отправщика и проверка учетных данных (с учетом кеша проверок)"""
+        provider_config = self._get_provider_config(msg_type)
+        if not provider_config:
+            return None, False
         
         try:
-            message.validate()
-            sender = self.senders[message.message_type]
-            result = sender.send(message)
+            sender = SenderFactory.create_sender(msg_type, provider_config)
+            if not validate:
+                return sender, True
             
-            if result.success:
-                self.logger.info(f"Сообщение отправлено успешно. ID: {result.message_id}")
+            cache_key = self.credentials_cache.make_key(msg_type.value, self.config.get_provider_config(msg_type.value))
+            if self.credentials_cache.is_valid(cache_key):
+                return sender, True
+            if sender.validate_credentials():
+                self.credentials_cache.mark_valid(cache_key)
+                return sender, True
+            return sender, False
+        except Exception as e:
+            self.logger.error("Ошибка инициализации отправщика %s: %s", msg_type.value, e)
+            return None, False
+    
+    def _apply_config(self, previous, snapshot) -> None:
+        """Применение нового снимка конфигурации"""
+        changed = snapshot.changed_sections(previous)
+        if 'logging' in changed:
+            self.logger = self._setup_logging()
+        
+        if 'retry' in changed:
+            # Общая политика повторов входит в конфигурацию всех отправщиков
+            self.retry_policy = RetryPolicy.from_config(self.config.get('retry', {})).with_inline(self.inline_retries)
+            affected = list(MessageType)
+        else:
+            affected = [msg_type for msg_type in MessageType if msg_type.value in changed]
+        for msg_type in affected:
+            self._rebuild_sender(msg_type)
+        if self.async_senders is not None:
+            self._stale_async.update(affected)
+        
+        if 'templates' in changed:
+            self.templates = TemplateRegistry.from_config(self.config.get('templates', {}))
+        
+        restart = changed & self.RESTART_SECTIONS
+        if previous.get('broadcast.concurrency') != snapshot.get('broadcast.concurrency') or (
+                previous.get('broadcast.default_concurrency') != snapshot.get('broadcast.default_concurrency')):
+            restart |= {'broadcast.concurrency'}
+        if restart:
+            self.logger.warning("Изменения секций %s применятся после перезапуска", ', '.join(sorted(restart)))
+        self.logger.info(
+            "Конфигурация обновлена (версия %d), пересозданы отправщики: %s",
+            snapshot.version, ', '.join(msg_type.value for msg_type in affected) or 'нет'
+        )
+    
+    def _rebuild_sender(self, msg_type: MessageType) -> None:
+        """
+        Замена отправщика после изменения его конфигурации. Новый отправщик
+        создается до замены; у старого закрываются только простаивающие
+        соединения, начатые отправки завершаются на своих сессиях.
+        Если новый отправщик не прошел проверку (в том числе из-за временной
+        ошибки сети), работающий старый остается на месте.
+        """
+        future = self._pending_validations.pop(msg_type, None)
+        if future is not None and not future.cancel():
+            stale, _ = future.result()
+            if stale is not None:
+                stale.close()
+        
+        # Ленивый отправщик, который еще не создавался, будет создан с новой конфигурацией
+        build = msg_type in self.senders or future is not None or self.startup_mode in ('eager', 'background')
+        sender, valid = (None, False)
+        if build:
+            sender, valid = self._build_sender(msg_type, validate=self.startup_mode != 'offline')
+        
+        kept = None
+        with self._init_locks[msg_type]:
+            old = self.senders.get(msg_type)
+            if sender is not None and valid:
+                self.senders[msg_type] = sender
+                self._unavailable.discard(msg_type)
+            elif sender is not None and old is not None:
+                kept, old = old, None
+            else:
+                self.senders.pop(msg_type, None)
+                if build:
+                    self._unavailable.add(msg_type)
+                else:
+                    self._unavailable.discard(msg_type)
+        
+        if sender is not None and not valid:
+            if kept is not None:
+                self.logger.error("Не удалось валидировать отправщик %s с новой конфигурацией, используется прежний", msg_type.value)
             else:
-                self.logger.error(f"Ошибка отправки: {result.error}")
+                self.logger.warning("Не удалось валидировать отправщик %s", msg_type.value)
+            sender.close()
+        if old is not None:
+            old.close()
+    
+    def _get_sender(self, msg_type: Optional[MessageType]):
+        """Отправщик для типа сообщения; создается при первом обращении"""
+        sender = self.senders.get(msg_type)
+        if sender is not None or msg_type in self._unavailable:
+            return sender
+        
+        init_lock = self._init_locks.get(msg_type)
+        if init_lock is None:
+            return None
+        
+        with init_lock:
+            if msg_type in self.senders or msg_type in self._unavailable:
+                return self.senders.get(msg_type)
             
-            return result.success
+            future = self._pending_validations.pop(msg_type, None)
+            if future is not None:
+                sender, valid = future.result()
+            else:
+                sender, valid = self._build_sender(msg_type, validate=self.startup_mode != 'offline')
             
-        except Exception as e:
-            self.logger.error(f"Ошибка при отправке сообщения: {e}")
-            return False
+            if sender is not None and valid:
+                self.senders[msg_type] = sender
+                self.logger.info("Отправщик %s инициализирован", msg_type.value)
+            else:
+                if sender is not None:
+                    self.logger.warning("Не удалось валидировать отправщик %s", msg_type.value)
+                    sender.close()
+                self._unavailable.add(msg_type)
+            return self.senders.get(msg_type)
+    
+    def send_message(self, message: Message) -> bool:
+        """Отправка сообщения через одного провайдера."""
+        with span('message.send', {'message.type': message.message_type.value if message.message_type else ''}):
+            sender = self._get_sender(message.message_type)
+            if sender is None:
+                self.logger.error("Отправщик для типа %s не настроен", message.message_type)
+                return False
+            
+            try:
+                with span('message.validate'):
+                    message.validate()
+                # Шаблон рендерится до выключателя: ошибка рендеринга не занимает пробный запрос
+                rendered = self._render(message.message_type, message)
+                if not self._circuit_allows(message.message_type):
+                    self.logger.error("Провайдер %s временно недоступен (выключатель разомкнут)", message.message_type.value)
+                    return False
+                
+                result = self._deliver(message.message_type, sender, rendered)
+                
+                if result.success:
+                    self.logger.info("Сообщение отправлено успешно. ID: %s", result.message_id)
+                else:
+                    self.logger.error("Ошибка отправки: %s", result.error)
+                
+                return result.success
+                
+            except Exception as e:
+                self.logger.error("Ошибка при отправке сообщения: %s", e)
+                return False
 
     def send_with_fallback(self, message: Message, chain: List[MessageType]) -> bool:
         """
         Отправка сообщения с использованием цепочки резервных провайдеров.
         Пробует отправить сообщение по каждому каналу в цепочке до первого успеха.
         """
-        if not chain:
-            self.logger.error("Цепочка отправки пуста.")
-            return False
+        with span('message.send', {'delivery.chain': ','.join(provider.value for provider in chain or ())}):
+            if not chain:
+                self.logger.error("Цепочка отправки пуста.")
+                return False
 
-        last_error = ""
-        for provider_type in chain:
-            if provider_type not in self.senders:
-                self.logger.warning(f"Провайдер {provider_type.value} не настроен, пропускаем.")
-                continue
+            last_error = ""
+            for provider_type in chain:
+                sender = self._get_sender(provider_type)
+                if sender is None:
+                    self.logger.warning("Провайдер %s не настроен, пропускаем.", provider_type.value)
+                    self.metrics.fallback_steps.inc(provider_type.value, 'skipped')
+                    continue
+
+                self.logger.info("Попытка отправки через %s...", provider_type.value)
+                message.message_type = provider_type # Меняем тип сообщения для текущего провайдера
+                
+                try:
+                    with span('message.validate'):
+                        message.validate()
+                    rendered = self._render(provider_type, message)
+                    if not self._circuit_allows(provider_type):
+                        last_error = "выключатель разомкнут"
+                        self.logger.warning("Провайдер %s временно недоступен, пропускаем.", provider_type.value)
+                        self.metrics.fallback_steps.inc(provider_type.value, 'skipped')
+                        continue
+                    
+                    result = self._deliver(provider_type, sender, rendered)
 
-            self.logger.info(f"Попытка отправки через {provider_type.value}...")
-            message.message_type = provider_type # Меняем тип сообщения для текущего провайдера
+                    if result.success:
+                        self.logger.info("Сообщение успешно отправлено через %s. ID: %s", provider_type.value, result.message_id)
+                        self.metrics.fallback_steps.inc(provider_type.value, 'success')
+                        return True
+                    else:
+                        last_error = result.error
+                        self.logger.warning("Не удалось отправить через %s: %s", provider_type.value, last_error)
+                        self.metrics.fallback_steps.inc(provider_type.value, 'failure')
+
+                except Exception as e:
+                    last_error = str(e)
+                    self.metrics.fallback_steps.inc(provider_type.value, 'failure')
+                    self.logger.error("Критическая ошибка при отправке через %s: %s", provider_type.value, last_error)
             
-            try:
-                message.validate()
-                sender = self.senders[provider_type]
+            self.logger.error("Не удалось отправить сообщение по всей цепочке. Последняя ошибка: %s", last_error)
+            return False
+
+    def _render(self, msg_type: MessageType, message: Message) -> Message:
+        """Копия сообщения с содержимым, отрендеренным из шаблона для канала"""
+        if not message.template_id:
+            return message
+        
+        with span('template.render', {'template.id': message.template_id, 'message.type': msg_type.value}):
+            rendered = self.templates.render(message.template_id, msg_type, message.template_vars)
+        return dataclasses.replace(
+            message,
+            message_type=msg_type,
+            content=rendered.body,
+            subject=rendered.subject or message.subject,
+            content_format=rendered.content_format
+        )
+
+    def _deliver(self, msg_type: MessageType, sender, message: Message) -> DeliveryResult:
+        """
+        Вызов отправщика в пределах лимита конкурентности с учетом итога в выключателе.
+        Сообщение уже отрендерено: после _circuit_allows любой исход доходит до _record_outcome.
+        """
+        try:
+            with self.concurrency.slot(msg_type, message.priority):
                 result = sender.send(message)
+        except Exception as e:
+            self._record_outcome(msg_type, DeliveryResult(success=False))
+            self._log_delivery(msg_type, message, DeliveryResult(success=False, error=str(e), error_type=type(e).__name__))
+            raise
+        
+        self._record_outcome(msg_type, result)
+        self._log_delivery(msg_type, message, result)
+        self._check_authentication(msg_type, sender, result)
+        return result
 
-                if result.success:
-                    self.logger.info(f"Сообщение успешно отправлено через {provider_type.value}. ID: {result.message_id}")
-                    return True
-                else:
-                    last_error = result.error
-                    self.logger.warning(f"Не удалось отправить через {provider_type.value}: {last_error}")
+    def _circuit_allows(self, msg_type: MessageType) -> bool:
+        """Пропускает ли выключатель провайдера запрос"""
+        breaker = self.breakers.get(msg_type)
+        return breaker is None or breaker.allow_request()
 
-            except Exception as e:
-                last_error = str(e)
-                self.logger.error(f"Критическая ошибка при отправке через {provider_type.value}: {last_error}")
+    def _record_outcome(self, msg_type: MessageType, result: DeliveryResult) -> None:
+        """Учет результата отправки в выключателе провайдера"""
+        breaker = self.breakers.get(msg_type)
+        if breaker is None:
+            return
+        if result.success or result.error_type in self.NON_PROVIDER_ERRORS:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    def _log_delivery(self, msg_type: MessageType, message: Message, result: DeliveryResult) -> None:
+        """Запись итога отправки в журнал доставки (если включен)"""
+        if self.delivery_log is not None:
+            self.delivery_log.record(msg_type.value, message, result)
+    
+    def _require_delivery_log(self) -> DeliveryLog:
+        if self.delivery_log is None:
+            raise ConfigurationError("Журнал доставки отключен (delivery_log.enabled)")
+        return self.delivery_log
+    
+    def get_delivery_history(self, recipient: str, limit: int = 100, since: Optional[float] = None) -> List[dict]:
+        """История доставок получателю от новых к старым: [{'ts', 'provider', 'status', 'error', ...}]"""
+        return self._require_delivery_log().query(recipient=recipient, since=since, limit=limit)
+    
+    def query_deliveries(
+        self,
+        recipient: Optional[str] = None,
+        provider: Optional[MessageType] = None,
+        status: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 100
+    ) -> List[dict]:
+        """Записи журнала доставки по фильтрам; status - 'delivered' или 'failed', время - unix timestamp"""
+        return self._require_delivery_log().query(
+            recipient=recipient, provider=provider.value if provider else None,
+            status=status, since=since, until=until, limit=limit
+        )
+    
+    def count_deliveries(
+        self,
+        provider: Optional[MessageType] = None,
+        status: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        recipient: Optional[str] = None
+    ) -> int:
+        """Число доставок по фильтрам, например неудачных SMS за последний час"""
+        return self._require_delivery_log().count(
+            recipient=recipient, provider=provider.value if provider else None,
+            status=status, since=since, until=until
+        )
+    
+    def get_delivery_summary(self, since: Optional[float] = None, until: Optional[float] = None) -> dict:
+        """Итоги журнала по провайдерам: {провайдер: {'delivered': n, 'failed': m}}"""
+        return self._require_delivery_log().summary(since=since, until=until)
+    
+    def get_circuit_states(self) -> dict:
+        """Состояние выключателей провайдеров: {тип: {'state', 'failure_rate', ...}}"""
+        return {
+            msg_type.value: breaker.snapshot()
+            for msg_type, breaker in self.breakers.items()
+            if breaker is not None
+        }
+
+    def get_metrics(self) -> dict:
+        """Сводка метрик доставки по провайдерам: {провайдер: {'success', 'failure', 'p50', 'p95', 'p99'}}"""
+        return self.metrics.summary()
+
+    def render_metrics(self) -> str:
+        """Метрики процесса в текстовом формате Prometheus"""
+        return REGISTRY.render()
+
+    def get_queue_latency(self) -> dict:
+        """Задержка в очереди по приоритетам: {приоритет: {'count', 'p50', 'p95', 'p99', ...}}"""
+        return self.queue_latency.snapshot()
+
+    def reset_circuit(self, msg_type: MessageType) -> None:
+        """Принудительное замыкание выключателя провайдера"""
+        breaker = self.breakers.get(msg_type)
+        if breaker is not None:
+            breaker.reset()
+
+    def _check_authentication(self, msg_type: MessageType, sender, result) -> None:
+        """
+        Перепроверка учетных данных после ошибки аутентификации.
+        Отправщик с невалидными учетными данными отключается.
+        """
+        if not self._needs_revalidation(msg_type, result):
+            return
+        if sender.validate_credentials():
+            return
+        
+        self._credentials_rejected(msg_type)
+        if self.senders.get(msg_type) is sender:
+            self._unavailable.add(msg_type)
+            self.senders.pop(msg_type, None)
+            sender.close()
+
+    async def _acheck_authentication(self, msg_type: MessageType, sender, result) -> None:
+        """Перепроверка учетных данных асинхронного отправщика после ошибки аутентификации"""
+        if not self._needs_revalidation(msg_type, result):
+            return
+        if await sender.validate_credentials():
+            return
         
-        self.logger.error(f"Не удалось отправить сообщение по всей цепочке. Последняя ошибка: {last_error}")
-        return False
+        self._credentials_rejected(msg_type)
+        if self.async_senders and self.async_senders.get(msg_type) is sender:
+            self.async_senders.pop(msg_type, None)
+            # Закрывается в aclose: на сессии могут выполняться другие отправки
+            self._retired_async.append(sender)
+
+    def _needs_revalidation(self, msg_type: MessageType, result) -> bool:
+        """Нужна ли перепроверка учетных данных (не чаще REVALIDATION_INTERVAL)"""
+        if result.error_type != 'AuthenticationError':
+            return False
+        
+        with self._revalidation_lock:
+            last_check = self._revalidated_at.get(msg_type, 0.0)
+            if time.monotonic() - last_check < self.REVALIDATION_INTERVAL:
+                return False
+            self._revalidated_at[msg_type] = time.monotonic()
+        
+        self.logger.warning("Ошибка аутентификации %s, перепроверка учетных данных", msg_type.value)
+        return True
+
+    def _credentials_rejected(self, msg_type: MessageType) -> None:
+        """Сброс кешированной проверки недействительных учетных данных"""
+        self.logger.error("Учетные данные %s недействительны, отправщик отключен", msg_type.value)
+        cache_key = self.credentials_cache.make_key(msg_type.value, self.config.get_provider_config(msg_type.value))
+        self.credentials_cache.invalidate(cache_key)
 
     def send_message_async(self, message: Message, delivery_chain: List[MessageType]):
         """Асинхронная отправка сообщения с использованием Celery."""
-        self.logger.info(f"Добавление задачи на асинхронную отправку для {message.recipient}")
+        # Celery, клиент брокера и celery_app загружаются только при асинхронной отправке
+        from src.tasks import send_message_async as send_async
+        
+        self.logger.info("Добавление задачи на асинхронную отправку для %s", message.recipient)
         send_async(message, delivery_chain)
 
-    def broadcast(self, messages: list, use_fallback: bool = False, chain: List[MessageType] = None) -> dict:
-        """Массовая отправка сообщений"""
+    def send_batch_async(self, messages, delivery_chain: List[MessageType], chunk_size: Optional[int] = None) -> list:
+        """Массовая асинхронная отправка пачками через Celery."""
+        from src.tasks import send_batch_async
+        
+        async_results = send_batch_async(messages, delivery_chain, chunk_size)
+        self.logger.info("Добавлено пачек на асинхронную отправку: %s", len(async_results))
+        return async_results
+
+    def broadcast(
+        self,
+        messages: list,
+        use_fallback: bool = False,
+        chain: List[MessageType] = None,
+        concurrent: Optional[bool] = None,
+        record_latency: bool = True
+    ) -> dict:
+        """
+        Массовая отправка сообщений.
+        При concurrent=True сообщения разных типов отправляются параллельно
+        с ограничением числа одновременных отправок на каждый тип
+        (секция broadcast.concurrency конфигурации). Одинаковые письма
+        объединяются в SMTP-транзакции до broadcast.email_group_size
+        получателей, остальные письма отправляются пакетами до
+        broadcast.email_batch_size через одну SMTP-сессию.
+        Порядок details совпадает с порядком messages.
+        record_latency=False отключает учет задержки очереди, если его
+        уже выполнил вызывающий код (например, задача Celery).
+        """
+        if concurrent is None:
+            concurrent = self.config.get('broadcast.concurrent', False)
+        
+        # Сообщения отправляются в порядке приоритета, итоги - в исходном порядке
+        units = self._plan_units(messages, self._priority_order(messages), use_fallback)
+        enqueued_at = time.monotonic() if record_latency else None
+        if concurrent:
+            outcomes = self._broadcast_concurrent(messages, units, use_fallback, chain, enqueued_at)
+        else:
+            outcomes = [False] * len(messages)
+            for unit in units:
+                for index, outcome in zip(unit.indices, self._broadcast_unit(messages, unit, use_fallback, chain, enqueued_at)):
+                    outcomes[index] = outcome
+        
+        return self._summarize(messages, outcomes)
+
+    def broadcast_stream(
+        self,
+        messages: Iterable[Message],
+        use_fallback: bool = False,
+        chain: List[MessageType] = None,
+        window: Optional[int] = None,
+        results_path: Optional[str] = None
+    ) -> BroadcastStream:
+        """
+        Потоковая массовая отправка по итератору или генератору сообщений.
+        В работе одновременно не больше window сообщений (broadcast.stream_window),
+        итоги выдаются по мере завершения, построчные итоги пишутся в results_path.
+        Приоритет учитывается при распределении слотов провайдеров.
+        """
+        window = window or self.config.get('broadcast.stream_window', 1000)
+        
+        def lane(message: Message) -> Optional[MessageType]:
+            return chain[0] if use_fallback and chain else message.message_type
+        
+        def send(message: Message, enqueued_at: float) -> bool:
+            return self._broadcast_one(message, use_fallback, chain, enqueued_at)
+        
+        return BroadcastStream(
+            messages,
+            send,
+            ProviderWorkerPool(self.concurrency, thread_name_prefix="stream"),
+            lane,
+            window=window,
+            results_path=results_path
+        )
+
+    @staticmethod
+    def _priority_order(messages: list) -> List[int]:
+        """Индексы сообщений: сначала HIGH, затем NORMAL и LOW, внутри приоритета - исходный порядок"""
+        return sorted(range(len(messages)), key=lambda index: messages[index].priority.rank)
+
+    def _plan_units(self, messages: list, order: List[int], use_fallback: bool) -> List[SendUnit]:
+        """
+        Разбиение рассылки на единицы отправки.
+        Письма с одинаковыми темой, текстом, вложениями и приоритетом
+        объединяются в группы, оставшиеся одиночные письма одного приоритета -
+        в пакеты для одной SMTP-сессии; остальные сообщения отправляются по одному.
+        """
+        if use_fallback:
+            return [SendUnit('single', [index]) for index in order]
+        group_size = self.config.get('broadcast.email_group_size', 1)
+        batch_size = self.config.get('broadcast.email_batch_size', 1)
+        
+        units = []
+        groups = {}
+        for index in order:
+            message = messages[index]
+            if group_size <= 1 or message.message_type is not MessageType.EMAIL or message.template_id:
+                units.append(SendUnit('single', [index]))
+                continue
+            
+            key = (
+                message.priority, message.subject, message.content,
+                tuple(message.attachments or ()), message.content_format
+            )
+            unit = groups.get(key)
+            if unit is None or len(unit.indices) >= group_size:
+                unit = groups[key] = SendUnit('group', [index])
+                units.append(unit)
+            else:
+                unit.indices.append(index)
+        
+        units = [SendUnit('single', unit.indices) if len(unit.indices) == 1 else unit for unit in units]
+        if batch_size <= 1:
+            return units
+        
+        # Одиночные письма собираются в пакеты в порядке приоритета
+        planned = []
+        batches = {}
+        for unit in units:
+            message = messages[unit.indices[0]]
+            if unit.kind != 'single' or message.message_type is not MessageType.EMAIL:
+                planned.append(unit)
+                continue
+            batch = batches.get(message.priority)
+            if batch is None or len(batch.indices) >= batch_size:
+                batch = batches[message.priority] = SendUnit('batch', [])
+                planned.append(batch)
+            batch.indices.extend(unit.indices)
+        return [SendUnit('single', unit.indices) if len(unit.indices) == 1 else unit for unit in planned]
+
+    def _broadcast_unit(
+        self,
+        messages: list,
+        unit: SendUnit,
+        use_fallback: bool,
+        chain: List[MessageType],
+        enqueued_at: Optional[float] = None
+    ) -> List[bool]:
+        """Отправка единицы рассылки: одного сообщения, группы одинаковых или пакета разных писем"""
+        if unit.kind == 'single':
+            return [self._broadcast_one(messages[unit.indices[0]], use_fallback, chain, enqueued_at)]
+        unit_messages = [messages[index] for index in unit.indices]
+        if unit.kind == 'group':
+            return self._send_email_group(unit_messages, enqueued_at)
+        return self._send_email_batch(unit_messages, enqueued_at)
+
+    def _send_email_group(self, messages: List[Message], enqueued_at: Optional[float] = None) -> List[bool]:
+        """Отправка одинаковых писем группе получателей одной SMTP-транзакцией"""
+        if enqueued_at is not None:
+            for message in messages:
+                self.queue_latency.record(message.priority, time.monotonic() - enqueued_at)
+        
+        sender = self._get_sender(MessageType.EMAIL)
+        if sender is None:
+            self.logger.error("Отправщик для типа %s не настроен", MessageType.EMAIL)
+            return [False] * len(messages)
+        if not hasattr(sender, 'send_group'):
+            return [self.send_message(message) for message in messages]
+        
+        outcomes = [False] * len(messages)
+        valid = []
+        for position, message in enumerate(messages):
+            try:
+                message.validate()
+                valid.append(position)
+            except Exception as e:
+                self.logger.error("Ошибка при отправке сообщения: %s", e)
+        if not valid:
+            return outcomes
+        
+        if not self._circuit_allows(MessageType.EMAIL):
+            self.logger.error("Провайдер %s временно недоступен (выключатель разомкнут)", MessageType.EMAIL.value)
+            return outcomes
+        
+        try:
+            with self.concurrency.slot(MessageType.EMAIL, messages[valid[0]].priority):
+                results = sender.send_group([messages[position] for position in valid])
+        except Exception as e:
+            self._record_outcome(MessageType.EMAIL, DeliveryResult(success=False))
+            self.logger.error("Ошибка при групповой отправке писем: %s", e)
+            return outcomes
+        
+        # Одна транзакция - один итог для выключателя
+        transaction = next((result for result in results if result.success), results[0])
+        self._record_outcome(MessageType.EMAIL, transaction)
+        self._check_authentication(MessageType.EMAIL, sender, transaction)
+        
+        for position, result in zip(valid, results):
+            outcomes[position] = result.success
+            self._log_delivery(MessageType.EMAIL, messages[position], result)
+            if not result.success:
+                self.logger.warning("Письмо для %s не доставлено: %s", messages[position].recipient, result.error)
+        self.logger.info("Группа из %s писем отправлена одной транзакцией, доставлено: %s", len(valid), sum(outcomes))
+        return outcomes
+
+    def _send_email_batch(self, messages: List[Message], enqueued_at: Optional[float] = None) -> List[bool]:
+        """Отправка разных писем пакетом через одну SMTP-сессию"""
+        if enqueued_at is not None:
+            for message in messages:
+                self.queue_latency.record(message.priority, time.monotonic() - enqueued_at)
+        
+        sender = self._get_sender(MessageType.EMAIL)
+        if sender is None:
+            self.logger.error("Отправщик для типа %s не настроен", MessageType.EMAIL)
+            return [False] * len(messages)
+        if not hasattr(sender, 'send_batch'):
+            return [self.send_message(message) for message in messages]
+        
+        outcomes = [False] * len(messages)
+        valid = []
+        rendered = []
+        for position, message in enumerate(messages):
+            try:
+                message.validate()
+                rendered.append(self._render(MessageType.EMAIL, message))
+                valid.append(position)
+            except Exception as e:
+                self.logger.error("Ошибка при отправке сообщения: %s", e)
+        if not valid:
+            return outcomes
+        
+        if not self._circuit_allows(MessageType.EMAIL):
+            self.logger.error("Провайдер %s временно недоступен (выключатель разомкнут)", MessageType.EMAIL.value)
+            return outcomes
+        
+        try:
+            with self.concurrency.slot(MessageType.EMAIL, rendered[0].priority):
+                results = sender.send_batch(rendered)
+        except Exception as e:
+            self._record_outcome(MessageType.EMAIL, DeliveryResult(success=False))
+            self.logger.error("Ошибка при пакетной отправке писем: %s", e)
+            return outcomes
+        
+        for position, message, result in zip(valid, rendered, results):
+            self._record_outcome(MessageType.EMAIL, result)
+            self._log_delivery(MessageType.EMAIL, message, result)
+            outcomes[position] = result.success
+            if not result.success:
+                self.logger.warning("Письмо для %s не доставлено: %s", messages[position].recipient, result.error)
+        self._check_authentication(
+            MessageType.EMAIL, sender,
+            next((result for result in results if not result.success), results[0])
+        )
+        self.logger.info("Пакет из %s писем отправлен одной SMTP-сессией, доставлено: %s", len(valid), sum(outcomes))
+        return outcomes
+
+    def _summarize(self, messages: list, outcomes) -> dict:
+        """Сводка результатов рассылки в порядке исходных сообщений"""
         results = {
             'total': len(messages),
             'successful': 0,
@@ -117,25 +823,285 @@ class MessageDeliverySystem:
             'details': []
         }
         
-        for message in messages:
-            if use_fallback and chain:
-                success = self.send_with_fallback(message, chain)
-            else:
-                success = self.send_message(message)
-
+        for message, success in zip(messages, outcomes):
             if success:
                 results['successful'] += 1
             else:
                 results['failed'] += 1
             
             results['details'].append({
-                'type': message.message_type.value,
+                'type': message.message_type.value if message.message_type else None,
                 'recipient': message.recipient,
                 'success': success
             })
         
         return results
 
+    def _broadcast_one(
+        self,
+        message: Message,
+        use_fallback: bool,
+        chain: List[MessageType],
+        enqueued_at: Optional[float] = None
+    ) -> bool:
+        """Отправка одного сообщения рассылки"""
+        if enqueued_at is not None:
+            self.queue_latency.record(message.priority, time.monotonic() - enqueued_at)
+        if use_fallback and chain:
+            return self.send_with_fallback(message, chain)
+        return self.send_message(message)
+
+    def _broadcast_concurrent(
+        self,
+        messages: list,
+        units: List[SendUnit],
+        use_fallback: bool,
+        chain: List[MessageType],
+        enqueued_at: Optional[float]
+    ) -> List[bool]:
+        """
+        Параллельная отправка с отдельной полосой потоков на каждый тип сообщений.
+        Единицы отправки ставятся в полосы в порядке приоритета.
+        """
+        outcomes = [False] * len(messages)
+        with ProviderWorkerPool(self.concurrency) as pool:
+            futures = []
+            for unit in units:
+                lane = chain[0] if use_fallback and chain else messages[unit.indices[0]].message_type
+                futures.append(pool.submit(lane, self._broadcast_unit, messages, unit, use_fallback, chain, enqueued_at))
+            
+            for unit, future in zip(units, futures):
+                try:
+                    for index, outcome in zip(unit.indices, future.result()):
+                        outcomes[index] = outcome
+                except Exception as e:
+                    self.logger.error("Ошибка при параллельной отправке: %s", e)
+        return outcomes
+
+    def _initialize_async_senders(self):
+        """Инициализация асинхронных отправщиков (без сетевой валидации)"""
+        self.async_senders = {}
+        for msg_type in MessageType:
+            provider_config = self._get_provider_config(msg_type)
+            if provider_config:
+                try:
+                    self.async_senders[msg_type] = SenderFactory.create_async_sender(msg_type, provider_config)
+                    self.logger.info("Асинхронный отправщик %s инициализирован", msg_type.value)
+                except Exception as e:
+                    self.logger.error("Ошибка инициализации асинхронного отправщика %s: %s", msg_type.value, e)
+
+    def _get_async_sender(self, msg_type: MessageType):
+        """Асинхронный отправщик для типа сообщения или None"""
+        if self.async_senders is None:
+            self._initialize_async_senders()
+        if self._stale_async and msg_type in self._stale_async:
+            self._replace_async_sender(msg_type)
+        return self.async_senders.get(msg_type)
+    
+    def _replace_async_sender(self, msg_type: MessageType):
+        """Пересоздание асинхронного отправщика после изменения конфигурации"""
+        self._stale_async.discard(msg_type)
+        old = self.async_senders.pop(msg_type, None)
+        if old is not None:
+            # Закрывается в aclose: на старой сессии могут выполняться отправки
+            self._retired_async.append(old)
+        provider_config = self._get_provider_config(msg_type)
+        if provider_config:
+            try:
+                self.async_senders[msg_type] = SenderFactory.create_async_sender(msg_type, provider_config)
+            except Exception as e:
+                self.logger.error("Ошибка инициализации асинхронного отправщика %s: %s", msg_type.value, e)
+
+    def _async_slot(self, msg_type: MessageType) -> 'asyncio.Semaphore':
+        """Семафор лимита одновременных асинхронных отправок для типа"""
+        semaphore = self._async_slots.get(msg_type)
+        if semaphore is None:
+            import asyncio
+            semaphore = asyncio.Semaphore(self.concurrency.limit(msg_type))
+            self._async_slots[msg_type] = semaphore
+        return semaphore
+
+    async def _adeliver(self, msg_type: MessageType, sender, message: Message) -> DeliveryResult:
+        """Асинхронный вызов отправщика (сообщение уже отрендерено) с учетом итога в выключателе"""
+        try:
+            async with self._async_slot(msg_type):
+                result = await sender.send(message)
+        except Exception as e:
+            self._record_outcome(msg_type, DeliveryResult(success=False))
+            self._log_delivery(msg_type, message, DeliveryResult(success=False, error=str(e), error_type=type(e).__name__))
+            raise
+        
+        self._record_outcome(msg_type, result)
+        self._log_delivery(msg_type, message, result)
+        await self._acheck_authentication(msg_type, sender, result)
+        return result
+
+    async def asend_message(self, message: Message) -> bool:
+        """Асинхронная (asyncio) отправка сообщения через одного провайдера."""
+        with span('message.send', {'message.type': message.message_type.value if message.message_type else ''}):
+            sender = self._get_async_sender(message.message_type)
+            if sender is None:
+                self.logger.error("Отправщик для типа %s не настроен", message.message_type)
+                return False
+            
+            try:
+                with span('message.validate'):
+                    message.validate()
+                rendered = self._render(message.message_type, message)
+                if not self._circuit_allows(message.message_type):
+                    self.logger.error("Провайдер %s временно недоступен (выключатель разомкнут)", message.message_type.value)
+                    return False
+                
+                result = await self._adeliver(message.message_type, sender, rendered)
+                
+                if result.success:
+                    self.logger.info("Сообщение отправлено успешно. ID: %s", result.message_id)
+                else:
+                    self.logger.error("Ошибка отправки: %s", result.error)
+                
+                return result.success
+                
+            except Exception as e:
+                self.logger.error("Ошибка при отправке сообщения: %s", e)
+                return False
+
+    async def asend_with_fallback(self, message: Message, chain: List[MessageType]) -> bool:
+        """Асинхронная (asyncio) отправка с цепочкой резервных провайдеров."""
+        with span('message.send', {'delivery.chain': ','.join(provider.value for provider in chain or ())}):
+            if not chain:
+                self.logger.error("Цепочка отправки пуста.")
+                return False
+
+            last_error = ""
+            for provider_type in chain:
+                sender = self._get_async_sender(provider_type)
+                if sender is None:
+                    self.logger.warning("Провайдер %s не настроен, пропускаем.", provider_type.value)
+                    self.metrics.fallback_steps.inc(provider_type.value, 'skipped')
+                    continue
+
+                self.logger.info("Попытка отправки через %s...", provider_type.value)
+                message.message_type = provider_type
+                
+                try:
+                    with span('message.validate'):
+                        message.validate()
+                    rendered = self._render(provider_type, message)
+                    if not self._circuit_allows(provider_type):
+                        last_error = "выключатель разомкнут"
+                        self.logger.warning("Провайдер %s временно недоступен, пропускаем.", provider_type.value)
+                        self.metrics.fallback_steps.inc(provider_type.value, 'skipped')
+                        continue
+                    
+                    result = await self._adeliver(provider_type, sender, rendered)
+
+                    if result.success:
+                        self.logger.info("Сообщение успешно отправлено через %s. ID: %s", provider_type.value, result.message_id)
+                        self.metrics.fallback_steps.inc(provider_type.value, 'success')
+                        return True
+                    else:
+                        last_error = result.error
+                        self.logger.warning("Не удалось отправить через %s: %s", provider_type.value, last_error)
+                        self.metrics.fallback_steps.inc(provider_type.value, 'failure')
+
+                except Exception as e:
+                    last_error = str(e)
+                    self.metrics.fallback_steps.inc(provider_type.value, 'failure')
+                    self.logger.error("Критическая ошибка при отправке через %s: %s", provider_type.value, last_error)
+            
+            self.logger.error("Не удалось отправить сообщение по всей цепочке. Последняя ошибка: %s", last_error)
+            return False
+
+    async def abroadcast(self, messages: list, use_fallback: bool = False, chain: List[MessageType] = None) -> dict:
+        """
+        Массовая отправка в одном event loop.
+        Все сообщения отправляются конкурентно в пределах лимитов
+        broadcast.concurrency для каждого типа.
+        """
+        # Задачи создаются в порядке приоритета и в нем же занимают слоты
+        order = self._priority_order(messages)
+        enqueued_at = time.monotonic()
+        coroutines = [
+            self._abroadcast_one(messages[index], use_fallback, chain, enqueued_at) for index in order
+        ]
+        
+        import asyncio
+        
+        outcomes = [False] * len(messages)
+        for index, outcome in zip(order, await asyncio.gather(*coroutines, return_exceptions=True)):
+            outcomes[index] = outcome is True
+        return self._summarize(messages, outcomes)
+
+    async def _abroadcast_one(
+        self,
+        message: Message,
+        use_fallback: bool,
+        chain: List[MessageType],
+        enqueued_at: Optional[float] = None
+    ) -> bool:
+        """Асинхронная отправка одного сообщения рассылки"""
+        if enqueued_at is not None:
+            self.queue_latency.record(message.priority, time.monotonic() - enqueued_at)
+        if use_fallback and chain:
+            return await self.asend_with_fallback(message, chain)
+        return await self.asend_message(message)
+
+    async def aclose(self):
+        """Освобождение соединений асинхронных отправщиков"""
+        for msg_type, sender in (self.async_senders or {}).items():
+            try:
+                await sender.close()
+            except Exception as e:
+                self.logger.warning("Ошибка закрытия отправщика %s: %s", msg_type.value, e)
+        for sender in self._retired_async:
+            try:
+                await sender.close()
+            except Exception as e:
+                self.logger.warning("Ошибка закрытия отправщика: %s", e)
+        self.async_senders = None
+        self._async_slots = {}
+        self._stale_async = set()
+        self._retired_async = []
+
+    def close(self):
+        """Освобождение соединений всех отправщиков"""
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+            self.config_watcher = None
+        self.config.unsubscribe(self._apply_config)
+        
+        for future in list(self._pending_validations.values()):
+            if not future.cancel():
+                sender, _ = future.result()
+                if sender is not None:
+                    sender.close()
+        self._pending_validations.clear()
+        
+        for msg_type, sender in list(self.senders.items()):
+            try:
+                sender.close()
+            except Exception as e:
+                self.logger.warning("Ошибка закрытия отправщика %s: %s", msg_type.value, e)
+        
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+            self.metrics_exporter = None
+        
+        if self.delivery_log is not None:
+            self.delivery_log.close()
+            self.delivery_log = None
+        
+        if self.tracer is not None:
+            self.tracer.close()
+            set_tracer(None)
+            self.tracer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 def main():
     """Пример использования системы"""
     # Укажите путь к вашему файлу конфигурации
@@ -194,6 +1160,8 @@ def main():
     print("✅ Задача на асинхронную отправку добавлена в очередь.")
     print("Для выполнения задачи запустите Celery worker: celery -A celery_app worker --loglevel=info")
 
+    system.close()
+
 
 if __name__ == "__main__":
     main()
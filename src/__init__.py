@@ -1,16 +1,46 @@
-from .core.message import Message, MessageType, MessagePriority
-from .core.base_sender import BaseMessageSender
-from .providers.factory import SenderFactory
-from .utils.config import Config
-from .utils.logger import setup_logger
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "1.0.0"
 __all__ = [
     'Message',
-    'MessageType', 
+    'MessageType',
     'MessagePriority',
     'BaseMessageSender',
+    'AsyncBaseMessageSender',
     'SenderFactory',
     'Config',
     'setup_logger'
 ]
+
+# Экспортируемые имена загружаются при первом обращении (PEP 562):
+# `import src` не тянет отправщики, HTTP-клиенты и конфигурацию
+_EXPORTS = {
+    'Message': '.core.message',
+    'MessageType': '.core.message',
+    'MessagePriority': '.core.message',
+    'BaseMessageSender': '.core.base_sender',
+    'AsyncBaseMessageSender': '.core.async_base_sender',
+    'SenderFactory': '.providers.factory',
+    'Config': '.utils.config',
+    'setup_logger': '.utils.logger',
+}
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+if TYPE_CHECKING:  # pragma: no cover - только для анализаторов типов
+    from .core.message import Message, MessageType, MessagePriority
+    from .core.base_sender import BaseMessageSender
+    from .core.async_base_sender import AsyncBaseMessageSender
+    from .providers.factory import SenderFactory
+    from .utils.config import Config
+    from .utils.logger import setup_logger
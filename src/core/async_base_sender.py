@@ -0,0 +1,58 @@
+from abc import ABC, abstractmethod
+from .message import Message, DeliveryResult
+from .sender_core import SenderCore
+from .tracing import span
+import asyncio
+import time
+
+class AsyncBaseMessageSender(SenderCore, ABC):
+    """Абстрактный базовый класс асинхронных отправщиков сообщений"""
+    
+    @abstractmethod
+    async def send(self, message: Message) -> DeliveryResult:
+        """Отправка сообщения"""
+        pass
+    
+    @abstractmethod
+    async def validate_credentials(self) -> bool:
+        """Проверка валидности учетных данных"""
+        pass
+
+    async def close(self):
+        """Освобождение ресурсов отправщика (соединений, пулов)"""
+        pass
+
+    async def _execute_with_retry(self, send_func, message: Message, record_metrics: bool = True) -> DeliveryResult:
+        """Выполнение отправки с повторными попытками без блокировки event loop"""
+        start_time = time.time()
+        send_span = self._send_span(message)
+        with send_span:
+            for attempt in range(self.retry_policy.max_retries):
+                delay = None
+                try:
+                    if self.rate_limiter:
+                        with span('sender.rate_limit'):
+                            await self.rate_limiter.aacquire(message.recipient)
+                    
+                    with span('sender.attempt', {'attempt': attempt + 1}):
+                        result = await send_func(message)
+                    if result.success:
+                        return self._delivered(send_span, message, result, attempt, start_time, record_metrics)
+                    if self._attempt_failed(result, attempt):
+                        break
+                    
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    result, delay, stop = self._attempt_error(e, message, attempt)
+                    if stop:
+                        break
+                
+                delay = self._next_delay(attempt, start_time, delay)
+                if delay is None:
+                    break
+                if delay > 0:
+                    with self._retry_sleep_span(delay):
+                        await asyncio.sleep(delay)
+            
+            return self._undelivered(send_span, message, result, attempt, start_time, record_metrics)
@@ -1,18 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
 from .message import Message, DeliveryResult
-from .exceptions import MessageDeliveryError
+from .sender_core import SenderCore
+from .tracing import span
 import time
-import logging
 
-class BaseMessageSender(ABC):
+class BaseMessageSender(SenderCore, ABC):
     """Абстрактный базовый класс для отправщиков сообщений"""
     
-    def __init__(self, max_retries: int = 3, retry_delay: float = 1.0):
-        self.max_retries = max_retries
-        self.retry_delay = retry_delay
-        self.logger = logging.getLogger(self.__class__.__name__)
-    
     @abstractmethod
     def send(self, message: Message) -> DeliveryResult:
         """Отправка сообщения"""
@@ -22,26 +16,43 @@ class BaseMessageSender(ABC):
     def validate_credentials(self) -> bool:
         """Проверка валидности учетных данных"""
         pass
-    
-    def _execute_with_retry(self, send_func, message: Message) -> DeliveryResult:
-        """Выполнение отправки с повторными попытками"""
+
+    def close(self):
+        """Освобождение ресурсов отправщика (соединений, пулов)"""
+        pass
+
+    def _execute_with_retry(self, send_func, message: Message, record_metrics: bool = True) -> DeliveryResult:
+        """
+        Выполнение отправки с повторными попытками.
+        record_metrics=False - итог учитывает вызывающий (например, по получателям группы).
+        """
         start_time = time.time()
-        
-        for attempt in range(self.max_retries):
-            try:
-                result = send_func(message)
-                if result.success:
-                    result.delivery_time = time.time() - start_time
-                    return result
-                
-                self.logger.warning(f"Попытка {attempt + 1} не удалась: {result.error}")
+        send_span = self._send_span(message)
+        with send_span:
+            for attempt in range(self.retry_policy.max_retries):
+                delay = None
+                try:
+                    if self.rate_limiter:
+                        with span('sender.rate_limit'):
+                            self.rate_limiter.acquire(message.recipient)
+                    
+                    with span('sender.attempt', {'attempt': attempt + 1}):
+                        result = send_func(message)
+                    if result.success:
+                        return self._delivered(send_span, message, result, attempt, start_time, record_metrics)
+                    if self._attempt_failed(result, attempt):
+                        break
+                    
+                except Exception as e:
+                    result, delay, stop = self._attempt_error(e, message, attempt)
+                    if stop:
+                        break
                 
-            except Exception as e:
-                self.logger.error(f"Ошибка при попытке {attempt + 1}: {e}")
-                result = DeliveryResult(success=False, error=str(e), attempts=attempt + 1)
+                delay = self._next_delay(attempt, start_time, delay)
+                if delay is None:
+                    break
+                if delay > 0:
+                    with self._retry_sleep_span(delay):
+                        time.sleep(delay)
             
-            if attempt < self.max_retries - 1:
-                time.sleep(self.retry_delay)
-        
-        result.timestamp = time.time()
-        return result
+            return self._undelivered(send_span, message, result, attempt, start_time, record_metrics)
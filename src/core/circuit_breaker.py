@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from .exceptions import ConfigurationError
+from ..utils.logger import get_logger
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель провайдера.
+
+    В состоянии CLOSED ведется скользящее окно из window_size последних
+    отправок; при доле ошибок не ниже failure_rate_threshold (и не менее
+    minimum_calls вызовов) выключатель размыкается. В состоянии OPEN
+    запросы отклоняются сразу, через open_timeout выключатель переходит
+    в HALF_OPEN и пропускает half_open_max_calls пробных отправок:
+    успех замыкает цепь, ошибка снова размыкает. Пробы, не сообщившие
+    итог за open_timeout, считаются потерянными: цепь снова размыкается.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        open_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        if not 0 < failure_rate_threshold <= 1:
+            raise ConfigurationError("failure_rate_threshold должен быть в диапазоне (0, 1]")
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_size = window_size
+        self.minimum_calls = min(minimum_calls, window_size)
+        self.open_timeout = open_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._state = CircuitState.CLOSED
+        self._window = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], name: str) -> Optional['CircuitBreaker']:
+        """Создание из секции circuit_breaker конфигурации"""
+        if not config or not config.get('enabled', True):
+            return None
+
+        params = dict(config)
+        params.pop('enabled', None)
+        backend = params.pop('backend', 'memory')
+        if backend == 'memory':
+            params.pop('redis_url', None)
+            params.pop('key_prefix', None)
+            params.pop('sync_interval', None)
+            return cls(name, **params)
+        if backend == 'redis':
+            return RedisCircuitBreaker(name, **params)
+        raise ConfigurationError(f"Неизвестный backend выключателя: {backend}")
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state(time.time())
+
+    def allow_request(self) -> bool:
+        """Можно ли отправлять через провайдера прямо сейчас"""
+        with self._lock:
+            now = time.time()
+            state = self._current_state(now)
+            if state == CircuitState.CLOSED:
+                return True
+            if state == CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                if not self._half_open_calls:
+                    self._probe_started = now
+                self._half_open_calls += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._current_state(time.time()) == CircuitState.HALF_OPEN:
+                self._close()
+            else:
+                self._window.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            state = self._current_state(time.time())
+            if state == CircuitState.HALF_OPEN:
+                self._open(time.time())
+            elif state == CircuitState.CLOSED:
+                self._window.append(False)
+                if len(self._window) >= self.minimum_calls and self.failure_rate >= self.failure_rate_threshold:
+                    self._open(time.time())
+
+    def reset(self):
+        """Принудительное замыкание цепи"""
+        with self._lock:
+            self._close()
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._window:
+            return 0.0
+        return self._window.count(False) / len(self._window)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Текущее состояние для мониторинга"""
+        with self._lock:
+            state = self._current_state(time.time())
+            return {
+                'state': state.value,
+                'failure_rate': round(self.failure_rate, 3),
+                'calls': len(self._window),
+                'opened_at': self._opened_at if state != CircuitState.CLOSED else None,
+                'retry_at': self._opened_at + self.open_timeout if state == CircuitState.OPEN else None,
+            }
+
+    def _current_state(self, now: float) -> CircuitState:
+        if self._state == CircuitState.OPEN and now - self._opened_at >= self.open_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+        elif (
+            self._state == CircuitState.HALF_OPEN
+            and self._half_open_calls
+            and now - self._probe_started >= self.open_timeout
+        ):
+            self.logger.warning("Выключатель %s: пробный запрос не вернул итог, цепь снова разомкнута", self.name)
+            self._state = CircuitState.OPEN
+            self._opened_at = now
+            self._half_open_calls = 0
+        return self._state
+
+    def _open(self, now: float):
+        self.logger.warning("Выключатель %s разомкнут: доля ошибок %.0f%%", self.name, self.failure_rate * 100)
+        self._state = CircuitState.OPEN
+        self._opened_at = now
+        self._window.clear()
+
+    def _close(self):
+        if self._state != CircuitState.CLOSED:
+            self.logger.info("Выключатель %s замкнут", self.name)
+        self._state = CircuitState.CLOSED
+        self._window.clear()
+        self._half_open_calls = 0
+
+
+class RedisCircuitBreaker(CircuitBreaker):
+    """
+    Выключатель с общим для всех воркеров состоянием OPEN в Redis.
+
+    Окно ошибок ведется локально; разомкнувший цепь воркер публикует
+    время размыкания с TTL open_timeout, и остальные воркеры отклоняют
+    запросы до его истечения. Состояние Redis кешируется на sync_interval.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        redis_url: str = "redis://localhost:6379/0",
+        key_prefix: str = "circuit",
+        sync_interval: float = 1.0,
+        **kwargs
+    ):
+        super().__init__(name, **kwargs)
+        try:
+            import redis
+        except ImportError as e:
+            raise ConfigurationError("Для backend: redis требуется пакет redis") from e
+
+        self.client = redis.Redis.from_url(redis_url)
+        self.key = f"{key_prefix}:{name}"
+        self.sync_interval = sync_interval
+        self._synced_at = 0.0
+
+    def _current_state(self, now: float) -> CircuitState:
+        if self._state == CircuitState.CLOSED and now - self._synced_at >= self.sync_interval:
+            self._synced_at = now
+            try:
+                opened_at = self.client.get(self.key)
+            except Exception as e:
+                self.logger.warning("Не удалось прочитать состояние выключателя из Redis: %s", e)
+                opened_at = None
+            if opened_at is not None:
+                self._state = CircuitState.OPEN
+                self._opened_at = float(opened_at)
+                self._window.clear()
+        return super()._current_state(now)
+
+    def _open(self, now: float):
+        super()._open(now)
+        try:
+            self.client.set(self.key, now, ex=max(1, int(self.open_timeout)))
+        except Exception as e:
+            self.logger.warning("Не удалось опубликовать состояние выключателя в Redis: %s", e)
+
+    def _close(self):
+        super()._close()
+        try:
+            self.client.delete(self.key)
+        except Exception as e:
+            self.logger.warning("Не удалось сбросить состояние выключателя в Redis: %s", e)
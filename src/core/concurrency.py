@@ -0,0 +1,127 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .message import MessagePriority, MessageType
+
+
+class PrioritySemaphore:
+    """
+    Семафор, выдающий освободившийся слот ожидающему с наивысшим приоритетом.
+    При равном приоритете соблюдается порядок очереди.
+    """
+
+    def __init__(self, value: int):
+        if value < 1:
+            raise ValueError("Число слотов должно быть положительным")
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[int, int, threading.Event]] = []
+        self._sequence = itertools.count()
+
+    def acquire(self, rank: int = MessagePriority.NORMAL.rank):
+        """Занятие слота; rank - ранг приоритета (меньше - раньше)"""
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            event = threading.Event()
+            heapq.heappush(self._waiters, (rank, next(self._sequence), event))
+        event.wait()
+
+    def release(self):
+        """Освобождение слота: он передается первому ожидающему"""
+        with self._lock:
+            if self._waiters:
+                _, _, event = heapq.heappop(self._waiters)
+                event.set()
+            else:
+                self._value += 1
+
+    @property
+    def waiting(self) -> int:
+        """Число ожидающих слота"""
+        return len(self._waiters)
+
+
+class ProviderConcurrencyLimiter:
+    """Ограничение числа одновременных отправок для каждого типа сообщений"""
+
+    def __init__(self, limits: Optional[Dict[MessageType, int]] = None, default_limit: int = 8):
+        self.default_limit = default_limit
+        self._limits = {msg_type: default_limit for msg_type in MessageType}
+        self._limits.update(limits or {})
+        self._semaphores = {
+            msg_type: PrioritySemaphore(limit)
+            for msg_type, limit in self._limits.items()
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ProviderConcurrencyLimiter':
+        """Создание из секции broadcast конфигурации"""
+        limits = {
+            MessageType(name): int(limit)
+            for name, limit in (config.get('concurrency') or {}).items()
+        }
+        return cls(limits, default_limit=int(config.get('default_concurrency', 8)))
+
+    def limit(self, message_type: Optional[MessageType]) -> int:
+        """Максимум одновременных отправок для типа сообщений"""
+        return self._limits.get(message_type, self.default_limit)
+
+    @contextmanager
+    def slot(self, message_type: Optional[MessageType], priority: Optional[MessagePriority] = None):
+        """
+        Занятие слота отправки на время вызова провайдера.
+        При нехватке слотов первыми их получают сообщения с высоким приоритетом.
+        """
+        semaphore = self._semaphores.get(message_type)
+        if semaphore is None:
+            yield
+            return
+        semaphore.acquire((priority or MessagePriority.NORMAL).rank)
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+class ProviderWorkerPool:
+    """
+    Пул потоков с отдельной полосой на каждый тип сообщений.
+
+    Полосы не делят потоки между собой, поэтому медленный провайдер
+    не задерживает задачи остальных каналов.
+    """
+
+    def __init__(self, limiter: ProviderConcurrencyLimiter, thread_name_prefix: str = "broadcast"):
+        self.limiter = limiter
+        self.thread_name_prefix = thread_name_prefix
+        self._executors: Dict[Optional[MessageType], ThreadPoolExecutor] = {}
+
+    def submit(self, lane: Optional[MessageType], fn: Callable, *args, **kwargs) -> Future:
+        """Постановка задачи в полосу указанного типа"""
+        executor = self._executors.get(lane)
+        if executor is None:
+            name = lane.value if lane else "default"
+            executor = ThreadPoolExecutor(
+                max_workers=self.limiter.limit(lane),
+                thread_name_prefix=f"{self.thread_name_prefix}-{name}"
+            )
+            self._executors[lane] = executor
+        return executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True):
+        """Остановка всех полос"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+        self._executors.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
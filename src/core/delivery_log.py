@@ -0,0 +1,310 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .exceptions import ConfigurationError
+from ..utils.logger import get_logger
+
+STATUS_DELIVERED = 'delivered'
+STATUS_FAILED = 'failed'
+
+# Поля записи в порядке столбцов таблицы
+COLUMNS = (
+    'ts', 'recipient', 'provider', 'status', 'message_id',
+    'error_type', 'error', 'attempts', 'priority', 'delivery_time', 'template_id',
+)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS deliveries (
+        id INTEGER PRIMARY KEY,
+        ts REAL NOT NULL,
+        recipient TEXT NOT NULL,
+        provider TEXT NOT NULL,
+        status TEXT NOT NULL,
+        message_id TEXT,
+        error_type TEXT,
+        error TEXT,
+        attempts INTEGER,
+        priority TEXT,
+        delivery_time REAL,
+        template_id TEXT
+    )
+    """,
+    # История получателя; счетчики по провайдеру и итогу за период; итоги всех провайдеров;
+    # сводка и очистка по времени (индекс покрывает сводку без чтения строк таблицы)
+    "CREATE INDEX IF NOT EXISTS deliveries_recipient_ts ON deliveries (recipient, ts)",
+    "CREATE INDEX IF NOT EXISTS deliveries_provider_status_ts ON deliveries (provider, status, ts)",
+    "CREATE INDEX IF NOT EXISTS deliveries_status_ts ON deliveries (status, ts)",
+    "CREATE INDEX IF NOT EXISTS deliveries_ts_provider_status ON deliveries (ts, provider, status)",
+)
+
+_INSERT = f"INSERT INTO deliveries ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+# Максимальная длина текста ошибки в записи
+MAX_ERROR_LENGTH = 500
+
+
+class _Flush:
+    """Маркер в очереди записи: событие устанавливается после записи всех предыдущих строк"""
+
+    __slots__ = ('done',)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class DeliveryLog:
+    """
+    Журнал итогов доставки в SQLite (режим WAL).
+
+    Отправка только кладет кортеж записи в очередь; фоновый поток пишет
+    накопленные записи пачками по batch_size одной транзакцией не реже
+    раза в flush_interval. При переполнении очереди записи отбрасываются
+    (счетчик dropped), отправка не ждет диска. Чтение идет через отдельные
+    соединения и не блокирует запись.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 100000,
+        retention_days: Optional[float] = None
+    ):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.retention = retention_days * 86400 if retention_days else None
+        self.dropped = 0
+        self.written = 0
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._readers = threading.local()
+        self._reader_connections: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._purged_at = 0.0
+
+        connection = self._connect()
+        try:
+            # WAL: читатели не блокируют пишущий поток и друг друга
+            connection.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+        finally:
+            connection.close()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['DeliveryLog']:
+        """Создание из секции delivery_log; None, если журнал отключен"""
+        config = config or {}
+        if not config.get('enabled', False):
+            return None
+        backend = config.get('backend', 'sqlite')
+        if backend != 'sqlite':
+            raise ConfigurationError(f"Неизвестное хранилище журнала доставки: {backend}")
+        return cls(
+            config.get('path', 'data/deliveries.db'),
+            batch_size=int(config.get('batch_size', 500)),
+            flush_interval=float(config.get('flush_interval', 1.0)),
+            max_queue=int(config.get('max_queue', 100000)),
+            retention_days=config.get('retention_days')
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        connection.execute("PRAGMA busy_timeout=30000")
+        return connection
+
+    def start(self) -> 'DeliveryLog':
+        self._thread = threading.Thread(target=self._run, name='delivery-log', daemon=True)
+        self._thread.start()
+        return self
+
+    def record(self, provider: str, message, result) -> None:
+        """Постановка итога отправки в очередь записи (без ожидания диска)"""
+        if self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+            return
+        error = result.error
+        if error and len(error) > MAX_ERROR_LENGTH:
+            error = error[:MAX_ERROR_LENGTH]
+        self._queue.put((
+            result.timestamp or time.time(),
+            message.recipient,
+            provider,
+            STATUS_DELIVERED if result.success else STATUS_FAILED,
+            result.message_id,
+            result.error_type,
+            error,
+            result.attempts,
+            message.priority.value if message.priority else None,
+            result.delivery_time,
+            message.template_id,
+        ))
+
+    def _run(self):
+        connection = self._connect()
+        # В WAL с NORMAL fsync выполняется только при контрольной точке; кеш страниц
+        # пишущего соединения вмещает верхние уровни индексов большого журнала
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA cache_size=-65536")
+        try:
+            stopping = False
+            while not stopping:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    self._purge_expired(connection)
+                    continue
+
+                rows, markers = [], []
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                    elif isinstance(item, _Flush):
+                        markers.append(item)
+                    else:
+                        rows.append(item)
+                    if stopping or len(rows) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                self._write(connection, rows)
+                for marker in markers:
+                    marker.done.set()
+                self._purge_expired(connection)
+        finally:
+            connection.close()
+
+    def _write(self, connection: sqlite3.Connection, rows: List[tuple]):
+        if not rows:
+            return
+        try:
+            with connection:
+                connection.executemany(_INSERT, rows)
+            self.written += len(rows)
+        except sqlite3.Error as e:
+            self.dropped += len(rows)
+            self.logger.error("Не удалось записать %d записей журнала доставки: %s", len(rows), e)
+
+    def _purge_expired(self, connection: sqlite3.Connection):
+        # Устаревшие записи удаляются не чаще раза в час
+        now = time.time()
+        if self.retention is None or now - self._purged_at < 3600:
+            return
+        self._purged_at = now
+        try:
+            with connection:
+                connection.execute("DELETE FROM deliveries WHERE ts < ?", (now - self.retention,))
+        except sqlite3.Error as e:
+            self.logger.warning("Не удалось удалить устаревшие записи журнала доставки: %s", e)
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """Ожидание записи всех поставленных в очередь итогов"""
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        marker = _Flush()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self):
+        """Запись оставшейся очереди и остановка фонового потока"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout=30.0)
+            self._thread = None
+        with self._readers_lock:
+            connections, self._reader_connections = self._reader_connections, []
+        for connection in connections:
+            connection.close()
+        self._readers = threading.local()
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._readers, 'connection', None)
+        if connection is None:
+            connection = self._connect()
+            connection.row_factory = sqlite3.Row
+            self._readers.connection = connection
+            with self._readers_lock:
+                self._reader_connections.append(connection)
+        return connection
+
+    @staticmethod
+    def _where(
+        recipient: Optional[str] = None,
+        provider: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> Tuple[str, list]:
+        clauses, params = [], []
+        for column, value in (('recipient', recipient), ('provider', provider), ('status', status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+    def query(
+        self,
+        recipient: Optional[str] = None,
+        provider: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Записи по фильтрам, от новых к старым (время - unix timestamp)"""
+        where, params = self._where(recipient, provider, status, since, until)
+        rows = self._reader().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM deliveries{where} ORDER BY ts DESC LIMIT ?",
+            params + [int(limit)]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(
+        self,
+        recipient: Optional[str] = None,
+        provider: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> int:
+        """Число записей по фильтрам (считается по индексу)"""
+        where, params = self._where(recipient, provider, status, since, until)
+        return self._reader().execute(f"SELECT COUNT(*) FROM deliveries{where}", params).fetchone()[0]
+
+    def summary(self, since: Optional[float] = None, until: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """Число записей по провайдерам и итогам: {провайдер: {'delivered': n, 'failed': m}}"""
+        where, params = self._where(since=since, until=until)
+        # Без подсказки планировщик выбирает полный проход по (provider, status, ts) ради порядка GROUP BY
+        index = " INDEXED BY deliveries_ts_provider_status" if params else ''
+        summary: Dict[str, Dict[str, int]] = {}
+        for provider, status, total in self._reader().execute(
+            f"SELECT provider, status, COUNT(*) FROM deliveries{index}{where} GROUP BY provider, status", params
+        ):
+            summary.setdefault(provider, {STATUS_DELIVERED: 0, STATUS_FAILED: 0})[status] = total
+        return summary
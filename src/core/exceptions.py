@@ -12,7 +12,10 @@ class AuthenticationError(MessageDeliveryError):
 
 class RateLimitError(MessageDeliveryError):
     """Превышен лимит запросов"""
-    pass
+    
+    def __init__(self, message: str = "", retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 class NetworkError(MessageDeliveryError):
     """Сетевая ошибка"""
@@ -21,3 +24,7 @@ class NetworkError(MessageDeliveryError):
 class ValidationError(MessageDeliveryError):
     """Ошибка валидации данных"""
     pass
+
+class RecipientError(MessageDeliveryError):
+    """Ошибка на стороне получателя (чат не найден, адрес отклонен)"""
+    pass
@@ -0,0 +1,83 @@
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .message import MessagePriority
+from .metrics import DELIVERY_METRICS
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    """Перцентиль по отсортированной выборке (ближайший ранг)"""
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class QueueLatencyTracker:
+    """
+    Задержка в очереди по приоритетам: время от постановки сообщения
+    до начала его обработки. Перцентили считаются по последним window
+    замерам, счетчики нарушений SLO - за все время работы.
+    """
+
+    def __init__(self, slo: Optional[Dict[MessagePriority, float]] = None, window: int = 1024):
+        self.slo = dict(slo or {})
+        self._samples = {priority: deque(maxlen=window) for priority in MessagePriority}
+        self._counts = {priority: 0 for priority in MessagePriority}
+        self._violations = {priority: 0 for priority in MessagePriority}
+        self._max = {priority: 0.0 for priority in MessagePriority}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'QueueLatencyTracker':
+        """Создание из секции priority конфигурации"""
+        config = config or {}
+        slo = {
+            MessagePriority[name.upper()]: float(seconds)
+            for name, seconds in (config.get('latency_slo') or {}).items()
+        }
+        return cls(slo, window=int(config.get('latency_window', 1024)))
+
+    def record(self, priority: Optional[MessagePriority], seconds: float) -> bool:
+        """Учет замера; возвращает False при нарушении SLO приоритета"""
+        priority = priority or MessagePriority.NORMAL
+        seconds = max(0.0, seconds)
+        slo = self.slo.get(priority)
+        within_slo = slo is None or seconds <= slo
+        DELIVERY_METRICS.queue_latency.observe(seconds, priority.value)
+        with self._lock:
+            self._samples[priority].append(seconds)
+            self._counts[priority] += 1
+            self._max[priority] = max(self._max[priority], seconds)
+            if not within_slo:
+                self._violations[priority] += 1
+        return within_slo
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Сводка по приоритетам: {приоритет: {'count', 'p50', 'p95', 'p99', 'max', ...}}"""
+        with self._lock:
+            samples = {priority: sorted(values) for priority, values in self._samples.items()}
+            counts = dict(self._counts)
+            violations = dict(self._violations)
+            maximums = dict(self._max)
+
+        summary = {}
+        for priority in MessagePriority:
+            ordered = samples[priority]
+            summary[priority.value] = {
+                'count': counts[priority],
+                'p50': _percentile(ordered, 0.50) if ordered else None,
+                'p95': _percentile(ordered, 0.95) if ordered else None,
+                'p99': _percentile(ordered, 0.99) if ordered else None,
+                'max': maximums[priority],
+                'slo': self.slo.get(priority),
+                'slo_violations': violations[priority],
+            }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            for priority in MessagePriority:
+                self._samples[priority].clear()
+                self._counts[priority] = 0
+                self._violations[priority] = 0
+                self._max[priority] = 0.0
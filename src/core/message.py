@@ -1,7 +1,13 @@
+import dataclasses
+import marshal
+import sys
 from dataclasses import dataclass
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 from enum import Enum
 
+from .exceptions import ValidationError
+
 class MessageType(Enum):
     EMAIL = "email"
     SMS = "sms"
@@ -11,26 +17,175 @@ class MessagePriority(Enum):
     LOW = "low"
     NORMAL = "normal"
     HIGH = "high"
+    
+    @property
+    def rank(self) -> int:
+        """Порядок обработки: меньшее значение обслуживается раньше"""
+        return _PRIORITY_RANKS[self]
+
+_PRIORITY_RANKS = {
+    MessagePriority.HIGH: 0,
+    MessagePriority.NORMAL: 1,
+    MessagePriority.LOW: 2,
+}
+
+# Порядок полей компактного представления (to_tuple/from_tuple)
+_MESSAGE_FIELDS = (
+    'message_type', 'recipient', 'content', 'subject', 'attachments',
+    'priority', 'metadata', 'template_id', 'template_vars', 'content_format',
+)
+_RESULT_FIELDS = (
+    'success', 'message_id', 'provider_response', 'error', 'error_type',
+    'attempts', 'timestamp', 'delivery_time',
+)
+
+def _slotted(cls):
+    """
+    Пересоздание dataclass с __slots__ вместо __dict__ экземпляра
+    (аналог dataclass(slots=True), доступного только с Python 3.10).
+    """
+    names = tuple(field.name for field in dataclasses.fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items() if key not in names}
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
 
+def _intern(value):
+    """Общий экземпляр повторяющейся строки (тема, текст, шаблон)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+@lru_cache(maxsize=256)
+def _chain(values: Tuple[str, ...]) -> Tuple[MessageType, ...]:
+    return tuple(MessageType(value) for value in values)
+
+def intern_chain(chain: Iterable[Union[str, MessageType]]) -> Tuple[MessageType, ...]:
+    """Общий неизменяемый экземпляр цепочки провайдеров"""
+    return _chain(tuple(item.value if isinstance(item, MessageType) else item for item in chain))
+
+@_slotted
 @dataclass
 class Message:
     """Универсальный класс сообщения"""
     message_type: MessageType
     recipient: str
-    content: str
+    content: str = ""
     subject: Optional[str] = None
     attachments: Optional[List[str]] = None
     priority: MessagePriority = MessagePriority.NORMAL
     metadata: Optional[Dict[str, Any]] = None
+    # Шаблон рендерится при отправке отдельно для каждого канала
+    template_id: Optional[str] = None
+    template_vars: Optional[Dict[str, Any]] = None
+    # Формат содержимого: None - простой текст, 'html' - HTML-разметка
+    content_format: Optional[str] = None
+    
+    @classmethod
+    def from_template(
+        cls,
+        message_type: MessageType,
+        recipient: str,
+        template_id: str,
+        template_vars: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> 'Message':
+        """Сообщение по шаблону: передаются только идентификатор и переменные"""
+        return cls(
+            message_type=message_type,
+            recipient=recipient,
+            template_id=template_id,
+            template_vars=template_vars,
+            **kwargs
+        )
     
     def validate(self) -> bool:
         """Валидация сообщения"""
         if not self.recipient:
             raise ValidationError("Получатель не может быть пустым")
-        if not self.content:
+        if not self.content and not self.template_id:
             raise ValidationError("Содержимое сообщения не может быть пустым")
         return True
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Сериализация для передачи через брокер; пустые поля опускаются"""
+        data = {
+            "message_type": self.message_type.value if self.message_type else None,
+            "recipient": self.recipient,
+            "content": self.content or None,
+            "subject": self.subject,
+            "attachments": self.attachments,
+            "priority": self.priority.name,
+            "metadata": self.metadata,
+            "template_id": self.template_id,
+            "template_vars": self.template_vars,
+            "content_format": self.content_format,
+        }
+        return {key: value for key, value in data.items() if value is not None}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Message':
+        """Восстановление сообщения из результата to_dict"""
+        data = dict(data)
+        message_type = data.get('message_type')
+        data['message_type'] = MessageType(message_type) if message_type else None
+        priority = data.get('priority')
+        if isinstance(priority, str):
+            data['priority'] = MessagePriority[priority.upper()]
+        for key in ('content', 'subject', 'template_id'):
+            if key in data:
+                data[key] = _intern(data[key])
+        return cls(**data)
+    
+    def to_tuple(self) -> tuple:
+        """
+        Компактное позиционное представление: значения полей в порядке
+        _MESSAGE_FIELDS без завершающих пустых полей, NORMAL кодируется как None.
+        """
+        values = [
+            self.message_type.value if self.message_type else None,
+            self.recipient,
+            self.content or None,
+            self.subject,
+            self.attachments,
+            None if self.priority is MessagePriority.NORMAL else self.priority.value,
+            self.metadata,
+            self.template_id,
+            self.template_vars,
+            self.content_format,
+        ]
+        while values and values[-1] is None:
+            values.pop()
+        return tuple(values)
+    
+    @classmethod
+    def from_tuple(cls, data: Iterable[Any]) -> 'Message':
+        """Восстановление из to_tuple (в том числе после JSON, где кортеж стал списком)"""
+        data = tuple(data)
+        (message_type, recipient, content, subject, attachments,
+         priority, metadata, template_id, template_vars, content_format) = data + (None,) * (len(_MESSAGE_FIELDS) - len(data))
+        return cls(
+            MessageType(message_type) if message_type else None,
+            recipient,
+            _intern(content) or "",
+            _intern(subject),
+            attachments,
+            MessagePriority(priority) if priority else MessagePriority.NORMAL,
+            metadata,
+            _intern(template_id),
+            template_vars,
+            content_format
+        )
+    
+    def to_bytes(self) -> bytes:
+        """Бинарное представление (marshal); metadata и переменные - только JSON-подобные типы"""
+        return marshal.dumps(self.to_tuple())
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Message':
+        """Восстановление из to_bytes; только для данных из доверенного источника"""
+        return cls.from_tuple(marshal.loads(data))
 
+@_slotted
 @dataclass
 class DeliveryResult:
     """Результат доставки сообщения"""
@@ -38,6 +193,15 @@ class DeliveryResult:
     message_id: Optional[str] = None
     provider_response: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    error_type: Optional[str] = None
     attempts: int = 1
     timestamp: float = 0.0
     delivery_time: Optional[float] = None
+    
+    def to_tuple(self) -> tuple:
+        """Значения полей в порядке _RESULT_FIELDS"""
+        return tuple(getattr(self, name) for name in _RESULT_FIELDS)
+    
+    @classmethod
+    def from_tuple(cls, data: Iterable[Any]) -> 'DeliveryResult':
+        return cls(*data)
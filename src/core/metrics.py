@@ -0,0 +1,444 @@
+import os
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from ..utils.logger import get_logger
+
+# Границы корзин гистограммы задержки доставки, сек
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+ATTEMPT_BUCKETS = (1, 2, 3, 5, 10)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _ShardedMetric:
+    """
+    Метрика с накоплением по потокам.
+
+    Каждый поток обновляет только свой шард (словарь в threading.local),
+    поэтому запись не требует блокировок; шарды суммируются при чтении.
+    Шарды завершившихся потоков сливаются в общий при следующем чтении
+    или при регистрации шарда нового потока, так что их число не растет
+    с числом созданных потоков.
+    """
+
+    kind = ''
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, Dict[tuple, Any]]] = []
+        self._retired: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[tuple, Any]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._retire_finished()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_finished(self):
+        # Вызывается под self._lock
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self._merge(self._retired, dict(shard))
+        self._shards = alive
+
+    def _key(self, labelvalues: tuple) -> tuple:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}")
+        return labelvalues
+
+    def _merge(self, target: Dict[tuple, Any], source: Dict[tuple, Any]):
+        raise NotImplementedError
+
+    def collect(self) -> Dict[tuple, Any]:
+        """Суммарные значения по наборам меток"""
+        with self._lock:
+            self._retire_finished()
+            total: Dict[tuple, Any] = {}
+            self._merge(total, self._retired)
+            for _, shard in self._shards:
+                self._merge(total, dict(shard))
+        return total
+
+    def reset(self):
+        with self._lock:
+            self._retired.clear()
+            for _, shard in self._shards:
+                shard.clear()
+
+
+class Counter(_ShardedMetric):
+    """Монотонный счетчик"""
+
+    kind = 'counter'
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        if not self.registry.enabled:
+            return
+        key = self._key(labelvalues)
+        shard = self._shard()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self.collect().get(self._key(labelvalues), 0.0)
+
+    def _merge(self, target, source):
+        for key, value in source.items():
+            target[key] = target.get(key, 0.0) + value
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self.collect().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_ShardedMetric):
+    """
+    Гистограмма с фиксированными корзинами.
+    Значение шарда: [счетчики корзин (последняя - +Inf), сумма, количество].
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues: str):
+        if not self.registry.enabled:
+            return
+        key = self._key(labelvalues)
+        shard = self._shard()
+        counts = shard.get(key)
+        if counts is None:
+            counts = shard[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def _merge(self, target, source):
+        for key, counts in source.items():
+            merged = target.get(key)
+            if merged is None:
+                target[key] = list(counts)
+            else:
+                for index, value in enumerate(counts):
+                    merged[index] += value
+
+    def count(self, *labelvalues: str) -> int:
+        counts = self.collect().get(self._key(labelvalues))
+        return counts[-1] if counts else 0
+
+    def quantile(self, fraction: float, *labelvalues: str) -> Optional[float]:
+        """Оценка перцентиля по корзинам (линейная интерполяция внутри корзины)"""
+        counts = self.collect().get(self._key(labelvalues))
+        return self._quantile(counts, fraction) if counts else None
+
+    def _quantile(self, counts: list, fraction: float) -> Optional[float]:
+        total = counts[-1]
+        if not total:
+            return None
+        rank = fraction * total
+        cumulative = 0
+        for index, bucket_count in enumerate(counts[:-2]):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    # Выше последней границы: оценка ограничена ею
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def summary(self) -> Dict[tuple, Dict[str, Any]]:
+        """Сводка по наборам меток: {'count', 'sum', 'p50', 'p95', 'p99'}"""
+        return {
+            key: {
+                'count': counts[-1],
+                'sum': counts[-2],
+                'p50': self._quantile(counts, 0.50),
+                'p95': self._quantile(counts, 0.95),
+                'p99': self._quantile(counts, 0.99),
+            }
+            for key, counts in self.collect().items()
+        }
+
+    def samples(self) -> Iterator[str]:
+        bounds = [_format_value(bound) for bound in self.buckets] + ['+Inf']
+        for key, counts in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts[:-2]):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(counts[-2])}"
+            yield f"{self.name}_count{labels} {counts[-1]}"
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса с выводом в текстовом формате Prometheus"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, _ShardedMetric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Метрика {name} уже зарегистрирована с другим типом или метками")
+        return metric
+
+    def get(self, name: str) -> Optional[_ShardedMetric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus (exposition format 0.0.4)"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        """Атомарная запись метрик в файл (например, для textfile collector node_exporter)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+    def reset(self):
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+
+class DeliveryMetrics:
+    """Метрики доставки сообщений, общие для отправщиков, системы доставки и задач Celery"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.deliveries = registry.counter(
+            'message_deliveries_total', 'Итоги отправки сообщений провайдером',
+            ('provider', 'outcome', 'error_type', 'priority')
+        )
+        self.latency = registry.histogram(
+            'message_delivery_seconds', 'Время отправки сообщения с учетом повторов',
+            ('provider', 'outcome', 'priority')
+        )
+        self.attempts = registry.histogram(
+            'message_delivery_attempts', 'Число попыток отправки сообщения',
+            ('provider', 'outcome'), buckets=ATTEMPT_BUCKETS
+        )
+        self.fallback_steps = registry.counter(
+            'message_fallback_steps_total', 'Шаги цепочки резервных провайдеров',
+            ('provider', 'outcome')
+        )
+        self.task_messages = registry.counter(
+            'celery_task_messages_total', 'Сообщения, обработанные задачами Celery',
+            ('task', 'outcome', 'priority')
+        )
+        self.queue_latency = registry.histogram(
+            'message_queue_latency_seconds', 'Задержка от постановки в очередь до начала отправки',
+            ('priority',)
+        )
+
+    def record_delivery(
+        self,
+        provider: str,
+        message,
+        result,
+        attempts: Optional[int] = None,
+        elapsed: Optional[float] = None
+    ):
+        """Учет итога отправки одного сообщения провайдером"""
+        if not self.registry.enabled:
+            return
+        outcome = 'success' if result.success else 'failure'
+        priority = message.priority.value if message is not None and message.priority else 'normal'
+        self.deliveries.inc(provider, outcome, result.error_type or '', priority)
+        elapsed = result.delivery_time if elapsed is None else elapsed
+        if elapsed is not None:
+            self.latency.observe(elapsed, provider, outcome, priority)
+        self.attempts.observe(attempts or result.attempts, provider, outcome)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Сводка по провайдерам: {провайдер: {'success', 'failure', 'p50', 'p95', 'p99'}}"""
+        providers: Dict[str, Dict[str, Any]] = {}
+        for (provider, outcome, _, _), value in self.deliveries.collect().items():
+            stats = providers.setdefault(provider, {'success': 0, 'failure': 0})
+            stats[outcome] = stats.get(outcome, 0) + int(value)
+
+        # Перцентили задержки успешных отправок по всем приоритетам
+        merged: Dict[str, list] = {}
+        for (provider, outcome, _), counts in self.latency.collect().items():
+            if outcome != 'success':
+                continue
+            target = merged.get(provider)
+            if target is None:
+                merged[provider] = list(counts)
+            else:
+                for index, value in enumerate(counts):
+                    target[index] += value
+        for provider, stats in providers.items():
+            counts = merged.get(provider)
+            for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+                stats[name] = self.latency._quantile(counts, fraction) if counts else None
+        return providers
+
+
+def _metrics_handler(registry: MetricsRegistry):
+    """Обработчик /metrics; http.server импортируется только при запуске эндпоинта"""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+class MetricsExporter:
+    """
+    Публикация метрик: HTTP-эндпоинт /metrics и/или периодическая запись в файл.
+    В пути файла {pid} заменяется на идентификатор процесса
+    (для нескольких процессов воркера Celery).
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        path: Optional[str] = None,
+        interval: float = 15.0,
+        port: Optional[int] = None,
+        host: str = '127.0.0.1'
+    ):
+        self.registry = registry
+        self.path = path.replace('{pid}', str(os.getpid())) if path else None
+        self.interval = interval
+        self.port = port
+        self.host = host
+        self.logger = get_logger(self.__class__.__name__)
+        self._server = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @classmethod
+    def from_config(cls, registry: MetricsRegistry, config: Optional[Dict[str, Any]]) -> Optional['MetricsExporter']:
+        """Создание из секции metrics; None, если публикация не настроена"""
+        config = config or {}
+        if not config.get('file') and not config.get('port'):
+            return None
+        return cls(
+            registry,
+            path=config.get('file'),
+            interval=float(config.get('interval', 15.0)),
+            port=config.get('port'),
+            host=config.get('host', '127.0.0.1')
+        )
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        return self._server.server_address[:2] if self._server else None
+
+    def start(self) -> 'MetricsExporter':
+        if self.port is not None:
+            from http.server import ThreadingHTTPServer
+            self._server = ThreadingHTTPServer((self.host, int(self.port)), _metrics_handler(self.registry))
+            self._server.daemon_threads = True
+            self._spawn(self._server.serve_forever, 'metrics-http')
+            self.logger.info("Метрики доступны по адресу http://%s:%s/metrics", self.address[0], self.address[1])
+        if self.path:
+            self._spawn(self._write_loop, 'metrics-file')
+        return self
+
+    def _spawn(self, target, name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        try:
+            self.registry.write(self.path)
+        except OSError as e:
+            self.logger.warning("Не удалось записать метрики в %s: %s", self.path, e)
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+        if self.path:
+            # Последний снимок, чтобы файл не отставал от завершенной работы
+            self.write()
+
+
+# Реестр процесса и метрики доставки
+REGISTRY = MetricsRegistry()
+DELIVERY_METRICS = DeliveryMetrics(REGISTRY)
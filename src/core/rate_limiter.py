@@ -0,0 +1,220 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .exceptions import ConfigurationError
+from ..utils.logger import get_logger
+
+
+class TokenBucket:
+    """
+    Потокобезопасный token bucket с резервированием.
+
+    reserve() всегда списывает токен и возвращает время ожидания до
+    момента, когда токен станет доступен, поэтому конкурирующие потоки
+    выстраиваются в очередь без повторных попыток.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', '_lock')
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ConfigurationError("Скорость token bucket должна быть положительной")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Списание токена; возвращает необходимую задержку в секундах"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def block_for(self, seconds: float):
+        """Блокировка bucket на указанное время (например, по Retry-After)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    """Ограничитель скорости: общий bucket провайдера и bucket на каждого получателя"""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        per_recipient_rate: Optional[float] = None,
+        per_recipient_burst: Optional[float] = None,
+        max_recipients: int = 10000
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.per_recipient_rate = per_recipient_rate
+        self.per_recipient_burst = per_recipient_burst
+        self.max_recipients = max_recipients
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._global = TokenBucket(rate, burst) if rate else None
+        self._recipients: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self._recipients_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], name: str = "default") -> Optional['RateLimiter']:
+        """Создание ограничителя из секции rate_limit провайдера"""
+        if not config:
+            return None
+
+        params = dict(config)
+        backend = params.pop('backend', 'memory')
+        if backend == 'memory':
+            params.pop('redis_url', None)
+            params.pop('key_prefix', None)
+            return cls(**params)
+        if backend == 'redis':
+            return RedisRateLimiter(name=name, **params)
+        raise ConfigurationError(f"Неизвестный backend ограничителя скорости: {backend}")
+
+    def reserve(self, recipient: Optional[str] = None) -> float:
+        """Резервирование права на отправку; возвращает задержку в секундах"""
+        delay = self._global.reserve() if self._global else 0.0
+        if self.per_recipient_rate and recipient:
+            delay = max(delay, self._recipient_bucket(recipient).reserve())
+        return delay
+
+    def acquire(self, recipient: Optional[str] = None):
+        """Блокирующее ожидание права на отправку"""
+        delay = self.reserve(recipient)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, recipient: Optional[str] = None):
+        """Ожидание права на отправку без блокировки event loop"""
+        delay = self.reserve(recipient)
+        if delay > 0:
+            # asyncio уже загружен работающим event loop; синхронные пользователи его не импортируют
+            import asyncio
+            await asyncio.sleep(delay)
+
+    def penalize(self, retry_after: float, recipient: Optional[str] = None) -> bool:
+        """
+        Учет Retry-After от провайдера: приостановка отправок получателю
+        (при лимите на получателя) или всех отправок. False - ни один
+        bucket не настроен и паузу должен выдержать вызывающий.
+        """
+        self.logger.warning("Провайдер запросил паузу %s с", retry_after)
+        if recipient and self.per_recipient_rate:
+            self._recipient_bucket(recipient).block_for(retry_after)
+        elif self._global:
+            self._global.block_for(retry_after)
+        else:
+            return False
+        return True
+
+    def _recipient_bucket(self, recipient: str) -> TokenBucket:
+        with self._recipients_lock:
+            bucket = self._recipients.get(recipient)
+            if bucket is None:
+                bucket = TokenBucket(self.per_recipient_rate, self.per_recipient_burst)
+                self._recipients[recipient] = bucket
+                self._evict()
+            else:
+                self._recipients.move_to_end(recipient)
+            return bucket
+
+    def _evict(self):
+        # Удаляются самые давние получатели; заполненные bucket ничего не теряют
+        while len(self._recipients) > self.max_recipients:
+            self._recipients.popitem(last=False)
+
+
+# Token bucket в Redis: KEYS[1] - ключ bucket, ARGV - rate, capacity, penalty (сек)
+_REDIS_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local penalty = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local delay = 0
+if penalty > 0 then
+    tokens = math.min(tokens, -penalty * rate)
+else
+    tokens = tokens - 1
+    if tokens < 0 then
+        delay = -tokens / rate
+    end
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate + math.max(delay, penalty)) + 1)
+return tostring(delay)
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Ограничитель скорости с состоянием в Redis.
+
+    Все воркеры Celery, использующие один redis_url и имя провайдера,
+    делят общий бюджет запросов.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        redis_url: str = "redis://localhost:6379/0",
+        key_prefix: str = "ratelimit",
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        try:
+            import redis
+        except ImportError as e:
+            raise ConfigurationError("Для backend: redis требуется пакет redis") from e
+
+        self.client = redis.Redis.from_url(redis_url)
+        self.key_prefix = f"{key_prefix}:{name}"
+        self._script = self.client.register_script(_REDIS_RESERVE_SCRIPT)
+
+    def _call(self, key: str, rate: float, burst: Optional[float], penalty: float = 0.0) -> float:
+        capacity = burst if burst is not None else max(rate, 1)
+        return float(self._script(keys=[key], args=[rate, capacity, penalty]))
+
+    def reserve(self, recipient: Optional[str] = None) -> float:
+        delay = 0.0
+        if self.rate:
+            delay = self._call(f"{self.key_prefix}:global", self.rate, self.burst)
+        if self.per_recipient_rate and recipient:
+            delay = max(delay, self._call(
+                f"{self.key_prefix}:rcpt:{recipient}", self.per_recipient_rate, self.per_recipient_burst
+            ))
+        return delay
+
+    async def aacquire(self, recipient: Optional[str] = None):
+        """Ожидание права на отправку: запрос к Redis выполняется в пуле потоков, не блокируя event loop"""
+        import asyncio
+        delay = await asyncio.get_running_loop().run_in_executor(None, self.reserve, recipient)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def penalize(self, retry_after: float, recipient: Optional[str] = None) -> bool:
+        self.logger.warning("Провайдер запросил паузу %s с", retry_after)
+        if recipient and self.per_recipient_rate:
+            self._call(f"{self.key_prefix}:rcpt:{recipient}",
+                       self.per_recipient_rate, self.per_recipient_burst, retry_after)
+        elif self.rate:
+            self._call(f"{self.key_prefix}:global", self.rate, self.burst, retry_after)
+        else:
+            return False
+        return True
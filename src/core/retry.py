@@ -0,0 +1,67 @@
+import random
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+from .exceptions import ConfigurationError
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Политика повторных попыток.
+
+    max_retries - общее число попыток. Задержка перед повтором растет
+    экспоненциально от base_delay до max_delay; при jitter='full'
+    выбирается случайно из [0, задержка]. max_elapsed ограничивает общее
+    время отправки. При inline=False отправщик делает одну попытку, а
+    повтор планирует вызывающая сторона (например, задача Celery с countdown).
+    """
+
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    multiplier: float = 2.0
+    jitter: str = 'full'
+    max_elapsed: Optional[float] = None
+    inline: bool = True
+
+    def __post_init__(self):
+        if self.max_retries < 1:
+            raise ConfigurationError("max_retries должен быть не меньше 1")
+        if self.jitter not in ('none', 'full'):
+            raise ConfigurationError(f"Неизвестный режим jitter: {self.jitter}")
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> 'RetryPolicy':
+        """Создание из секции retry конфигурации (delay и retry_delay - синонимы base_delay)"""
+        config = dict(config or {})
+        for alias in ('delay', 'retry_delay'):
+            if alias in config:
+                config.setdefault('base_delay', config.pop(alias))
+
+        known = cls.__dataclass_fields__.keys()
+        unknown = set(config) - set(known)
+        if unknown:
+            raise ConfigurationError(f"Неизвестные параметры retry: {', '.join(sorted(unknown))}")
+        return cls(**config)
+
+    @classmethod
+    def fixed(cls, max_retries: int = 3, delay: float = 1.0) -> 'RetryPolicy':
+        """Постоянная задержка без jitter (поведение до введения политики)"""
+        return cls(max_retries=max_retries, base_delay=delay, max_delay=delay, multiplier=1.0, jitter='none')
+
+    def with_inline(self, inline: bool) -> 'RetryPolicy':
+        return replace(self, inline=inline)
+
+    def compute_delay(self, attempt: int) -> float:
+        """Задержка перед повтором после неудачной попытки с номером attempt (с нуля)"""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** attempt)
+        if self.jitter == 'full':
+            return random.uniform(0, delay)
+        return delay
+
+    def should_retry(self, attempt: int, elapsed: float = 0.0) -> bool:
+        """Разрешен ли повтор после попытки attempt (с нуля) спустя elapsed секунд"""
+        if attempt + 1 >= self.max_retries:
+            return False
+        return self.max_elapsed is None or elapsed < self.max_elapsed
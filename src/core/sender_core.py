@@ -0,0 +1,134 @@
+from typing import Dict, Any, Optional, Tuple
+from .message import Message, MessageType, DeliveryResult
+from .exceptions import AuthenticationError, RateLimitError, RecipientError
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy
+from .metrics import DELIVERY_METRICS
+from .tracing import span
+from ..utils.logger import get_logger
+import time
+
+class SenderCore:
+    """
+    Общая логика синхронных и асинхронных отправщиков: классификация
+    ошибок, решение о повторе и паузе, учет метрик и спанов.
+    Базовые классы отличаются только ожиданием (time.sleep / asyncio.sleep)
+    и вызовом отправки.
+    """
+
+    # Тип сообщений, обслуживаемый отправщиком
+    message_type: Optional[MessageType] = None
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        rate_limit: Optional[Dict[str, Any]] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
+        self.retry_policy = retry_policy or RetryPolicy.fixed(max_retries, retry_delay)
+        self.max_retries = self.retry_policy.max_retries
+        self.retry_delay = self.retry_policy.base_delay
+        self.logger = get_logger(self.__class__.__name__)
+        self.rate_limiter = RateLimiter.from_config(rate_limit, name=self.provider_name)
+
+    @property
+    def provider_name(self) -> str:
+        """Имя провайдера для логов, ключей ограничителя и метрик"""
+        return self.message_type.value if self.message_type else self.__class__.__name__
+
+    def _send_span(self, message: Message):
+        """Спан всей отправки с повторами"""
+        return span('sender.send', {'provider': self.provider_name, 'message.priority': message.priority.value})
+
+    def _attempt_failed(self, result: DeliveryResult, attempt: int) -> bool:
+        """Учет неудачного ответа; True - повтор бессмысленен"""
+        self.logger.warning("Попытка %d не удалась: %s", attempt + 1, result.error)
+        # Ошибка получателя не исправится повтором
+        return result.error_type == RecipientError.__name__
+
+    def _attempt_error(
+        self,
+        error: Exception,
+        message: Message,
+        attempt: int
+    ) -> Tuple[DeliveryResult, Optional[float], bool]:
+        """
+        Классификация исключения попытки.
+        Возвращает итог, паузу до повтора (None - по политике) и признак остановки.
+        """
+        result = DeliveryResult(
+            success=False, error=str(error), error_type=type(error).__name__, attempts=attempt + 1
+        )
+        if isinstance(error, RateLimitError):
+            self.logger.warning("Попытка %d: превышен лимит провайдера: %s", attempt + 1, error)
+            return result, self._retry_after_delay(error, message.recipient), False
+        if isinstance(error, AuthenticationError):
+            # Повтор с теми же учетными данными бессмысленен
+            self.logger.error("Ошибка аутентификации при попытке %d: %s", attempt + 1, error)
+            return result, None, True
+        self.logger.error("Ошибка при попытке %d: %s", attempt + 1, error)
+        return result, None, False
+
+    def _next_delay(self, attempt: int, start_time: float, delay: Optional[float]) -> Optional[float]:
+        """Пауза перед следующей попыткой; None - попытки закончены"""
+        policy = self.retry_policy
+        if not policy.inline or not policy.should_retry(attempt, time.time() - start_time):
+            return None
+        return policy.compute_delay(attempt) if delay is None else delay
+
+    def _retry_sleep_span(self, delay: float):
+        """Спан паузы перед повтором"""
+        return span('sender.retry_sleep', {'delay': delay})
+
+    def _delivered(
+        self,
+        send_span,
+        message: Message,
+        result: DeliveryResult,
+        attempt: int,
+        start_time: float,
+        record_metrics: bool = True
+    ) -> DeliveryResult:
+        """Итог успешной попытки"""
+        result.delivery_time = time.time() - start_time
+        send_span.set_attribute('attempts', attempt + 1)
+        if record_metrics:
+            self._record_metrics(message, result, attempt + 1)
+        return result
+
+    def _undelivered(
+        self,
+        send_span,
+        message: Message,
+        result: DeliveryResult,
+        attempt: int,
+        start_time: float,
+        record_metrics: bool = True
+    ) -> DeliveryResult:
+        """Итог после исчерпания или прекращения попыток"""
+        send_span.set_attribute('attempts', attempt + 1)
+        send_span.set_attribute('error.type', result.error_type or 'error')
+        result.timestamp = time.time()
+        if record_metrics:
+            self._record_metrics(message, result, attempt + 1, result.timestamp - start_time)
+        return result
+
+    def _record_metrics(
+        self,
+        message: Message,
+        result: DeliveryResult,
+        attempts: int,
+        elapsed: Optional[float] = None
+    ):
+        """Учет итога отправки в метриках доставки"""
+        DELIVERY_METRICS.record_delivery(self.provider_name, message, result, attempts, elapsed)
+
+    def _retry_after_delay(self, error: RateLimitError, recipient: Optional[str] = None) -> Optional[float]:
+        """Пауза перед повтором по Retry-After от провайдера (None - по политике)"""
+        if not error.retry_after:
+            return None
+        if self.rate_limiter and self.rate_limiter.penalize(error.retry_after, recipient):
+            # Ожидание выполнит ограничитель перед следующей попыткой
+            return 0.0
+        return error.retry_after
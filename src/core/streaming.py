@@ -0,0 +1,146 @@
+import csv
+import queue
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional
+
+from .concurrency import ProviderWorkerPool
+from .message import Message, MessageType
+from ..utils.logger import get_logger
+
+
+class BroadcastOutcome(NamedTuple):
+    """Итог отправки одного сообщения потоковой рассылки"""
+    index: int
+    message_type: Optional[str]
+    recipient: str
+    success: bool
+
+
+class OutcomeWriter:
+    """Запись итогов рассылки в компактный TSV-файл: индекс, канал, получатель, 1|0"""
+
+    def __init__(self, path: str, buffer_size: int = 64 * 1024):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8', newline='', buffering=buffer_size)
+        self._writer = csv.writer(self._file, delimiter='\t', lineterminator='\n')
+
+    def write(self, outcome: BroadcastOutcome):
+        self._writer.writerow((outcome.index, outcome.message_type or '', outcome.recipient, int(outcome.success)))
+
+    def close(self):
+        self._file.close()
+
+
+def read_outcomes(path: str) -> Iterator[BroadcastOutcome]:
+    """Чтение итогов рассылки из файла OutcomeWriter"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for index, message_type, recipient, success in csv.reader(f, delimiter='\t'):
+            yield BroadcastOutcome(int(index), message_type or None, recipient, success == '1')
+
+
+class BroadcastStream:
+    """
+    Потоковая рассылка по произвольному итератору сообщений.
+
+    Одновременно в работе не больше window сообщений: следующее сообщение
+    берется из итератора только после завершения одного из текущих.
+    Итоги выдаются по мере готовности (не в исходном порядке), в памяти
+    остаются только счетчики, а построчные итоги при необходимости
+    записываются в файл results_path.
+    """
+
+    def __init__(
+        self,
+        messages: Iterable[Message],
+        send: Callable[[Message, float], bool],
+        pool: ProviderWorkerPool,
+        lane: Callable[[Message], Optional[MessageType]],
+        window: int = 1000,
+        results_path: Optional[str] = None
+    ):
+        if window < 1:
+            raise ValueError("Окно рассылки должно быть положительным")
+        self.window = window
+        self.results_path = results_path
+        self.logger = get_logger(self.__class__.__name__)
+        self._messages = messages
+        self._send = send
+        self._pool = pool
+        self._lane = lane
+        self._started = False
+        self.total = 0
+        self.successful = 0
+        self.failed = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Текущие счетчики рассылки"""
+        return {'total': self.total, 'successful': self.successful, 'failed': self.failed}
+
+    def run(self) -> Dict[str, int]:
+        """Выполнение рассылки целиком; возвращает итоговые счетчики"""
+        for _ in self:
+            pass
+        return self.stats
+
+    def __iter__(self) -> Iterator[BroadcastOutcome]:
+        if self._started:
+            raise RuntimeError("Потоковая рассылка может быть выполнена только один раз")
+        self._started = True
+
+        writer = OutcomeWriter(self.results_path) if self.results_path else None
+        completed: 'queue.SimpleQueue' = queue.SimpleQueue()
+        in_flight = set()
+        messages = enumerate(self._messages)
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(in_flight) < self.window:
+                    item = next(messages, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    in_flight.add(self._submit(item[0], item[1], completed))
+
+                if not in_flight:
+                    break
+
+                index, message, future = completed.get()
+                in_flight.discard(future)
+                outcome = self._complete(index, message, future)
+                if writer is not None:
+                    writer.write(outcome)
+                yield outcome
+        finally:
+            # При досрочном закрытии итератора неначатые отправки отменяются
+            for future in in_flight:
+                future.cancel()
+            self._pool.shutdown()
+            if writer is not None:
+                writer.close()
+
+    def _submit(self, index: int, message: Message, completed: 'queue.SimpleQueue') -> Future:
+        future = self._pool.submit(self._lane(message), self._send, message, time.monotonic())
+        future.add_done_callback(lambda done: completed.put((index, message, done)))
+        return future
+
+    def _complete(self, index: int, message: Message, future: Future) -> BroadcastOutcome:
+        success = False
+        if not future.cancelled():
+            try:
+                success = bool(future.result())
+            except Exception as e:
+                self.logger.error("Ошибка при потоковой отправке: %s", e)
+
+        self.total += 1
+        if success:
+            self.successful += 1
+        else:
+            self.failed += 1
+        return BroadcastOutcome(
+            index,
+            message.message_type.value if message.message_type else None,
+            message.recipient,
+            success
+        )
@@ -0,0 +1,149 @@
+import threading
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import yaml
+
+from .message import MessageType
+from .exceptions import ConfigurationError, ValidationError
+from ..utils.logger import get_logger
+
+
+def _import_jinja2():
+    """jinja2 импортируется при первой компиляции шаблона, а не при импорте модуля"""
+    try:
+        import jinja2
+    except ImportError:  # pragma: no cover - jinja2 указан в requirements
+        raise ConfigurationError("Для шаблонов сообщений требуется пакет jinja2") from None
+    return jinja2
+
+
+# Формат варианта канала по умолчанию: HTML для parse_mode Telegram и писем
+CHANNEL_FORMATS = {
+    MessageType.SMS: 'text',
+    MessageType.TELEGRAM: 'html',
+    MessageType.EMAIL: 'html',
+}
+
+# Поля определения шаблона; секции с именами каналов задают варианты
+_FIELDS = frozenset({'subject', 'body', 'format'})
+
+
+class RenderedContent(NamedTuple):
+    """Результат рендеринга шаблона для канала"""
+    subject: Optional[str]
+    body: str
+    content_format: str
+
+
+class CompiledVariant(NamedTuple):
+    """Скомпилированный вариант шаблона для одного канала"""
+    subject: Optional[Any]
+    body: Any
+    content_format: str
+
+
+class TemplateRegistry:
+    """
+    Реестр шаблонов сообщений с вариантами по каналам.
+
+    Шаблон компилируется один раз при регистрации для каждого канала;
+    отправка только рендерит готовый вариант с переменными получателя.
+    Вариант канала (секция sms/telegram/email) дополняет общие поля шаблона.
+    """
+
+    def __init__(self, templates: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.logger = get_logger(self.__class__.__name__)
+        # Окружения jinja2 создаются при регистрации первого шаблона
+        self._jinja2 = None
+        self._environments: Dict[str, Any] = {}
+        self._compiled: Dict[Tuple[str, MessageType], CompiledVariant] = {}
+        self._lock = threading.Lock()
+        for template_id, definition in (templates or {}).items():
+            self.register(template_id, definition)
+
+    @classmethod
+    def from_config(cls, templates_cfg: Optional[Dict[str, Any]]) -> 'TemplateRegistry':
+        """Создание реестра из секции templates (файл шаблонов и/или определения inline)"""
+        templates_cfg = templates_cfg or {}
+        definitions = dict(templates_cfg.get('inline') or {})
+
+        path = templates_cfg.get('file')
+        if path:
+            path = Path(path)
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    definitions.update(yaml.safe_load(f) or {})
+            else:
+                get_logger(cls.__name__).warning("Файл шаблонов %s не найден", path)
+
+        return cls(definitions)
+
+    def __contains__(self, template_id: str) -> bool:
+        return (template_id, MessageType.SMS) in self._compiled
+
+    def register(self, template_id: str, definition: Dict[str, Any]):
+        """Регистрация (или замена) шаблона с компиляцией всех вариантов"""
+        channels = {msg_type.value: msg_type for msg_type in MessageType}
+        unknown = set(definition) - _FIELDS - set(channels)
+        if unknown:
+            raise ConfigurationError(f"Неизвестные поля шаблона {template_id}: {sorted(unknown)}")
+
+        jinja2 = self._load_jinja2()
+        base = {key: definition[key] for key in _FIELDS if key in definition}
+        compiled = {}
+        for msg_type in MessageType:
+            variant = definition.get(msg_type.value)
+            fields = dict(base, **variant) if variant else base
+            if 'body' not in fields:
+                raise ConfigurationError(f"Шаблон {template_id} не содержит body для канала {msg_type.value}")
+            content_format = fields.get('format') or (CHANNEL_FORMATS[msg_type] if variant else 'text')
+            try:
+                compiled[(template_id, msg_type)] = self._compile(msg_type, fields, content_format)
+            except jinja2.TemplateSyntaxError as e:
+                raise ConfigurationError(f"Ошибка синтаксиса шаблона {template_id}: {e}") from e
+
+        with self._lock:
+            self._compiled.update(compiled)
+
+    def render(
+        self,
+        template_id: str,
+        message_type: MessageType,
+        variables: Optional[Dict[str, Any]] = None
+    ) -> RenderedContent:
+        """Рендеринг варианта шаблона для канала"""
+        variant = self._compiled.get((template_id, message_type))
+        if variant is None:
+            raise ValidationError(f"Шаблон {template_id} не найден")
+
+        variables = variables or {}
+        try:
+            subject = variant.subject.render(variables) if variant.subject is not None else None
+            body = variant.body.render(variables)
+        except self._jinja2.TemplateError as e:
+            raise ValidationError(f"Ошибка рендеринга шаблона {template_id}: {e}") from e
+        return RenderedContent(subject, body, variant.content_format)
+
+    def _load_jinja2(self):
+        if self._jinja2 is None:
+            jinja2 = _import_jinja2()
+            options = dict(undefined=jinja2.StrictUndefined, trim_blocks=True, lstrip_blocks=True)
+            self._environments = {
+                'text': jinja2.Environment(autoescape=False, **options),
+                'html': jinja2.Environment(autoescape=True, **options),
+            }
+            self._jinja2 = jinja2
+        return self._jinja2
+
+    def _compile(self, msg_type: MessageType, fields: Dict[str, Any], content_format: str) -> CompiledVariant:
+        if content_format not in self._environments:
+            raise ConfigurationError(f"Неизвестный формат шаблона: {content_format}")
+        body = self._environments[content_format].from_string(fields['body'])
+
+        subject = None
+        if fields.get('subject'):
+            # Тема письма - заголовок, HTML-экранирование нужно только для Telegram
+            escaped = content_format == 'html' and msg_type == MessageType.TELEGRAM
+            subject = self._environments['html' if escaped else 'text'].from_string(fields['subject'])
+        return CompiledVariant(subject, body, content_format)
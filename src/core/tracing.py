@@ -0,0 +1,249 @@
+import os
+import json
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from .exceptions import ConfigurationError
+from ..utils.logger import get_logger
+
+# Текущий спан потока или задачи asyncio (родитель для вложенных стадий)
+_current_span: ContextVar[Optional['Span']] = ContextVar('message_delivery_span', default=None)
+
+# Коды статуса спана OTLP
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+
+class _NoopSpan:
+    """Спан-заглушка: вход, выход и атрибуты ничего не делают"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """Стадия отправки: имя, интервал времени, атрибуты и связь с родительским спаном"""
+
+    __slots__ = (
+        'name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns',
+        'attributes', 'status', 'status_message', '_tracer', '_token',
+    )
+
+    def __init__(self, tracer: 'RecordingTracer', name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = STATUS_UNSET
+        self.status_message = None
+        self.start_ns = 0
+        self.end_ns = 0
+        self._tracer = tracer
+        self._token = None
+        parent = _current_span.get()
+        self.trace_id = parent.trace_id if parent else '%032x' % random.getrandbits(128)
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = '%016x' % random.getrandbits(64)
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> 'Span':
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.status = STATUS_ERROR
+            self.status_message = f"{exc_type.__name__}: {exc_value}"
+        self._tracer.export(self)
+        return False
+
+    @property
+    def duration(self) -> float:
+        """Длительность стадии, сек"""
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+class Tracer:
+    """
+    Трассировщик по умолчанию: спаны не создаются.
+    Стоимость стадии - вызов span() и вход/выход общего объекта-заглушки.
+    """
+
+    enabled = False
+
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        return NOOP_SPAN
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()]
+
+
+class FileSpanExporter:
+    """
+    Запись спанов в локальный файл в формате OTLP/JSON: каждая строка -
+    ExportTraceServiceRequest с пачкой спанов (читается, например,
+    приемником otlpjson OpenTelemetry Collector). Спаны накапливаются
+    до batch_size и записываются одной строкой.
+    """
+
+    def __init__(self, path: str, service_name: str = 'message-delivery-system', batch_size: int = 256):
+        self.path = path.replace('{pid}', str(os.getpid()))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.batch_size = batch_size
+        self._resource = {'attributes': _otlp_attributes({'service.name': service_name, 'process.pid': os.getpid()})}
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        record = {
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': 1,
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(span.end_ns),
+            'attributes': _otlp_attributes(span.attributes),
+            'status': {'code': span.status},
+        }
+        if span.parent_id:
+            record['parentSpanId'] = span.parent_id
+        if span.status_message:
+            record['status']['message'] = span.status_message
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self._write()
+
+    def _write(self):
+        if not self._buffer or self._file.closed:
+            return
+        spans, self._buffer = self._buffer, []
+        request = {'resourceSpans': [{
+            'resource': self._resource,
+            'scopeSpans': [{'scope': {'name': 'message_delivery'}, 'spans': spans}],
+        }]}
+        self._file.write(json.dumps(request, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._file.flush()
+
+    def flush(self):
+        with self._lock:
+            self._write()
+
+    def close(self):
+        with self._lock:
+            self._write()
+            self._file.close()
+
+
+class RecordingTracer(Tracer):
+    """Трассировщик, передающий завершенные спаны экспортеру"""
+
+    enabled = True
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+        self.logger = get_logger(self.__class__.__name__)
+
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Span:
+        return Span(self, name, attributes)
+
+    def export(self, span: Span):
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            self.logger.warning("Ошибка экспорта спана %s: %s", span.name, e)
+
+    def flush(self):
+        self.exporter.flush()
+
+    def close(self):
+        self.exporter.close()
+
+
+class InMemorySpanExporter:
+    """Накопление завершенных спанов в списке (для тестов и отладки)"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+_tracer: Tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Tracer:
+    """Установка трассировщика процесса; возвращает предыдущий"""
+    global _tracer
+    previous, _tracer = _tracer, tracer or Tracer()
+    return previous
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Спан стадии отправки у текущего трассировщика (по умолчанию - заглушка)"""
+    return _tracer.span(name, attributes)
+
+
+def tracer_from_config(config: Optional[Dict[str, Any]]) -> Tracer:
+    """Трассировщик по секции tracing конфигурации (exporter: none | file)"""
+    config = config or {}
+    exporter = config.get('exporter', 'none')
+    if exporter in (None, 'none'):
+        return Tracer()
+    if exporter == 'file':
+        return RecordingTracer(FileSpanExporter(
+            config.get('file', 'logs/spans_{pid}.jsonl'),
+            service_name=config.get('service_name', 'message-delivery-system'),
+            batch_size=int(config.get('batch_size', 256))
+        ))
+    raise ConfigurationError(f"Неизвестный экспортер трассировки: {exporter}")
@@ -0,0 +1,214 @@
+import asyncio
+import time
+from typing import List, Optional
+
+from ..core.async_base_sender import AsyncBaseMessageSender
+from ..core.message import Message, MessageType, DeliveryResult
+from ..core.exceptions import AuthenticationError, ConfigurationError, RecipientError, ValidationError
+from ..core.tracing import span
+from .attachment_cache import AttachmentCache
+from .email_sender import build_email
+from .mime_stream import attachments_size
+from .smtp_pool import SMTPSession
+from ..utils.logger import get_logger
+
+try:
+    import aiosmtplib
+except ImportError:  # pragma: no cover - опциональная зависимость
+    aiosmtplib = None
+
+class AsyncSMTPConnectionPool:
+    """Ограниченный пул аутентифицированных aiosmtplib-сессий"""
+    
+    def __init__(
+        self,
+        connect,
+        size: int = 4,
+        max_messages_per_session: int = 100,
+        health_check_interval: float = 30.0
+    ):
+        self._connect = connect
+        self.size = size
+        self.max_messages_per_session = max_messages_per_session
+        self.health_check_interval = health_check_interval
+        self.logger = get_logger(self.__class__.__name__)
+        
+        self._idle: List[SMTPSession] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+    
+    async def sendmail(self, from_addr: str, to_addrs: List[str], msg: str):
+        """Отправка письма через сессию из пула с переподключением при разрыве"""
+        async with self._semaphore():
+            for attempt in range(2):
+                session = await self._acquire()
+                try:
+                    response = await session.connection.sendmail(from_addr, to_addrs, msg)
+                except aiosmtplib.SMTPServerDisconnected:
+                    session.connection.close()
+                    if attempt:
+                        raise
+                    self.logger.info("SMTP-сессия закрыта сервером, переподключение")
+                    continue
+                except BaseException:
+                    session.connection.close()
+                    raise
+                
+                session.messages_sent += 1
+                await self._release(session)
+                return response
+    
+    async def warm(self):
+        """Открытие сессии заранее; ошибки подключения пробрасываются"""
+        async with self._semaphore():
+            await self._release(await self._acquire())
+    
+    async def close(self):
+        """Закрытие всех простаивающих сессий"""
+        idle, self._idle = self._idle, []
+        for session in idle:
+            await self._quit(session)
+    
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Семафор создается внутри работающего event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        return self._slots
+    
+    async def _acquire(self) -> SMTPSession:
+        while self._idle:
+            session = self._idle.pop()
+            if time.monotonic() - session.last_used < self.health_check_interval:
+                return session
+            try:
+                if (await session.connection.noop()).code == 250:
+                    return session
+            except Exception:
+                pass
+            session.connection.close()
+        return SMTPSession(await self._connect())
+    
+    async def _release(self, session: SMTPSession):
+        if session.messages_sent >= self.max_messages_per_session:
+            await self._quit(session)
+        else:
+            session.last_used = time.monotonic()
+            self._idle.append(session)
+    
+    @staticmethod
+    async def _quit(session: SMTPSession):
+        try:
+            await session.connection.quit()
+        except Exception:
+            session.connection.close()
+
+class AsyncEmailSender(AsyncBaseMessageSender):
+    """Асинхронный отправщик email сообщений"""
+    
+    message_type = MessageType.EMAIL
+    
+    def __init__(
+        self,
+        smtp_server: str,
+        port: int,
+        username: str,
+        password: str,
+        use_tls: bool = True,
+        use_ssl: Optional[bool] = None,
+        timeout: int = 30,
+        pool_size: int = 4,
+        max_messages_per_session: int = 100,
+        health_check_interval: float = 30.0,
+        attachment_cache_mb: float = 64,
+        stream_threshold_mb: float = 5,
+        **kwargs
+    ):
+        if aiosmtplib is None:
+            raise ConfigurationError("Для AsyncEmailSender требуется пакет aiosmtplib")
+        
+        super().__init__(**kwargs)
+        self.smtp_server = smtp_server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = not use_tls if use_ssl is None else use_ssl
+        self.timeout = timeout
+        self.pool = AsyncSMTPConnectionPool(
+            self._connect,
+            size=pool_size,
+            max_messages_per_session=max_messages_per_session,
+            health_check_interval=health_check_interval
+        )
+        self.attachment_cache = AttachmentCache(max_bytes=int(attachment_cache_mb * 1024 * 1024))
+        self.stream_threshold = int(stream_threshold_mb * 1024 * 1024)
+    
+    async def send(self, message: Message) -> DeliveryResult:
+        """Отправка email"""
+        if message.message_type != MessageType.EMAIL:
+            raise ValidationError("Некорректный тип сообщения для AsyncEmailSender")
+        
+        return await self._execute_with_retry(self._send_email, message)
+    
+    async def _send_email(self, message: Message) -> DeliveryResult:
+        """Внутренняя логика отправки email"""
+        result = DeliveryResult(success=False, attempts=1)
+        
+        try:
+            # aiosmtplib передает DATA одним блоком, поэтому крупные вложения не отправляются
+            # потоково, но кодируются без кеша и не вытесняют из него вложения рассылок
+            cache = self.attachment_cache
+            if message.attachments and attachments_size(message.attachments) >= self.stream_threshold:
+                cache = None
+            with span('email.build_mime'):
+                data = build_email(self.username, message, self.logger, cache).as_string()
+            
+            with span('smtp.sendmail'):
+                server_response = await self.pool.sendmail(self.username, [message.recipient], data)
+            
+            result.success = True
+            result.provider_response = {"smtp_response": str(server_response)}
+            
+        except aiosmtplib.SMTPAuthenticationError as e:
+            result.error = f"Ошибка аутентификации: {e}"
+            raise AuthenticationError(result.error) from e
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            result.error = f"Получатель отклонен сервером: {e}"
+            result.error_type = RecipientError.__name__
+        except Exception as e:
+            result.error = f"Ошибка отправки email: {e}"
+            
+        return result
+    
+    async def _connect(self) -> 'aiosmtplib.SMTP':
+        """Открытие нового аутентифицированного SMTP-соединения"""
+        client = aiosmtplib.SMTP(
+            hostname=self.smtp_server,
+            port=self.port,
+            use_tls=self.use_ssl,
+            start_tls=self.use_tls and not self.use_ssl,
+            timeout=self.timeout
+        )
+        # connect включает TLS-рукопожатие (SSL или STARTTLS)
+        with span('smtp.connect', {'server.address': self.smtp_server, 'server.port': self.port, 'smtp.ssl': self.use_ssl}):
+            await client.connect()
+        try:
+            with span('smtp.login'):
+                await client.login(self.username, self.password)
+        except BaseException:
+            client.close()
+            raise
+        return client
+    
+    async def validate_credentials(self) -> bool:
+        """Проверка учетных данных SMTP"""
+        try:
+            # Проверенная сессия остается в пуле для последующих отправок
+            await self.pool.warm()
+            return True
+        except Exception as e:
+            self.logger.error("Ошибка валидации учетных данных: %s", e)
+            return False
+    
+    async def close(self):
+        """Закрытие пула SMTP-сессий"""
+        await self.pool.close()
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Optional
+
+from ..core.async_base_sender import AsyncBaseMessageSender
+from ..core.message import Message, MessageType, DeliveryResult
+from ..core.exceptions import ConfigurationError, NetworkError, ValidationError
+from ..core.tracing import span
+from ..utils.http import create_aiohttp_session
+from .sms_sender import build_sms_payload, apply_sms_response
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - опциональная зависимость
+    aiohttp = None
+
+class AsyncYandexCloudSMSSender(AsyncBaseMessageSender):
+    """Асинхронный отправщик SMS через Yandex Cloud"""
+    
+    message_type = MessageType.SMS
+    
+    def __init__(
+        self,
+        api_key: str,
+        folder_id: str,
+        sender_id: Optional[str] = None,
+        base_url: str = "https://api.cloud.yandex.net/notification/v1",
+        pool_size: int = 10,
+        pool_block: bool = True,
+        keep_alive: bool = True,
+        **kwargs
+    ):
+        if aiohttp is None:
+            raise ConfigurationError("Для AsyncYandexCloudSMSSender требуется пакет aiohttp")
+        
+        # pool_block не используется: aiohttp всегда ожидает свободное соединение
+        super().__init__(**kwargs)
+        self.api_key = api_key
+        self.folder_id = folder_id
+        self.sender_id = sender_id
+        self.base_url = base_url
+        self.headers = {
+            'Authorization': f'Api-Key {api_key}',
+            'Content-Type': 'application/json'
+        }
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self._session = None
+    
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        """HTTP-сессия, создаваемая при первом обращении внутри event loop"""
+        if self._session is None or self._session.closed:
+            self._session = create_aiohttp_session(
+                pool_size=self.pool_size,
+                keep_alive=self.keep_alive,
+                headers=self.headers
+            )
+        return self._session
+    
+    async def send(self, message: Message) -> DeliveryResult:
+        """Отправка SMS"""
+        if message.message_type != MessageType.SMS:
+            raise ValidationError("Некорректный тип сообщения для AsyncYandexCloudSMSSender")
+        
+        return await self._execute_with_retry(self._send_sms, message)
+    
+    async def _send_sms(self, message: Message) -> DeliveryResult:
+        """Внутренняя логика отправки SMS"""
+        result = DeliveryResult(success=False, attempts=1)
+        
+        try:
+            payload = build_sms_payload(self.folder_id, self.sender_id, message)
+            
+            with span('http.request', {'provider': self.provider_name, 'url.path': '/messages'}) as request_span:
+                async with self.session.post(f"{self.base_url}/messages", json=payload) as response:
+                    request_span.set_attribute('http.status_code', response.status)
+                    response_data = await response.json(content_type=None) if response.status == 200 else None
+                    apply_sms_response(
+                        result,
+                        response.status,
+                        response_data,
+                        await response.text(),
+                        response.headers.get('Retry-After')
+                    )
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            result.error = f"Сетевая ошибка: {e}"
+            result.error_type = NetworkError.__name__
+            
+        return result
+    
+    async def validate_credentials(self) -> bool:
+        """Проверка валидности API ключа"""
+        try:
+            async with self.session.get(f"{self.base_url}/senders") as response:
+                return response.status == 200
+        except Exception:
+            return False
+    
+    async def close(self):
+        """Закрытие пула HTTP-соединений"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,91 @@
+import asyncio
+
+from ..core.async_base_sender import AsyncBaseMessageSender
+from ..core.message import Message, MessageType, DeliveryResult
+from ..core.exceptions import ConfigurationError, NetworkError, ValidationError
+from ..core.tracing import span
+from ..utils.http import create_aiohttp_session
+from .telegram_sender import build_telegram_payload, apply_telegram_response
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - опциональная зависимость
+    aiohttp = None
+
+class AsyncTelegramSender(AsyncBaseMessageSender):
+    """Асинхронный отправщик сообщений в Telegram"""
+    
+    message_type = MessageType.TELEGRAM
+    
+    def __init__(
+        self,
+        bot_token: str,
+        base_url: str = "https://api.telegram.org/bot",
+        timeout: int = 30,
+        pool_size: int = 10,
+        pool_block: bool = True,
+        keep_alive: bool = True,
+        **kwargs
+    ):
+        if aiohttp is None:
+            raise ConfigurationError("Для AsyncTelegramSender требуется пакет aiohttp")
+        
+        # pool_block не используется: aiohttp всегда ожидает свободное соединение
+        super().__init__(**kwargs)
+        self.bot_token = bot_token
+        self.base_url = f"{base_url}{bot_token}"
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self._session = None
+    
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        """HTTP-сессия, создаваемая при первом обращении внутри event loop"""
+        if self._session is None or self._session.closed:
+            self._session = create_aiohttp_session(
+                pool_size=self.pool_size,
+                keep_alive=self.keep_alive,
+                timeout=self.timeout
+            )
+        return self._session
+    
+    async def send(self, message: Message) -> DeliveryResult:
+        """Отправка сообщения в Telegram"""
+        if message.message_type != MessageType.TELEGRAM:
+            raise ValidationError("Некорректный тип сообщения для AsyncTelegramSender")
+        
+        return await self._execute_with_retry(self._send_telegram, message)
+    
+    async def _send_telegram(self, message: Message) -> DeliveryResult:
+        """Внутренняя логика отправки в Telegram"""
+        result = DeliveryResult(success=False, attempts=1)
+        
+        try:
+            payload = build_telegram_payload(message)
+            
+            with span('http.request', {'provider': self.provider_name, 'url.path': '/sendMessage'}) as request_span:
+                async with self.session.post(f"{self.base_url}/sendMessage", json=payload) as response:
+                    request_span.set_attribute('http.status_code', response.status)
+                    apply_telegram_response(result, await response.json(content_type=None))
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            result.error = f"Сетевая ошибка: {e}"
+            result.error_type = NetworkError.__name__
+            
+        return result
+    
+    async def validate_credentials(self) -> bool:
+        """Проверка валидности токена бота"""
+        try:
+            async with self.session.get(f"{self.base_url}/getMe") as response:
+                data = await response.json(content_type=None)
+            return data.get('ok', False)
+        except Exception:
+            return False
+    
+    async def close(self):
+        """Закрытие пула HTTP-соединений"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
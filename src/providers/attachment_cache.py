@@ -0,0 +1,103 @@
+import base64
+import os
+import threading
+from collections import OrderedDict
+from email import encoders
+from email.mime.application import MIMEApplication
+from typing import NamedTuple, Optional, Tuple
+from ..utils.logger import get_logger
+
+# Ключ записи: путь, время изменения и размер файла
+CacheKey = Tuple[str, int, int]
+
+
+class EncodedAttachment(NamedTuple):
+    """Вложение, уже закодированное в base64 для MIME"""
+    filename: str
+    encoded: str
+
+    def to_mime(self) -> MIMEApplication:
+        """Новая MIME-часть поверх общего закодированного содержимого"""
+        part = MIMEApplication(b'', _encoder=encoders.encode_noop, Name=self.filename)
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.set_payload(self.encoded)
+        part['Content-Disposition'] = f'attachment; filename="{self.filename}"'
+        return part
+
+
+class AttachmentCache:
+    """
+    LRU-кеш закодированных вложений с ограничением по объему.
+
+    Файл читается и кодируется один раз: последующие письма с тем же
+    вложением собирают только заголовки вокруг общей закодированной части.
+    Изменение файла (mtime или размер) дает новый ключ, устаревшая запись
+    вытесняется по LRU.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.logger = get_logger(self.__class__.__name__)
+        self._entries: 'OrderedDict[CacheKey, EncodedAttachment]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """Текущий объем закодированных данных в байтах"""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: str) -> EncodedAttachment:
+        """Закодированное вложение из кеша или с диска"""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            attachment = self._entries.get(key)
+            if attachment is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return attachment
+            self.misses += 1
+
+        attachment = encode_attachment(path)
+        self._store(key, attachment)
+        return attachment
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _store(self, key: CacheKey, attachment: EncodedAttachment):
+        size = len(attachment.encoded)
+        if size > self.max_bytes:
+            # Вложения больше бюджета не кешируются, чтобы не вытеснять остальные
+            return
+
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = attachment
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.encoded)
+
+
+def encode_attachment(path: str) -> EncodedAttachment:
+    """Чтение и base64-кодирование вложения"""
+    with open(path, 'rb') as file:
+        encoded = base64.encodebytes(file.read()).decode('ascii')
+    return EncodedAttachment(os.path.basename(path), encoded)
+
+
+def attachment_part(path: str, cache: Optional[AttachmentCache] = None) -> MIMEApplication:
+    """MIME-часть вложения, при наличии кеша - поверх закодированной копии"""
+    attachment = cache.get(path) if cache is not None else encode_attachment(path)
+    return attachment.to_mime()
@@ -1,18 +1,53 @@
 import smtplib
 import time
-from email.mime.text import MimeText
-from email.mime.multipart import MimeMultipart
-from email.mime.application import MimeApplication
-from typing import Optional, List
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from typing import Dict, Optional, List
 import logging
 
 from ..core.base_sender import BaseMessageSender
 from ..core.message import Message, MessageType, DeliveryResult
-from ..core.exceptions import AuthenticationError, ValidationError
+from ..core.exceptions import AuthenticationError, RecipientError, ValidationError
+from ..core.tracing import span
+from .smtp_pool import SMTPConnectionPool
+from .attachment_cache import AttachmentCache, attachment_part
+from .mime_stream import attachments_size, email_bytes, iter_email_chunks
+
+# Заголовок To письма нескольким получателям: адреса видны только в RCPT TO (как BCC)
+GROUP_TO_HEADER = "undisclosed-recipients:;"
+
+def build_email(
+    from_addr: str,
+    message: Message,
+    logger: logging.Logger,
+    attachment_cache: Optional[AttachmentCache] = None,
+    to_header: Optional[str] = None
+) -> MIMEMultipart:
+    """Сборка MIME-письма с текстом и вложениями"""
+    msg = MIMEMultipart()
+    msg['From'] = from_addr
+    msg['To'] = to_header or message.recipient
+    msg['Subject'] = message.subject or "No Subject"
+    
+    # Добавление текста
+    msg.attach(MIMEText(message.content, 'html' if message.content_format == 'html' else 'plain'))
+    
+    # Добавление вложений
+    if message.attachments:
+        for attachment_path in message.attachments:
+            try:
+                with span('email.attachment', {'file.path': attachment_path}):
+                    msg.attach(attachment_part(attachment_path, attachment_cache))
+            except Exception as e:
+                logger.warning("Не удалось прикрепить файл %s: %s", attachment_path, e)
+    
+    return msg
 
 class EmailSender(BaseMessageSender):
     """Отправщик email сообщений"""
     
+    message_type = MessageType.EMAIL
+    
     def __init__(
         self,
         smtp_server: str,
@@ -20,7 +55,13 @@ class EmailSender(BaseMessageSender):
         username: str,
         password: str,
         use_tls: bool = True,
+        use_ssl: Optional[bool] = None,
         timeout: int = 30,
+        pool_size: int = 4,
+        max_messages_per_session: int = 100,
+        health_check_interval: float = 30.0,
+        attachment_cache_mb: float = 64,
+        stream_threshold_mb: float = 5,
         **kwargs
     ):
         super().__init__(**kwargs)
@@ -29,7 +70,18 @@ class EmailSender(BaseMessageSender):
         self.username = username
         self.password = password
         self.use_tls = use_tls
+        # По умолчанию без STARTTLS используется SMTP поверх SSL
+        self.use_ssl = not use_tls if use_ssl is None else use_ssl
         self.timeout = timeout
+        self.pool = SMTPConnectionPool(
+            self._connect,
+            size=pool_size,
+            max_messages_per_session=max_messages_per_session,
+            health_check_interval=health_check_interval
+        )
+        self.attachment_cache = AttachmentCache(max_bytes=int(attachment_cache_mb * 1024 * 1024))
+        # Письма с вложениями крупнее порога отправляются потоково, без сборки в памяти
+        self.stream_threshold = int(stream_threshold_mb * 1024 * 1024)
         
     def send(self, message: Message) -> DeliveryResult:
         """Отправка email"""
@@ -43,39 +95,21 @@ class EmailSender(BaseMessageSender):
         result = DeliveryResult(success=False, attempts=1)
         
         try:
-            # Создание сообщения
-            msg = MimeMultipart()
-            msg['From'] = self.username
-            msg['To'] = message.recipient
-            msg['Subject'] = message.subject or "No Subject"
-            
-            # Добавление текста
-            msg.attach(MimeText(message.content, 'plain'))
-            
-            # Добавление вложений
-            if message.attachments:
-                for attachment_path in message.attachments:
-                    try:
-                        with open(attachment_path, 'rb') as file:
-                            part = MimeApplication(
-                                file.read(),
-                                Name=attachment_path.split('/')[-1]
-                            )
-                        part['Content-Disposition'] = f'attachment; filename="{attachment_path.split("/")[-1]}"'
-                        msg.attach(part)
-                    except Exception as e:
-                        self.logger.warning(f"Не удалось прикрепить файл {attachment_path}: {e}")
-            
-            # Отправка
-            if self.use_tls:
-                server = smtplib.SMTP(self.smtp_server, self.port, timeout=self.timeout)
-                server.starttls()
+            if message.attachments and attachments_size(message.attachments) >= self.stream_threshold:
+                # Сборка MIME и чтение вложений идут по ходу передачи DATA
+                with span('smtp.sendmail', {'smtp.streaming': True}):
+                    server_response = self.pool.sendmail_stream(
+                        self.username,
+                        message.recipient,
+                        lambda: iter_email_chunks(self.username, message, self.logger)
+                    )
             else:
-                server = smtplib.SMTP_SSL(self.smtp_server, self.port, timeout=self.timeout)
-            
-            server.login(self.username, self.password)
-            server_response = server.sendmail(self.username, message.recipient, msg.as_string())
-            server.quit()
+                with span('email.build_mime'):
+                    data = build_email(self.username, message, self.logger, self.attachment_cache).as_string()
+                
+                # Отправка через сессию из пула
+                with span('smtp.sendmail'):
+                    server_response = self.pool.sendmail(self.username, message.recipient, data)
             
             result.success = True
             result.provider_response = {"smtp_response": str(server_response)}
@@ -83,24 +117,199 @@ class EmailSender(BaseMessageSender):
         except smtplib.SMTPAuthenticationError as e:
             result.error = f"Ошибка аутентификации: {e}"
             raise AuthenticationError(result.error) from e
+        except smtplib.SMTPRecipientsRefused as e:
+            result.error = f"Получатель отклонен сервером: {e}"
+            result.error_type = RecipientError.__name__
         except Exception as e:
             result.error = f"Ошибка отправки email: {e}"
             
         return result
     
-    def validate_credentials(self) -> bool:
-        """Проверка учетных данных SMTP"""
+    def send_batch(self, messages: List[Message]) -> List[DeliveryResult]:
+        """
+        Отправка разных писем подряд через одну SMTP-сессию
+        (с ESMTP PIPELINING, если сервер его поддерживает).
+        При разрыве соединения отправка продолжается с первого неподтвержденного
+        письма; письма с временной ошибкой повторяются по политике retry.
+        """
+        results: List[Optional[DeliveryResult]] = [None] * len(messages)
+        items = []
+        positions = []
+        for position, message in enumerate(messages):
+            if message.message_type != MessageType.EMAIL:
+                raise ValidationError("Некорректный тип сообщения для EmailSender")
+            if message.attachments and attachments_size(message.attachments) >= self.stream_threshold:
+                # Крупные вложения отправляются потоково вне пакета
+                results[position] = self.send(message)
+                continue
+            if self.rate_limiter:
+                self.rate_limiter.acquire(message.recipient)
+            with span('email.build_mime'):
+                data = email_bytes(build_email(self.username, message, self.logger, self.attachment_cache))
+            items.append(([message.recipient], data))
+            positions.append(position)
+        
+        if not items:
+            return results
+        
+        start_time = time.time()
+        with span('smtp.sendmail_batch', {'smtp.batch_size': len(items)}):
+            outcomes = self.pool.sendmail_batch(self.username, items)
+        
+        policy = self.retry_policy
+        for position, outcome in zip(positions, outcomes):
+            message = messages[position]
+            result = self._batch_result(outcome)
+            if (not result.success and policy.inline and policy.max_retries > 1
+                    and result.error_type not in (RecipientError.__name__, AuthenticationError.__name__)):
+                # Повтор отдельной отправкой (учитывается в метриках внутри send)
+                result = self.send(message)
+                result.attempts += 1
+            else:
+                result.timestamp = time.time()
+                if result.success:
+                    result.delivery_time = result.timestamp - start_time
+                self._record_metrics(message, result, 1, result.timestamp - start_time)
+            results[position] = result
+        return results
+    
+    @staticmethod
+    def _batch_result(outcome) -> DeliveryResult:
+        """Результат доставки по итогу письма пакета"""
+        if isinstance(outcome, smtplib.SMTPRecipientsRefused):
+            return DeliveryResult(
+                success=False,
+                error=f"Получатель отклонен сервером: {outcome}",
+                error_type=RecipientError.__name__
+            )
+        if isinstance(outcome, smtplib.SMTPAuthenticationError):
+            return DeliveryResult(
+                success=False, error=f"Ошибка аутентификации: {outcome}", error_type=AuthenticationError.__name__
+            )
+        if isinstance(outcome, Exception):
+            return DeliveryResult(
+                success=False, error=f"Ошибка отправки email: {outcome}", error_type=type(outcome).__name__
+            )
+        return DeliveryResult(success=True, provider_response={"smtp_response": str(outcome)})
+    
+    def send_group(self, messages: List[Message]) -> List[DeliveryResult]:
+        """
+        Отправка одинаковых писем нескольким получателям одной SMTP-транзакцией
+        (один DATA, по RCPT TO на получателя). Отказы сервера по отдельным
+        адресам отображаются в результаты соответствующих сообщений и
+        учитываются в метриках как неудачные доставки.
+        """
+        for message in messages:
+            if message.message_type != MessageType.EMAIL:
+                raise ValidationError("Некорректный тип сообщения для EmailSender")
+        if len(messages) == 1:
+            return [self.send(messages[0])]
+        
+        results: Optional[List[DeliveryResult]] = None
+        envelope = list(dict.fromkeys(message.recipient for message in messages))
+        
+        def send_transaction(_message: Message) -> DeliveryResult:
+            nonlocal results
+            results = None
+            if self.rate_limiter:
+                # Токен первого адреса списан в _execute_with_retry; транзакция
+                # расходует лимит на каждый адрес RCPT TO
+                with span('sender.rate_limit'):
+                    for recipient in envelope[1:]:
+                        self.rate_limiter.acquire(recipient)
+            results = self._send_group(messages)
+            # Итог транзакции для повторов: успех, если письмо принято хотя бы для одного адреса
+            return next((result for result in results if result.success), results[0])
+        
+        start_time = time.time()
+        summary = self._execute_with_retry(send_transaction, messages[0], record_metrics=False)
+        if results is None:
+            results = [
+                DeliveryResult(success=False, error=summary.error, error_type=summary.error_type)
+                for _ in messages
+            ]
+        # Метрики по получателям: группа из N адресов - N доставок
+        for message, result in zip(messages, results):
+            result.attempts = summary.attempts
+            result.timestamp = summary.timestamp
+            result.delivery_time = summary.delivery_time if result.success else None
+            self._record_metrics(message, result, summary.attempts, summary.timestamp - start_time)
+        return results
+    
+    def _send_group(self, messages: List[Message]) -> List[DeliveryResult]:
+        """Одна SMTP-транзакция для группы писем с общим содержимым"""
+        message = messages[0]
+        recipients = [item.recipient for item in messages]
+        # Повторяющиеся адреса передаются в RCPT TO один раз
+        envelope = list(dict.fromkeys(recipients))
+        
         try:
-            if self.use_tls:
-                server = smtplib.SMTP(self.smtp_server, self.port, timeout=self.timeout)
-                server.starttls()
+            if message.attachments and attachments_size(message.attachments) >= self.stream_threshold:
+                refused = self.pool.sendmail_stream(
+                    self.username,
+                    envelope,
+                    lambda: iter_email_chunks(self.username, message, self.logger, to_header=GROUP_TO_HEADER)
+                )
             else:
+                msg = build_email(self.username, message, self.logger, self.attachment_cache, GROUP_TO_HEADER)
+                refused = self.pool.sendmail(self.username, envelope, msg.as_string())
+        except smtplib.SMTPAuthenticationError as e:
+            raise AuthenticationError(f"Ошибка аутентификации: {e}") from e
+        except smtplib.SMTPRecipientsRefused as e:
+            refused = e.recipients
+        except Exception as e:
+            return [
+                DeliveryResult(success=False, error=f"Ошибка отправки email: {e}")
+                for _ in messages
+            ]
+        
+        return [self._recipient_result(recipient, refused) for recipient in recipients]
+    
+    @staticmethod
+    def _recipient_result(recipient: str, refused: Dict[str, tuple]) -> DeliveryResult:
+        """Результат для адреса группы по словарю отказов sendmail"""
+        if recipient in refused:
+            code, response = refused[recipient]
+            if isinstance(response, bytes):
+                response = response.decode('utf-8', 'replace')
+            return DeliveryResult(
+                success=False,
+                error=f"Получатель отклонен сервером: {code} {response}",
+                error_type=RecipientError.__name__
+            )
+        return DeliveryResult(success=True, provider_response={"smtp_response": "accepted"})
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Открытие нового аутентифицированного SMTP-соединения"""
+        with span('smtp.connect', {'server.address': self.smtp_server, 'server.port': self.port, 'smtp.ssl': self.use_ssl}):
+            if self.use_ssl:
                 server = smtplib.SMTP_SSL(self.smtp_server, self.port, timeout=self.timeout)
-            
-            server.login(self.username, self.password)
-            server.quit()
+            else:
+                server = smtplib.SMTP(self.smtp_server, self.port, timeout=self.timeout)
+        
+        try:
+            if self.use_tls and not self.use_ssl:
+                with span('smtp.starttls'):
+                    server.starttls()
+            with span('smtp.login'):
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def validate_credentials(self) -> bool:
+        """Проверка учетных данных SMTP"""
+        try:
+            # Проверенная сессия остается в пуле для последующих отправок
+            with self.pool.session():
+                pass
             return True
             
         except Exception as e:
-            self.logger.error(f"Ошибка валидации учетных данных: {e}")
+            self.logger.error("Ошибка валидации учетных данных: %s", e)
             return False
+    
+    def close(self):
+        """Закрытие пула SMTP-сессий"""
+        self.pool.close()
@@ -1,34 +1,70 @@
-from typing import Dict, Any, Optional
-from ..core.base_sender import BaseMessageSender
+import importlib
+from typing import Dict, Any, TYPE_CHECKING
 from ..core.message import MessageType
 from ..core.exceptions import ConfigurationError
-from .email_sender import EmailSender
-from .sms_sender import YandexCloudSMSSender
-from .telegram_sender import TelegramSender
+
+if TYPE_CHECKING:  # pragma: no cover - только для анализаторов типов
+    from ..core.base_sender import BaseMessageSender
+    from ..core.async_base_sender import AsyncBaseMessageSender
 
 class SenderFactory:
-    """Фабрика для создания отправщиков сообщений"""
+    """
+    Фабрика для создания отправщиков сообщений.
+    Встроенные отправщики заданы путем 'модуль.Класс' и импортируются при
+    первом создании: канал, который не используется, не загружает свой
+    HTTP/SMTP-клиент, а синхронная отправка - aiohttp.
+    """
     
     _senders = {
-        MessageType.EMAIL: EmailSender,
-        MessageType.SMS: YandexCloudSMSSender,
-        MessageType.TELEGRAM: TelegramSender
+        MessageType.EMAIL: 'email_sender.EmailSender',
+        MessageType.SMS: 'sms_sender.YandexCloudSMSSender',
+        MessageType.TELEGRAM: 'telegram_sender.TelegramSender'
+    }
+    
+    _async_senders = {
+        MessageType.EMAIL: 'async_email_sender.AsyncEmailSender',
+        MessageType.SMS: 'async_sms_sender.AsyncYandexCloudSMSSender',
+        MessageType.TELEGRAM: 'async_telegram_sender.AsyncTelegramSender'
     }
     
+    @staticmethod
+    def _resolve(registry: Dict[MessageType, Any], message_type: MessageType):
+        """Класс отправщика из реестра; путь 'модуль.Класс' импортируется и заменяется классом"""
+        sender_class = registry.get(message_type)
+        if not sender_class:
+            raise ConfigurationError(f"Неизвестный тип сообщения: {message_type}")
+        if isinstance(sender_class, str):
+            module_name, class_name = sender_class.rsplit('.', 1)
+            sender_class = getattr(importlib.import_module(f".{module_name}", __package__), class_name)
+            registry[message_type] = sender_class
+        return sender_class
+    
     @classmethod
     def create_sender(
         cls, 
         message_type: MessageType, 
         config: Dict[str, Any]
-    ) -> BaseMessageSender:
+    ) -> 'BaseMessageSender':
         """Создание отправщика по типу сообщения"""
-        sender_class = cls._senders.get(message_type)
-        if not sender_class:
-            raise ConfigurationError(f"Неизвестный тип сообщения: {message_type}")
-        
+        sender_class = cls._resolve(cls._senders, message_type)
+        return sender_class(**config)
+    
+    @classmethod
+    def create_async_sender(
+        cls,
+        message_type: MessageType,
+        config: Dict[str, Any]
+    ) -> 'AsyncBaseMessageSender':
+        """Создание асинхронного отправщика по типу сообщения"""
+        sender_class = cls._resolve(cls._async_senders, message_type)
         return sender_class(**config)
     
     @classmethod
     def register_sender(cls, message_type: MessageType, sender_class):
         """Регистрация нового типа отправщика"""
         cls._senders[message_type] = sender_class
+    
+    @classmethod
+    def register_async_sender(cls, message_type: MessageType, sender_class):
+        """Регистрация нового типа асинхронного отправщика"""
+        cls._async_senders[message_type] = sender_class
@@ -0,0 +1,101 @@
+import base64
+import mmap
+import os
+import re
+import uuid
+import logging
+from email import encoders
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.message import Message as EmailMessage
+from email.policy import compat32
+from typing import Iterator, List, Optional
+
+from ..core.message import Message
+
+# Размер блока исходных данных: кратен 57 байтам (одна строка base64 в 76 символов)
+CHUNK_SIZE = 57 * 1024
+
+_SMTP_POLICY = compat32.clone(linesep='\r\n')
+_EOL_RE = re.compile(br'\r\n|\n|\r')
+_LEADING_DOT_RE = re.compile(br'(?m)^\.')
+
+
+def attachments_size(paths: List[str]) -> int:
+    """Суммарный размер существующих файлов вложений"""
+    return sum(os.path.getsize(path) for path in paths if os.path.isfile(path))
+
+
+def smtp_quote(data: bytes) -> bytes:
+    """Приведение окончаний строк к CRLF и экранирование точек для SMTP DATA"""
+    return _LEADING_DOT_RE.sub(b'..', _EOL_RE.sub(b'\r\n', data))
+
+
+def email_bytes(msg: EmailMessage) -> bytes:
+    """Готовое содержимое SMTP DATA для собранного письма"""
+    return smtp_quote(msg.as_bytes(policy=_SMTP_POLICY))
+
+
+def iter_base64_file(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Base64-кодирование файла блоками из отображения в память.
+    Строки разделены CRLF, последняя строка без перевода строки.
+    """
+    if chunk_size % 57:
+        raise ValueError("Размер блока должен быть кратен 57 байтам")
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if not size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            for offset in range(0, size, chunk_size):
+                encoded = base64.encodebytes(mapped[offset:offset + chunk_size])
+                if offset + chunk_size >= size:
+                    encoded = encoded.rstrip(b'\n')
+                yield encoded.replace(b'\n', b'\r\n')
+
+
+def iter_email_chunks(
+    from_addr: str,
+    message: Message,
+    logger: logging.Logger,
+    chunk_size: int = CHUNK_SIZE,
+    to_header: Optional[str] = None
+) -> Iterator[bytes]:
+    """
+    Потоковая сборка письма для SMTP DATA.
+
+    Заголовки и текст формирует пакет email, как и в build_email, но
+    вместо содержимого вложений в каркас подставляются маркеры. При
+    отправке маркеры заменяются base64-блоками, поэтому письмо целиком
+    в памяти не собирается. Данные уже экранированы для SMTP DATA.
+    """
+    msg = MIMEMultipart()
+    msg['From'] = from_addr
+    msg['To'] = to_header or message.recipient
+    msg['Subject'] = message.subject or "No Subject"
+    msg.attach(MIMEText(message.content, 'html' if message.content_format == 'html' else 'plain'))
+
+    streamed = []
+    for attachment_path in message.attachments or []:
+        if not os.path.isfile(attachment_path):
+            logger.warning("Не удалось прикрепить файл %s: файл не найден", attachment_path)
+            continue
+        marker = f"attachment-{uuid.uuid4().hex}".encode('ascii')
+        filename = os.path.basename(attachment_path)
+        part = MIMEApplication(b'', _encoder=encoders.encode_noop, Name=filename)
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.set_payload(marker.decode('ascii'))
+        part['Content-Disposition'] = f'attachment; filename="{filename}"'
+        msg.attach(part)
+        streamed.append((marker, attachment_path))
+
+    skeleton = smtp_quote(msg.as_bytes(policy=_SMTP_POLICY))
+    for marker, attachment_path in streamed:
+        head, skeleton = skeleton.split(marker, 1)
+        yield head
+        yield from iter_base64_file(attachment_path, chunk_size)
+    yield skeleton
@@ -2,20 +2,81 @@ import requests
 import time
 from typing import Optional, Dict, Any
 import logging
+from email.utils import parsedate_to_datetime
 
 from ..core.base_sender import BaseMessageSender
 from ..core.message import Message, MessageType, DeliveryResult
-from ..core.exceptions import AuthenticationError, RateLimitError, ValidationError
+from ..core.exceptions import AuthenticationError, NetworkError, RateLimitError, ValidationError
+from ..core.tracing import span
+from ..utils.http import create_http_session
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разбор заголовка Retry-After (секунды или HTTP-дата)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def build_sms_payload(folder_id: str, sender_id: Optional[str], message: Message) -> Dict[str, Any]:
+    """Формирование тела запроса к Yandex Cloud Notification Service"""
+    payload = {
+        "folderId": folder_id,
+        "destination": {"phoneNumber": message.recipient},
+        "text": message.content,
+        "channel": "SMS"
+    }
+    
+    if sender_id:
+        payload["sms"] = {"from": sender_id}
+    
+    return payload
+
+def apply_sms_response(
+    result: DeliveryResult,
+    status_code: int,
+    response_data: Optional[Dict[str, Any]],
+    response_text: str,
+    retry_after: Optional[str] = None
+) -> DeliveryResult:
+    """Заполнение результата доставки по ответу Yandex Cloud"""
+    if status_code == 200:
+        result.success = True
+        result.message_id = response_data.get('id')
+        result.provider_response = response_data
+        
+    elif status_code == 401:
+        result.error = "Ошибка аутентификации: неверный API ключ"
+        raise AuthenticationError(result.error)
+        
+    elif status_code == 429:
+        result.error = "Превышен лимит запросов"
+        raise RateLimitError(result.error, retry_after=parse_retry_after(retry_after))
+        
+    else:
+        result.error = f"Ошибка API: {status_code} - {response_text}"
+    
+    return result
 
 class YandexCloudSMSSender(BaseMessageSender):
     """Отправщик SMS через Yandex Cloud"""
     
+    message_type = MessageType.SMS
+    
     def __init__(
         self,
         api_key: str,
         folder_id: str,
         sender_id: Optional[str] = None,
         base_url: str = "https://api.cloud.yandex.net/notification/v1",
+        pool_size: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
         **kwargs
     ):
         super().__init__(**kwargs)
@@ -27,6 +88,12 @@ class YandexCloudSMSSender(BaseMessageSender):
             'Authorization': f'Api-Key {api_key}',
             'Content-Type': 'application/json'
         }
+        self.session = create_http_session(
+            pool_size=pool_size,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+            headers=self.headers
+        )
         
     def send(self, message: Message) -> DeliveryResult:
         """Отправка SMS"""
@@ -40,42 +107,28 @@ class YandexCloudSMSSender(BaseMessageSender):
         result = DeliveryResult(success=False, attempts=1)
         
         try:
-            payload = {
-                "folderId": self.folder_id,
-                "destination": {"phoneNumber": message.recipient},
-                "text": message.content,
-                "channel": "SMS"
-            }
+            payload = build_sms_payload(self.folder_id, self.sender_id, message)
             
-            if self.sender_id:
-                payload["sms"] = {"from": self.sender_id}
+            with span('http.request', {'provider': self.provider_name, 'url.path': '/messages'}) as request_span:
+                response = self.session.post(
+                    f"{self.base_url}/messages",
+                    json=payload,
+                    timeout=30
+                )
+                request_span.set_attribute('http.status_code', response.status_code)
             
-            response = requests.post(
-                f"{self.base_url}/messages",
-                headers=self.headers,
-                json=payload,
-                timeout=30
+            response_data = response.json() if response.status_code == 200 else None
+            apply_sms_response(
+                result,
+                response.status_code,
+                response_data,
+                response.text,
+                response.headers.get('Retry-After')
             )
             
-            if response.status_code == 200:
-                response_data = response.json()
-                result.success = True
-                result.message_id = response_data.get('id')
-                result.provider_response = response_data
-                
-            elif response.status_code == 401:
-                result.error = "Ошибка аутентификации: неверный API ключ"
-                raise AuthenticationError(result.error)
-                
-            elif response.status_code == 429:
-                result.error = "Превышен лимит запросов"
-                raise RateLimitError(result.error)
-                
-            else:
-                result.error = f"Ошибка API: {response.status_code} - {response.text}"
-                
         except requests.exceptions.RequestException as e:
             result.error = f"Сетевая ошибка: {e}"
+            result.error_type = NetworkError.__name__
             
         return result
     
@@ -83,11 +136,14 @@ class YandexCloudSMSSender(BaseMessageSender):
         """Проверка валидности API ключа"""
         try:
             # Простая проверка через запрос к API
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/senders",
-                headers=self.headers,
                 timeout=10
             )
             return response.status_code == 200
         except Exception:
             return False
+    
+    def close(self):
+        """Закрытие пула HTTP-соединений"""
+        self.session.close()
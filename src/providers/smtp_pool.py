@@ -0,0 +1,346 @@
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..core.exceptions import NetworkError
+from ..utils.logger import get_logger
+
+# Ошибки, после которых smtplib сам выполняет RSET и сессия остается пригодной
+_RECOVERABLE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+# Письмо пакета: адреса RCPT TO и содержимое DATA (CRLF, с экранированными точками)
+BatchItem = Tuple[List[str], bytes]
+# Итог письма пакета: словарь отказов по адресам при приеме или исключение
+BatchOutcome = Union[Dict[str, tuple], Exception]
+
+
+def sendmail_stream(
+    connection: smtplib.SMTP,
+    from_addr: str,
+    to_addrs: Union[str, List[str]],
+    chunks: Iterable[bytes]
+) -> Dict[str, tuple]:
+    """
+    Аналог smtplib.SMTP.sendmail, записывающий DATA блоками.
+    Блоки должны быть уже приведены к CRLF и экранированы (точки в начале строк).
+    """
+    if isinstance(to_addrs, str):
+        to_addrs = [to_addrs]
+    connection.ehlo_or_helo_if_needed()
+
+    code, response = connection.mail(from_addr)
+    if code != 250:
+        connection.rset()
+        raise smtplib.SMTPSenderRefused(code, response, from_addr)
+
+    refused = {}
+    for address in to_addrs:
+        code, response = connection.rcpt(address)
+        if code not in (250, 251):
+            refused[address] = (code, response)
+    if len(refused) == len(to_addrs):
+        connection.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    code, response = connection.docmd('DATA')
+    if code != 354:
+        connection.rset()
+        raise smtplib.SMTPDataError(code, response)
+
+    # Последний блок уходит вместе с завершающей точкой: отдельная короткая
+    # запись после большой ждала бы подтверждения TCP (алгоритм Нейгла)
+    last = b''
+    for chunk in chunks:
+        if chunk:
+            if last:
+                connection.send(last)
+            last = chunk
+    connection.send(last + (b'.\r\n' if last.endswith(b'\r\n') else b'\r\n.\r\n'))
+
+    code, response = connection.getreply()
+    if code != 250:
+        connection.rset()
+        raise smtplib.SMTPDataError(code, response)
+    return refused
+
+
+def sendmail_batch(
+    connection: smtplib.SMTP,
+    from_addr: str,
+    items: Sequence[BatchItem],
+    outcomes: Dict[int, BatchOutcome],
+    limit: Optional[int] = None
+):
+    """
+    Отправка писем пакета, еще не имеющих итога, в одной сессии.
+
+    Итоги записываются в outcomes сразу после ответа сервера, поэтому
+    при разрыве соединения (SMTPServerDisconnected) принятые письма
+    не отправляются повторно. limit ограничивает число писем за вызов.
+    При поддержке сервером ESMTP PIPELINING команды письма передаются
+    одной группой вместе с содержимым предыдущего письма.
+    """
+    pending = [index for index in range(len(items)) if index not in outcomes]
+    if limit is not None:
+        pending = pending[:max(limit, 0)]
+    connection.ehlo_or_helo_if_needed()
+
+    if not connection.has_extn('pipelining'):
+        for index in pending:
+            to_addrs, data = items[index]
+            try:
+                outcomes[index] = sendmail_stream(connection, from_addr, to_addrs, [data])
+            except _RECOVERABLE_ERRORS as e:
+                outcomes[index] = e
+        return
+
+    mail_command = f"MAIL FROM:{smtplib.quoteaddr(from_addr)}\r\n".encode('ascii')
+    # Письмо, для которого получен ответ 354: (индекс, содержимое, отказы по адресам)
+    body: Optional[Tuple[int, bytes, Dict[str, tuple]]] = None
+    reset = False
+    for index in pending + [None]:
+        group = []
+        if body is not None:
+            data = body[1] if body[1].endswith(b'\r\n') else body[1] + b'\r\n'
+            group.append(data + b'.\r\n')
+        if index is not None:
+            to_addrs = items[index][0]
+            if reset:
+                group.append(b'RSET\r\n')
+            group.append(mail_command)
+            group.extend(f"RCPT TO:{smtplib.quoteaddr(address)}\r\n".encode('ascii') for address in to_addrs)
+            group.append(b'DATA\r\n')
+        if not group:
+            break
+        connection.send(b''.join(group))
+
+        if body is not None:
+            code, response = connection.getreply()
+            outcomes[body[0]] = body[2] if code == 250 else smtplib.SMTPDataError(code, response)
+            body = None
+        if index is None:
+            break
+
+        if reset:
+            connection.getreply()
+            reset = False
+        mail_code, mail_response = connection.getreply()
+        refused = {}
+        for address in to_addrs:
+            code, response = connection.getreply()
+            if code not in (250, 251):
+                refused[address] = (code, response)
+        data_code, data_response = connection.getreply()
+
+        if mail_code == 250 and len(refused) < len(to_addrs) and data_code == 354:
+            body = (index, items[index][1], refused)
+            continue
+
+        if data_code == 354:
+            # Сервер ждет содержимое несмотря на ошибку: пустое письмо без адресатов
+            connection.send(b'.\r\n')
+            connection.getreply()
+        if mail_code != 250:
+            outcomes[index] = smtplib.SMTPSenderRefused(mail_code, mail_response, from_addr)
+        elif len(refused) == len(to_addrs):
+            outcomes[index] = smtplib.SMTPRecipientsRefused(refused)
+        else:
+            outcomes[index] = smtplib.SMTPDataError(data_code, data_response)
+        reset = True
+
+    if reset:
+        connection.rset()
+
+
+class SMTPSession:
+    """Аутентифицированная SMTP-сессия, принадлежащая пулу"""
+
+    __slots__ = ('connection', 'created_at', 'last_used', 'messages_sent')
+
+    def __init__(self, connection: smtplib.SMTP):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+
+    def close(self):
+        """Корректное завершение сессии"""
+        try:
+            self.connection.quit()
+        except Exception:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool:
+    """Ограниченный пул аутентифицированных SMTP-сессий"""
+
+    def __init__(
+        self,
+        connect: Callable[[], smtplib.SMTP],
+        size: int = 4,
+        max_messages_per_session: int = 100,
+        health_check_interval: float = 30.0,
+        acquire_timeout: Optional[float] = None
+    ):
+        if size < 1:
+            raise ValueError("Размер пула должен быть положительным")
+        self._connect = connect
+        self.size = size
+        self.max_messages_per_session = max_messages_per_session
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._idle: List[SMTPSession] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def acquire(self) -> SMTPSession:
+        """Получение рабочей сессии из пула или создание новой"""
+        timeout = self.acquire_timeout if self.acquire_timeout is not None else -1
+        if not self._slots.acquire(timeout=timeout):
+            raise NetworkError("Превышено время ожидания свободной SMTP-сессии")
+
+        try:
+            while True:
+                with self._lock:
+                    session = self._idle.pop() if self._idle else None
+                if session is None:
+                    return SMTPSession(self._connect())
+                if self._is_healthy(session):
+                    return session
+                session.close()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, session: SMTPSession, discard: bool = False):
+        """Возврат сессии в пул; исчерпанные и сломанные сессии закрываются"""
+        try:
+            if (
+                discard
+                or self._closed
+                or session.messages_sent >= self.max_messages_per_session
+            ):
+                session.close()
+            else:
+                session.last_used = time.monotonic()
+                with self._lock:
+                    self._idle.append(session)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self):
+        """Контекстный менеджер для работы с сессией из пула"""
+        session = self.acquire()
+        discard = False
+        try:
+            yield session
+        except _RECOVERABLE_ERRORS:
+            raise
+        except BaseException:
+            discard = True
+            raise
+        finally:
+            self.release(session, discard=discard)
+
+    def sendmail(
+        self,
+        from_addr: str,
+        to_addrs: Union[str, List[str]],
+        msg: Union[str, bytes]
+    ) -> Dict[str, tuple]:
+        """Отправка письма через сессию из пула с переподключением при разрыве"""
+        return self._send(lambda connection: connection.sendmail(from_addr, to_addrs, msg))
+
+    def sendmail_stream(
+        self,
+        from_addr: str,
+        to_addrs: Union[str, List[str]],
+        chunks: Callable[[], Iterable[bytes]]
+    ) -> Dict[str, tuple]:
+        """
+        Потоковая отправка письма через сессию из пула.
+        chunks создает новый поток блоков для каждой попытки.
+        """
+        return self._send(lambda connection: sendmail_stream(connection, from_addr, to_addrs, chunks()))
+
+    def sendmail_batch(
+        self,
+        from_addr: str,
+        items: Sequence[BatchItem],
+        max_reconnects: int = 2
+    ) -> List[BatchOutcome]:
+        """
+        Отправка пакета разных писем через одну сессию из пула.
+        При разрыве соединения сессия заменяется и отправка продолжается
+        с первого неподтвержденного письма. Возвращает итоги в порядке items;
+        прочие ошибки (в том числе при переподключении) становятся итогом
+        только писем без подтверждения.
+        """
+        outcomes: Dict[int, BatchOutcome] = {}
+        reconnects = 0
+        while len(outcomes) < len(items):
+            try:
+                with self.session() as session:
+                    confirmed = len(outcomes)
+                    try:
+                        sendmail_batch(
+                            session.connection, from_addr, items, outcomes,
+                            limit=self.max_messages_per_session - session.messages_sent
+                        )
+                    finally:
+                        session.messages_sent += len(outcomes) - confirmed
+            except smtplib.SMTPServerDisconnected as e:
+                if reconnects >= max_reconnects:
+                    for index in range(len(items)):
+                        outcomes.setdefault(index, e)
+                    break
+                reconnects += 1
+                self.logger.info("SMTP-сессия разорвана после %s из %s писем, переподключение", len(outcomes), len(items))
+            except Exception as e:
+                for index in range(len(items)):
+                    outcomes.setdefault(index, e)
+                break
+        return [outcomes[index] for index in range(len(items))]
+
+    def _send(self, send: Callable[[smtplib.SMTP], Dict[str, tuple]]) -> Dict[str, tuple]:
+        """Выполнение отправки в сессии из пула с одним переподключением при разрыве"""
+        for attempt in range(2):
+            try:
+                with self.session() as session:
+                    response = send(session.connection)
+                    session.messages_sent += 1
+                    return response
+            except smtplib.SMTPServerDisconnected:
+                if attempt:
+                    raise
+                self.logger.info("SMTP-сессия закрыта сервером, переподключение")
+
+    def close(self):
+        """Закрытие всех простаивающих сессий"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            session.close()
+
+    def _is_healthy(self, session: SMTPSession) -> bool:
+        """NOOP-проверка сессии, простаивавшей дольше интервала"""
+        if time.monotonic() - session.last_used < self.health_check_interval:
+            return True
+        try:
+            return session.connection.noop()[0] == 250
+        except Exception:
+            return False
@@ -5,22 +5,82 @@ import logging
 
 from ..core.base_sender import BaseMessageSender
 from ..core.message import Message, MessageType, DeliveryResult
-from ..core.exceptions import AuthenticationError, ValidationError
+from ..core.exceptions import (
+    AuthenticationError, NetworkError, RateLimitError, RecipientError, ValidationError
+)
+from ..core.tracing import span
+from ..utils.http import create_http_session
+
+def build_telegram_payload(message: Message) -> Dict[str, Any]:
+    """Формирование тела запроса sendMessage"""
+    payload = {
+        'chat_id': message.recipient,
+        'text': message.content,
+        'disable_web_page_preview': True
+    }
+    
+    if message.subject or message.content_format == 'html':
+        payload['parse_mode'] = 'HTML'
+    if message.subject:
+        payload['text'] = f"<b>{message.subject}</b>\n\n{message.content}"
+    
+    return payload
+
+def apply_telegram_response(result: DeliveryResult, response_data: Dict[str, Any]) -> DeliveryResult:
+    """Заполнение результата доставки по ответу Telegram Bot API"""
+    if response_data.get('ok'):
+        message_data = response_data['result']
+        result.success = True
+        result.message_id = str(message_data['message_id'])
+        result.provider_response = message_data
+        
+    elif response_data.get('error_code') == 401:
+        result.error = "Ошибка аутентификации: неверный токен бота"
+        raise AuthenticationError(result.error)
+        
+    elif response_data.get('error_code') == 429:
+        result.error = "Превышен лимит запросов"
+        retry_after = (response_data.get('parameters') or {}).get('retry_after')
+        raise RateLimitError(result.error, retry_after=retry_after)
+        
+    else:
+        error_description = response_data.get('description', 'Unknown error')
+        
+        if "chat not found" in error_description.lower():
+            result.error = "Чат не найден"
+            result.error_type = RecipientError.__name__
+        elif "bot was blocked" in error_description.lower():
+            result.error = "Бот заблокирован пользователем"
+            result.error_type = RecipientError.__name__
+        else:
+            result.error = f"Telegram API error: {error_description}"
+    
+    return result
 
 class TelegramSender(BaseMessageSender):
     """Отправщик сообщений в Telegram"""
     
+    message_type = MessageType.TELEGRAM
+    
     def __init__(
         self,
         bot_token: str,
         base_url: str = "https://api.telegram.org/bot",
         timeout: int = 30,
+        pool_size: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
         **kwargs
     ):
         super().__init__(**kwargs)
         self.bot_token = bot_token
         self.base_url = f"{base_url}{bot_token}"
         self.timeout = timeout
+        self.session = create_http_session(
+            pool_size=pool_size,
+            pool_block=pool_block,
+            keep_alive=keep_alive
+        )
         
     def send(self, message: Message) -> DeliveryResult:
         """Отправка сообщения в Telegram"""
@@ -34,49 +94,28 @@ class TelegramSender(BaseMessageSender):
         result = DeliveryResult(success=False, attempts=1)
         
         try:
-            payload = {
-                'chat_id': message.recipient,
-                'text': message.content,
-                'disable_web_page_preview': True
-            }
+            payload = build_telegram_payload(message)
             
-            if message.subject:
-                payload['parse_mode'] = 'HTML'
-                payload['text'] = f"<b>{message.subject}</b>\n\n{message.content}"
+            with span('http.request', {'provider': self.provider_name, 'url.path': '/sendMessage'}) as request_span:
+                response = self.session.post(
+                    f"{self.base_url}/sendMessage",
+                    json=payload,
+                    timeout=self.timeout
+                )
+                request_span.set_attribute('http.status_code', response.status_code)
             
-            response = requests.post(
-                f"{self.base_url}/sendMessage",
-                json=payload,
-                timeout=self.timeout
-            )
-            
-            response_data = response.json()
+            apply_telegram_response(result, response.json())
             
-            if response_data.get('ok'):
-                message_data = response_data['result']
-                result.success = True
-                result.message_id = str(message_data['message_id'])
-                result.provider_response = message_data
-                
-            else:
-                error_description = response_data.get('description', 'Unknown error')
-                
-                if "chat not found" in error_description.lower():
-                    result.error = "Чат не найден"
-                elif "bot was blocked" in error_description.lower():
-                    result.error = "Бот заблокирован пользователем"
-                else:
-                    result.error = f"Telegram API error: {error_description}"
-                    
         except requests.exceptions.RequestException as e:
             result.error = f"Сетевая ошибка: {e}"
+            result.error_type = NetworkError.__name__
             
         return result
     
     def validate_credentials(self) -> bool:
         """Проверка валидности токена бота"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/getMe",
                 timeout=self.timeout
             )
@@ -84,3 +123,7 @@ class TelegramSender(BaseMessageSender):
             return data.get('ok', False)
         except Exception:
             return False
+    
+    def close(self):
+        """Закрытие пула HTTP-соединений"""
+        self.session.close()
@@ -1,52 +1,211 @@
-from celery_app import app
-from main import MessageDeliverySystem
-from src.core.message import Message, MessageType
-from typing import List
+import os
+import threading
+import time
+from celery.signals import worker_process_init, worker_process_shutdown
+from celery_app import app, celery_conf, queue_for
+from src.core.message import Message, MessagePriority, MessageType, intern_chain
+from src.core.metrics import DELIVERY_METRICS
+from typing import Iterable, List
 
-@app.task(bind=True, max_retries=3, default_retry_delay=60)
-def send_notification_task(self, message_data: dict, delivery_chain: List[str]):
+CONFIG_PATH = os.getenv('MESSAGE_SYSTEM_CONFIG', 'config/default.yaml')
+
+# Система доставки процесса воркера: создается один раз и переиспользуется задачами
+_system = None
+_system_lock = threading.Lock()
+
+def get_delivery_system():
     """
-    Задача Celery для асинхронной отправки уведомления с использованием цепочки провайдеров.
+    Возвращает систему доставки текущего процесса.
+    Учетные данные не проверяются при старте: отправщик перепроверяется
+    только после ошибки аутентификации. Отправщики делают одну попытку,
+    повторы планируются задачами через countdown.
     """
-    try:
-        system = MessageDeliverySystem('config/default.yaml')
-        
-        # Преобразование словаря обратно в объект Message
-        message_data['message_type'] = MessageType(message_data['message_type'])
-        message = Message(**message_data)
+    global _system
+    if _system is None:
+        with _system_lock:
+            if _system is None:
+                # Импорт внутри функции разрывает циклический импорт main <-> src.tasks
+                from main import MessageDeliverySystem
+                _system = MessageDeliverySystem(
+                    CONFIG_PATH, validate_credentials=False, inline_retries=False
+                )
+    return _system
 
-        # Преобразование строк в MessageType
-        chain = [MessageType(provider) for provider in delivery_chain]
+def decode_message(data) -> Message:
+    """Сообщение из полезной нагрузки задачи: компактный кортеж (список в JSON) или словарь"""
+    if isinstance(data, (list, tuple)):
+        return Message.from_tuple(data)
+    return Message.from_dict(data)
 
-        # Попытка отправить через цепочку
-        success = system.send_with_fallback(message, chain)
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Прогрев системы доставки при старте процесса воркера"""
+    get_delivery_system()
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Закрытие соединений при остановке процесса воркера"""
+    global _system
+    if _system is not None:
+        _system.close()
+        _system = None
+
+@app.task(bind=True)
+def send_notification_task(
+    self,
+    message_data: dict,
+    delivery_chain: List[str],
+    first_attempt_at: float = None,
+    enqueued_at: float = None
+):
+    """
+    Задача Celery для асинхронной отправки уведомления с использованием цепочки провайдеров.
+    Повтор не ждет внутри воркера: задача перепланируется с задержкой
+    по политике retry.
+    """
+    first_attempt_at = first_attempt_at or time.time()
+    system = get_delivery_system()
+    
+    # Преобразование словаря обратно в объект Message
+    message = Message.from_dict(message_data)
+    if enqueued_at:
+        system.queue_latency.record(message.priority, time.time() - enqueued_at)
 
-        if not success:
-            raise Exception("Failed to send message through all providers in the chain.")
+    # Преобразование строк в MessageType (общий экземпляр цепочки)
+    chain = intern_chain(delivery_chain)
 
+    # Попытка отправить через цепочку
+    if system.send_with_fallback(message, chain):
+        DELIVERY_METRICS.task_messages.inc('send_notification', 'success', message.priority.value)
         return {"status": "Success", "message": f"Message sent to {message.recipient}"}
 
-    except Exception as exc:
-        # Повторная попытка задачи в случае неудачи
-        self.retry(exc=exc)
+    exc = Exception("Failed to send message through all providers in the chain.")
+    policy = system.retry_policy
+    if not policy.should_retry(self.request.retries, time.time() - first_attempt_at):
+        DELIVERY_METRICS.task_messages.inc('send_notification', 'failure', message.priority.value)
+        raise exc
+    
+    DELIVERY_METRICS.task_messages.inc('send_notification', 'retry', message.priority.value)
+
+    # Повторная попытка задачи через брокер, слот воркера освобождается сразу
+    countdown = policy.compute_delay(self.request.retries)
+    raise self.retry(
+        exc=exc,
+        kwargs={'first_attempt_at': first_attempt_at, 'enqueued_at': time.time() + countdown},
+        countdown=countdown,
+        max_retries=policy.max_retries - 1
+    )
 
 def send_message_async(message: Message, delivery_chain: List[MessageType]):
     """
     Хелпер для вызова задачи Celery.
-    Преобразует MessageType в строки для сериализации.
+    Преобразует MessageType в строки для сериализации и направляет
+    задачу в очередь приоритета сообщения.
     """
     # Преобразование объекта Message в словарь для сериализации
-    message_data = {
-        "message_type": message.message_type.value,
-        "recipient": message.recipient,
-        "content": message.content,
-        "subject": message.subject,
-        "attachments": message.attachments,
-        "priority": message.priority.name,
-        "metadata": message.metadata,
-    }
+    message_data = message.to_dict()
     
     # Преобразование MessageType в строки
     chain_str = [provider.value for provider in delivery_chain]
     
-    send_notification_task.delay(message_data, chain_str)
+    send_notification_task.apply_async(
+        (message_data, chain_str),
+        {'enqueued_at': time.time()},
+        queue=queue_for(message.priority)
+    )
+
+@app.task
+def send_batch_task(
+    messages_data: List[dict],
+    delivery_chain: List[str],
+    attempt: int = 0,
+    first_attempt_at: float = None,
+    enqueued_at: float = None
+):
+    """
+    Задача Celery для отправки пачки сообщений за один вызов.
+    Сообщения отправляются параллельно через пулы соединений воркера.
+    Возвращает компактные итоги: пары [канал, 1|0] в порядке сообщений.
+    Неудавшиеся сообщения перепланируются отдельной пачкой по политике retry.
+    """
+    first_attempt_at = first_attempt_at or time.time()
+    system = get_delivery_system()
+    
+    messages = [decode_message(data) for data in messages_data]
+    if enqueued_at:
+        latency = time.time() - enqueued_at
+        for message in messages:
+            system.queue_latency.record(message.priority, latency)
+    chain = intern_chain(delivery_chain)
+    
+    # Задержка уже учтена от постановки в брокер; broadcast ее не дублирует
+    results = system.broadcast(
+        messages, use_fallback=bool(chain), chain=chain, concurrent=True, record_latency=False
+    )
+    
+    summary = {
+        "total": results['total'],
+        "successful": results['successful'],
+        "failed": results['failed'],
+        "outcomes": [[detail['type'], int(detail['success'])] for detail in results['details']],
+    }
+    
+    policy = system.retry_policy
+    failed = [data for data, detail in zip(messages_data, results['details']) if not detail['success']]
+    retrying = bool(failed) and policy.should_retry(attempt, time.time() - first_attempt_at)
+    priority = messages[0].priority.value if messages else MessagePriority.NORMAL.value
+    DELIVERY_METRICS.task_messages.inc('send_batch', 'success', priority, amount=results['successful'])
+    if failed:
+        DELIVERY_METRICS.task_messages.inc('send_batch', 'retry' if retrying else 'failure', priority, amount=len(failed))
+    
+    if retrying:
+        countdown = policy.compute_delay(attempt)
+        retry = send_batch_task.apply_async(
+            (failed, delivery_chain),
+            {'attempt': attempt + 1, 'first_attempt_at': first_attempt_at, 'enqueued_at': time.time() + countdown},
+            countdown=countdown,
+            queue=queue_for(messages[0].priority)
+        )
+        summary["retry"] = {"task_id": retry.id, "count": len(failed)}
+    
+    return summary
+
+def send_batch_async(
+    messages: Iterable[Message],
+    delivery_chain: List[MessageType],
+    chunk_size: int = None
+) -> list:
+    """
+    Хелпер для массовой отправки через Celery.
+    Сообщения передаются компактными кортежами (Message.to_tuple).
+    Разбивает сообщения на пачки одного приоритета и публикует их через
+    одно соединение с брокером в очереди приоритетов. Возвращает
+    AsyncResult для каждой пачки.
+    """
+    chunk_size = chunk_size or celery_conf.get('batch_size', 500)
+    chain_str = [provider.value for provider in delivery_chain]
+    pending = {priority: [] for priority in MessagePriority}
+    async_results = []
+    
+    with app.producer_or_acquire() as producer:
+        def publish(priority: MessagePriority):
+            chunk, pending[priority] = pending[priority], []
+            async_results.append(send_batch_task.apply_async(
+                (chunk, chain_str),
+                {'enqueued_at': time.time()},
+                queue=queue_for(priority),
+                producer=producer
+            ))
+        
+        for message in messages:
+            chunk = pending[message.priority]
+            chunk.append(message.to_tuple())
+            if len(chunk) >= chunk_size:
+                publish(message.priority)
+        
+        # Неполные пачки публикуются начиная с высокого приоритета
+        for priority in sorted(MessagePriority, key=lambda priority: priority.rank):
+            if pending[priority]:
+                publish(priority)
+    
+    return async_results
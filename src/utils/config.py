@@ -1,32 +1,139 @@
 import yaml
 import os
-from typing import Dict, Any, Optional
+import re
+import threading
+from typing import Callable, Dict, Any, FrozenSet, List, Optional, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 
 from ..core.exceptions import ConfigurationError
+from .logger import get_logger
 
 load_dotenv()
 
+# ${VAR} или ${VAR:-значение по умолчанию}
+_PLACEHOLDER = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}')
+# Значения по умолчанию, задающие тип подстановки (без ведущих нулей: номера и идентификаторы остаются строками)
+_INT = re.compile(r'-?(0|[1-9][0-9]*)$')
+_FLOAT = re.compile(r'-?(0|[1-9][0-9]*)\.[0-9]+$')
+_BOOLEANS = {'true': True, 'false': False}
+
+
+class FrozenDict(dict):
+    """Неизменяемый словарь секции конфигурации (dict(...) дает изменяемую копию)"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Снимок конфигурации неизменяем")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _typed(value: str, example: str) -> Any:
+    """Приведение подставленной строки к типу значения по умолчанию (int/float/bool)"""
+    try:
+        if _INT.match(example):
+            return int(value)
+        if _FLOAT.match(example):
+            return float(value)
+    except ValueError:
+        raise ConfigurationError(f"Ожидалось число вместо {value!r}")
+    if example.lower() in _BOOLEANS:
+        if value.lower() not in _BOOLEANS:
+            raise ConfigurationError(f"Ожидалось true/false вместо {value!r}")
+        return _BOOLEANS[value.lower()]
+    return value
+
+
+def interpolate(value: Any, environ=os.environ) -> Any:
+    """
+    Подстановка переменных окружения ${VAR} и ${VAR:-default} во всех строках.
+    Значение, целиком состоящее из одной подстановки, приводится к типу
+    значения по умолчанию (${SMTP_PORT:-587} - int); незаданная переменная
+    без значения по умолчанию дает None.
+    """
+    if isinstance(value, dict):
+        return {key: interpolate(item, environ) for key, item in value.items()}
+    if isinstance(value, list):
+        return [interpolate(item, environ) for item in value]
+    if not isinstance(value, str) or '${' not in value:
+        return value
+
+    whole = _PLACEHOLDER.fullmatch(value)
+    if whole:
+        name, default = whole.groups()
+        resolved = environ.get(name) or default
+        if resolved is None:
+            return None
+        return _typed(resolved, default) if default else resolved
+    return _PLACEHOLDER.sub(lambda match: environ.get(match.group(1)) or match.group(2) or '', value)
+
+
+class ConfigSnapshot:
+    """
+    Разрешенная конфигурация: неизменяемое дерево секций и плоский словарь
+    всех путей вида 'email.port' для поиска за O(1).
+    """
+
+    __slots__ = ('data', 'values', 'version')
+
+    def __init__(self, data: Dict[str, Any], version: int = 0):
+        self.data = _freeze(data)
+        self.values: Dict[str, Any] = {}
+        self._flatten(self.data, '')
+        self.version = version
+
+    def _flatten(self, node: Dict[str, Any], prefix: str):
+        for key, value in node.items():
+            path = f"{prefix}{key}"
+            self.values[path] = value
+            if isinstance(value, dict):
+                self._flatten(value, f"{path}.")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+    def changed_sections(self, other: 'ConfigSnapshot') -> FrozenSet[str]:
+        """Секции верхнего уровня, отличающиеся в двух снимках"""
+        keys = set(self.data) | set(other.data)
+        return frozenset(key for key in keys if self.data.get(key) != other.data.get(key))
+
+
 class Config:
     """Класс для работы с конфигурацией"""
-    
+
     def __init__(self, config_path: Optional[str] = None):
+        self.config_path = config_path
         self.config_data = {}
-        
+        self.logger = get_logger(self.__class__.__name__)
+        self._listeners: List[Callable[[ConfigSnapshot, ConfigSnapshot], None]] = []
+        self._reload_lock = threading.Lock()
+
         if config_path:
             self.load_from_file(config_path)
-        
+
         self.load_from_env()
-    
+        self.snapshot = ConfigSnapshot(self.config_data)
+
     def load_from_file(self, config_path: str):
-        """Загрузка конфигурации из YAML файла"""
+        """Загрузка конфигурации из YAML файла с подстановкой переменных окружения"""
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                self.config_data.update(yaml.safe_load(f) or {})
+                self.config_data.update(interpolate(yaml.safe_load(f) or {}))
         except Exception as e:
             raise ConfigurationError(f"Ошибка загрузки конфигурации: {e}")
-    
+
     def load_from_env(self):
         """Загрузка конфигурации из переменных окружения"""
         env_mappings = {
@@ -38,34 +145,118 @@ class Config:
             'YANDEX_FOLDER_ID': ['sms', 'folder_id'],
             'TELEGRAM_BOT_TOKEN': ['telegram', 'bot_token'],
         }
-        
+
         for env_var, config_path in env_mappings.items():
             value = os.getenv(env_var)
             if value:
                 self._set_nested_value(self.config_data, config_path, value)
-    
+
     def _set_nested_value(self, data: Dict, path: list, value: Any):
         """Установка значения во вложенной структуре"""
         current = data
         for key in path[:-1]:
-            if key not in current:
+            if not isinstance(current.get(key), dict):
                 current[key] = {}
             current = current[key]
         current[path[-1]] = value
-    
+
     def get(self, key: str, default: Any = None) -> Any:
         """Получение значения конфигурации"""
-        keys = key.split('.')
-        current = self.config_data
-        
-        for k in keys:
-            if isinstance(current, dict) and k in current:
-                current = current[k]
-            else:
-                return default
-        
-        return current
-    
+        return self.snapshot.values.get(key, default)
+
     def get_provider_config(self, provider: str) -> Dict[str, Any]:
         """Получение конфигурации для провайдера"""
         return self.get(provider, {})
+
+    def set(self, key: str, value: Any):
+        """Изменение значения в памяти; подписчики получают новый снимок"""
+        with self._reload_lock:
+            self._set_nested_value(self.config_data, key.split('.'), value)
+            self._publish(ConfigSnapshot(self.config_data, self.snapshot.version + 1))
+
+    def subscribe(self, listener: Callable[[ConfigSnapshot, ConfigSnapshot], None]):
+        """Подписка на смену снимка: listener(старый, новый)"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[ConfigSnapshot, ConfigSnapshot], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def reload(self) -> bool:
+        """
+        Повторное чтение файла конфигурации и замена снимка.
+        Ошибка чтения оставляет действующий снимок; возвращает True, если конфигурация изменилась.
+        """
+        if not self.config_path:
+            return False
+        with self._reload_lock:
+            previous = self.config_data
+            self.config_data = {}
+            try:
+                self.load_from_file(self.config_path)
+                self.load_from_env()
+                snapshot = ConfigSnapshot(self.config_data, self.snapshot.version + 1)
+            except ConfigurationError as e:
+                self.config_data = previous
+                self.logger.error("Конфигурация %s не перечитана: %s", self.config_path, e)
+                return False
+            if not snapshot.changed_sections(self.snapshot):
+                return False
+            self._publish(snapshot)
+            return True
+
+    def _publish(self, snapshot: ConfigSnapshot):
+        # Замена ссылки атомарна: читатели видят целиком старый или целиком новый снимок
+        previous, self.snapshot = self.snapshot, snapshot
+        for listener in list(self._listeners):
+            try:
+                listener(previous, snapshot)
+            except Exception as e:
+                self.logger.error("Ошибка применения новой конфигурации: %s", e)
+
+    def watch(self, interval: float = 5.0) -> 'ConfigWatcher':
+        """Запуск отслеживания файла конфигурации"""
+        return ConfigWatcher(self, interval).start()
+
+
+class ConfigWatcher:
+    """Фоновая проверка файла конфигурации: при изменении вызывается Config.reload"""
+
+    def __init__(self, config: Config, interval: float = 5.0):
+        if not config.config_path:
+            raise ConfigurationError("Отслеживание конфигурации требует пути к файлу")
+        self.config = config
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stamp = self._file_stamp()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = Path(self.config.config_path).stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self) -> bool:
+        """Перечитывание конфигурации, если файл изменился с прошлой проверки"""
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return self.config.reload()
+
+    def start(self) -> 'ConfigWatcher':
+        self._thread = threading.Thread(target=self._run, name='config-watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
@@ -0,0 +1,112 @@
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from .logger import get_logger
+
+
+class CredentialsCache:
+    """
+    Кеш успешных проверок учетных данных с TTL.
+
+    Ключ включает HMAC конфигурации провайдера, поэтому смена учетных
+    данных автоматически делает запись недействительной. По умолчанию кеш
+    хранится в памяти процесса; при указании path он сохраняется между
+    запусками (CLI, примеры, воркеры), а ключ HMAC - в файле path + '.key'
+    с доступом только для владельца, так что по файлу кеша нельзя
+    подобрать пароль или токен.
+    """
+
+    def __init__(self, ttl: float = 3600.0, path: Optional[str] = None):
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self.logger = get_logger(self.__class__.__name__)
+        self._entries: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._secret = self._load_secret()
+        self._load()
+
+    def make_key(self, provider: str, config: Dict[str, Any]) -> str:
+        """Ключ записи: провайдер и HMAC его конфигурации"""
+        payload = json.dumps(config, sort_keys=True, default=str).encode('utf-8')
+        digest = hmac.new(self._secret, payload, hashlib.sha256)
+        return f"{provider}:{digest.hexdigest()}"
+
+    def is_valid(self, key: str) -> bool:
+        """Была ли успешная проверка не старше TTL"""
+        with self._lock:
+            checked_at = self._entries.get(key)
+        return checked_at is not None and time.time() - checked_at < self.ttl
+
+    def mark_valid(self, key: str):
+        """Запоминание успешной проверки"""
+        with self._lock:
+            self._entries[key] = time.time()
+            self._save()
+
+    def invalidate(self, key: str):
+        """Удаление записи (например, после ошибки аутентификации)"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def _load_secret(self) -> bytes:
+        if not self.path:
+            return secrets.token_bytes(32)
+        key_path = self.path.with_name(self.path.name + '.key')
+        try:
+            secret = key_path.read_bytes()
+            if len(secret) >= 32:
+                return secret
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning("Не удалось прочитать ключ кеша проверок %s: %s", key_path, e)
+            return secrets.token_bytes(32)
+        secret = secrets.token_bytes(32)
+        try:
+            self._write_atomic(key_path, secret)
+        except Exception as e:
+            self.logger.warning("Не удалось сохранить ключ кеша проверок %s: %s", key_path, e)
+        return secret
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            self._entries = {
+                key: float(checked_at)
+                for key, checked_at in json.loads(self.path.read_text(encoding='utf-8')).items()
+            }
+        except Exception as e:
+            self.logger.warning("Не удалось прочитать кеш проверок %s: %s", self.path, e)
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            self._write_atomic(self.path, json.dumps(self._entries).encode('utf-8'))
+        except Exception as e:
+            self.logger.warning("Не удалось сохранить кеш проверок %s: %s", self.path, e)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        """Запись через уникальный временный файл (доступ 0600) и os.replace"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + '.', suffix='.tmp', delete=False)
+        try:
+            with tmp:
+                tmp.write(data)
+            os.replace(tmp.name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp.name)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,75 @@
+import socket
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+class KeepAliveHTTPAdapter(HTTPAdapter):
+    """HTTP-адаптер с опцией TCP keep-alive для соединений пула"""
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['tcp_keepalive']
+
+    def __init__(self, tcp_keepalive: bool = True, **kwargs):
+        # Атрибут нужен до super().__init__, который вызывает init_poolmanager
+        self.tcp_keepalive = tcp_keepalive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.tcp_keepalive:
+            kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+def create_http_session(
+    pool_size: int = 10,
+    pool_block: bool = False,
+    keep_alive: bool = True,
+    headers: Optional[dict] = None
+) -> requests.Session:
+    """
+    Создание HTTP-сессии с пулом постоянных соединений.
+
+    Сессия потокобезопасна для отправки запросов и должна разделяться
+    всеми потоками одного отправщика.
+    """
+    session = requests.Session()
+    adapter = KeepAliveHTTPAdapter(
+        tcp_keepalive=keep_alive,
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        pool_block=pool_block
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    if headers:
+        session.headers.update(headers)
+
+    return session
+
+
+def create_aiohttp_session(
+    pool_size: int = 10,
+    keep_alive: bool = True,
+    timeout: float = 30,
+    headers: Optional[dict] = None
+):
+    """
+    Создание aiohttp-сессии с ограниченным пулом соединений.
+
+    Должна вызываться внутри работающего event loop.
+    """
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(limit=pool_size, force_close=not keep_alive)
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        headers=headers
+    )
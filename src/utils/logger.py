@@ -1,34 +1,144 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Логгер системы, который настраивает setup_logger; логгеры компонентов - его потомки
+# и попадают в те же обработчики (в том числе в очередь фоновой записи)
+ROOT_LOGGER = 'MessageSystem'
+
+# Атрибуты LogRecord; остальные поля записи пришли из extra и попадают в JSON
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Компактный структурированный формат: одна JSON-строка на запись"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exc'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str, separators=(',', ':'))
+
+    def formatTime(self, record, datefmt=None):
+        return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created))
+
+
+class _LoggerSetup:
+    """Обработчики, установленные setup_logger для одного логгера"""
+
+    def __init__(self, key: tuple, handlers: List[logging.Handler], listener=None):
+        self.key = key
+        self.handlers = handlers
+        self.listener = listener
+
+    def close(self):
+        if self.listener is not None:
+            # Остановка дожидается записи всех сообщений из очереди
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+        for handler in self.handlers:
+            handler.close()
+
+
+_setups: Dict[str, _LoggerSetup] = {}
+_setups_lock = threading.Lock()
+
 
 def setup_logger(
     name: str,
     log_level: str = "INFO",
     log_file: Optional[str] = None,
-    format_string: Optional[str] = None
+    format_string: Optional[str] = None,
+    json_format: bool = False,
+    async_logging: bool = False
 ) -> logging.Logger:
-    """Настройка логгера"""
-    
-    if format_string is None:
-        format_string = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    
+    """
+    Настройка логгера. Повторный вызов с теми же параметрами не добавляет
+    обработчиков, с другими - заменяет установленные ранее. При async_logging
+    запись в консоль и файл выполняет фоновый QueueListener, а вызывающий
+    поток только кладет запись в очередь.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, log_level.upper()))
-    
+    key = (log_file, format_string, json_format, async_logging)
+
+    with _setups_lock:
+        current = _setups.get(name)
+        if current is not None and current.key == key and all(h in logger.handlers for h in current.handlers):
+            return logger
+        if current is not None:
+            for handler in current.handlers:
+                logger.removeHandler(handler)
+            current.close()
+
+        formatter = JsonFormatter() if json_format else logging.Formatter(format_string or DEFAULT_FORMAT)
+        handlers = _create_handlers(log_file, formatter)
+        if async_logging:
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            setup = _LoggerSetup(key, [logging.handlers.QueueHandler(log_queue)], listener)
+        else:
+            setup = _LoggerSetup(key, handlers)
+
+        for handler in setup.handlers:
+            logger.addHandler(handler)
+        _setups[name] = setup
+    return logger
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Логгер компонента под логгером системы"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def _create_handlers(log_file: Optional[str], formatter: logging.Formatter) -> List[logging.Handler]:
     # Обработчик для вывода в консоль
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(logging.Formatter(format_string))
-    logger.addHandler(console_handler)
-    
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
     # Обработчик для файла если указан
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(logging.Formatter(format_string))
-        logger.addHandler(file_handler)
-    
-    return logger
+
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    return handlers
+
+
+def shutdown_loggers():
+    """Остановка фоновой записи и закрытие обработчиков, установленных setup_logger"""
+    with _setups_lock:
+        setups: List[Tuple[str, _LoggerSetup]] = list(_setups.items())
+        _setups.clear()
+    for name, setup in setups:
+        logger = logging.getLogger(name)
+        for handler in setup.handlers:
+            logger.removeHandler(handler)
+        setup.close()
+
+
+atexit.register(shutdown_loggers)
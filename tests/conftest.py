@@ -0,0 +1,9 @@
+import pytest
+import main
+
+@pytest.fixture
+def system():
+    """Система без файла конфигурации в режиме offline; отправщики подставляются тестом"""
+    system = main.MessageDeliverySystem(validate_credentials=False)
+    yield system
+    system.close()
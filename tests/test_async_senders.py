@@ -0,0 +1,132 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+import yaml
+import main
+from src.core.async_base_sender import AsyncBaseMessageSender
+from src.core.message import Message, MessagePriority, MessageType, DeliveryResult
+from src.core.metrics import DeliveryMetrics, MetricsRegistry
+from src.core.tracing import InMemorySpanExporter, RecordingTracer, set_tracer
+from src.providers.factory import SenderFactory
+from src.providers.async_email_sender import AsyncEmailSender
+from src.providers.async_telegram_sender import AsyncTelegramSender
+from benchmarks.fake_smtp import FakeSMTPServer
+
+ROOT = Path(__file__).parent.parent
+
+class FlakySender(AsyncBaseMessageSender):
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.calls = 0
+
+    async def send(self, message):
+        return await self._execute_with_retry(self._send, message)
+
+    async def _send(self, message):
+        self.calls += 1
+        return DeliveryResult(success=self.calls > self.failures, error="boom")
+
+    async def validate_credentials(self):
+        return True
+
+class TestAsyncSenders:
+    def test_retry_does_not_block_loop(self):
+        sender = FlakySender(failures=2, max_retries=3, retry_delay=0.01)
+        message = Message(message_type=MessageType.SMS, recipient="+7", content="hi")
+
+        result = asyncio.run(sender.send(message))
+
+        assert result.success
+        assert sender.calls == 3
+
+    def test_factory_creates_async_senders(self):
+        sender = SenderFactory.create_async_sender(MessageType.TELEGRAM, {'bot_token': 'token'})
+
+        assert isinstance(sender, AsyncTelegramSender)
+
+    def test_async_email_reuses_session(self):
+        with FakeSMTPServer() as server:
+            sender = AsyncEmailSender(
+                smtp_server='127.0.0.1', port=server.port,
+                username='from@example.com', password='secret',
+                use_tls=False, use_ssl=False, max_retries=1
+            )
+            message = Message(message_type=MessageType.EMAIL, recipient="to@example.com",
+                              subject="s", content="hello")
+
+            async def run():
+                results = await asyncio.gather(*(sender.send(message) for _ in range(6)))
+                await sender.close()
+                return results
+
+            results = asyncio.run(run())
+
+        assert all(result.success for result in results)
+        assert server.messages == 6
+        assert server.logins <= 4
+
+    def test_senders_built_from_default_config(self, tmp_path):
+        config = yaml.safe_load((ROOT / 'config' / 'default.yaml').read_text(encoding='utf-8'))
+        config['logging']['file'] = str(tmp_path / 'message_system.log')
+        config['delivery_log']['path'] = str(tmp_path / 'deliveries.db')
+        path = tmp_path / 'config.yaml'
+        path.write_text(yaml.safe_dump(config, allow_unicode=True), encoding='utf-8')
+        system = main.MessageDeliverySystem(str(path), validate_credentials=False)
+
+        system._initialize_async_senders()
+
+        assert set(system.async_senders) == set(MessageType)
+        assert system.async_senders[MessageType.EMAIL].stream_threshold == 5 * 1024 * 1024
+        system.close()
+
+class TestAsyncDeliveryPaths:
+    def test_fallback_steps_and_span(self, system, mocker):
+        system.metrics = DeliveryMetrics(MetricsRegistry())
+        failing = mocker.AsyncMock()
+        failing.send.return_value = DeliveryResult(success=False, error='down', error_type='ProviderError')
+        working = mocker.AsyncMock()
+        working.send.return_value = DeliveryResult(success=True)
+        system.async_senders = {MessageType.TELEGRAM: failing, MessageType.SMS: working}
+        exporter = InMemorySpanExporter()
+        previous = set_tracer(RecordingTracer(exporter))
+        try:
+            delivered = asyncio.run(system.asend_with_fallback(
+                Message(MessageType.TELEGRAM, '123', 'Текст'), [MessageType.TELEGRAM, MessageType.SMS]
+            ))
+        finally:
+            set_tracer(previous)
+
+        assert delivered
+        assert system.metrics.fallback_steps.value('telegram', 'failure') == 1
+        assert system.metrics.fallback_steps.value('sms', 'success') == 1
+        assert 'message.send' in [recorded.name for recorded in exporter.spans]
+
+    def test_invalid_credentials_disable_async_sender(self, system, mocker):
+        sender = mocker.AsyncMock()
+        sender.send.return_value = DeliveryResult(success=False, error='401', error_type='AuthenticationError')
+        sender.validate_credentials.return_value = False
+        system.async_senders = {MessageType.SMS: sender}
+
+        assert not asyncio.run(system.asend_message(Message(MessageType.SMS, '+7', 'Текст')))
+
+        sender.validate_credentials.assert_awaited_once()
+        assert MessageType.SMS not in system.async_senders
+        assert sender in system._retired_async
+
+    def test_abroadcast_records_queue_latency(self, system, mocker):
+        sender = mocker.AsyncMock()
+        sender.send.return_value = DeliveryResult(success=True)
+        system.async_senders = {MessageType.SMS: sender}
+        messages = [
+            Message(MessageType.SMS, '+71', 'Текст', priority=MessagePriority.HIGH),
+            Message(MessageType.SMS, '+72', 'Текст', priority=MessagePriority.LOW),
+        ]
+
+        results = asyncio.run(system.abroadcast(messages))
+
+        latency = system.get_queue_latency()
+        assert results['successful'] == 2
+        assert latency['high']['count'] == 1
+        assert latency['low']['count'] == 1
@@ -0,0 +1,87 @@
+import logging
+import os
+import pytest
+from email import message_from_string
+from email.mime.application import MIMEApplication
+from src.core.message import Message, MessageType
+from src.providers.attachment_cache import AttachmentCache, attachment_part
+from src.providers.email_sender import build_email
+
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def report(tmp_path):
+    path = tmp_path / 'report.pdf'
+    path.write_bytes(os.urandom(4096))
+    return path
+
+class TestAttachmentCache:
+    def test_file_encoded_once(self, report, mocker):
+        cache = AttachmentCache()
+        store = mocker.spy(cache, '_store')
+
+        first = cache.get(str(report))
+        second = cache.get(str(report))
+
+        assert first is second
+        assert store.call_count == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_modified_file_reencoded(self, report):
+        cache = AttachmentCache()
+        first = cache.get(str(report))
+
+        report.write_bytes(b'new content')
+        second = cache.get(str(report))
+
+        assert first.encoded != second.encoded
+
+    def test_lru_eviction_by_byte_budget(self, tmp_path):
+        paths = []
+        for name in ('a', 'b', 'c'):
+            path = tmp_path / name
+            path.write_bytes(b'x' * 300)
+            paths.append(str(path))
+        cache = AttachmentCache(max_bytes=1000)
+
+        cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[0])
+        cache.get(paths[2])
+
+        assert len(cache) == 2
+        assert cache.size <= 1000
+        cache.get(paths[0])
+        assert cache.hits == 2
+
+    def test_oversized_attachment_not_cached(self, report):
+        cache = AttachmentCache(max_bytes=100)
+
+        cache.get(str(report))
+
+        assert len(cache) == 0
+
+    def test_part_matches_uncached_encoding(self, report):
+        expected = MIMEApplication(report.read_bytes(), Name='report.pdf')
+        part = attachment_part(str(report), AttachmentCache())
+
+        assert part.get_payload(decode=True) == expected.get_payload(decode=True)
+        assert part['Content-Transfer-Encoding'] == 'base64'
+        assert part.get_filename() == 'report.pdf'
+
+class TestBuildEmailWithCache:
+    def test_messages_share_encoded_payload(self, report):
+        cache = AttachmentCache()
+        messages = [
+            Message(message_type=MessageType.EMAIL, recipient=f'user{i}@example.com',
+                    content='hi', attachments=[str(report)])
+            for i in range(3)
+        ]
+
+        built = [build_email('from@example.com', message, logger, cache) for message in messages]
+
+        payloads = [msg.get_payload()[1].get_payload() for msg in built]
+        assert payloads[0] is payloads[1] is payloads[2]
+        parsed = message_from_string(built[2].as_string())
+        assert parsed['To'] == 'user2@example.com'
+        assert parsed.get_payload()[1].get_payload(decode=True) == report.read_bytes()
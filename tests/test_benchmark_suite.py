@@ -0,0 +1,41 @@
+import argparse
+import json
+
+from benchmarks import suite
+
+def options(**overrides):
+    values = dict(
+        messages=6, latency=0.0, error_rate=0.0, rate_limit_every=0, retry_after=0.01,
+        max_retries=2, batch_size=3, scenarios=list(suite.SCENARIOS)
+    )
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+class TestBenchmarkSuite:
+    def test_all_scenarios_produce_results(self):
+        results = suite.run_suite(options(rate_limit_every=4))
+
+        assert set(results['scenarios']) == set(suite.SCENARIOS)
+        for result in results['scenarios'].values():
+            assert result['messages'] == 6
+            assert result['throughput'] > 0
+            assert result['latency']['p50'] is not None
+        assert results['scenarios']['send_message.sms']['successful'] == 6
+        assert results['stand_in']['http']['rate_limited'] > 0
+        json.dumps(results)
+
+    def test_compare_reports_regressions(self):
+        def document(throughput, p99):
+            return {'scenarios': {'broadcast': {'throughput': throughput, 'latency': {'p99': p99}}}}
+
+        assert suite.compare(document(95, 0.011), document(100, 0.010)) == []
+        regressions = suite.compare(document(50, 0.030), document(100, 0.010))
+        assert len(regressions) == 2
+        assert regressions[0].startswith('broadcast: throughput')
+
+    def test_percentiles(self):
+        stats = suite.percentiles([0.001 * i for i in range(1, 101)])
+
+        assert stats['p50'] == 0.05
+        assert stats['p99'] == 0.099
+        assert stats['max'] == 0.1
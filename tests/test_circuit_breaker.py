@@ -0,0 +1,81 @@
+import pytest
+from src.core.circuit_breaker import CircuitBreaker, CircuitState
+from src.core.message import DeliveryResult, Message, MessageType
+
+def make_breaker(**kwargs):
+    params = dict(failure_rate_threshold=0.5, window_size=4, minimum_calls=4, open_timeout=30)
+    params.update(kwargs)
+    return CircuitBreaker("test", **params)
+
+class TestCircuitBreaker:
+    def test_opens_on_failure_rate(self):
+        breaker = make_breaker()
+        for outcome in (True, False, True, False):
+            breaker.record_success() if outcome else breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow_request()
+
+    def test_half_open_probe_closes_on_success(self, mocker):
+        clock = mocker.patch('src.core.circuit_breaker.time.time', return_value=1000.0)
+        breaker = make_breaker(minimum_calls=1)
+        breaker.record_failure()
+
+        clock.return_value = 1031.0
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+        breaker.record_success()
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_probe_failure_reopens(self, mocker):
+        clock = mocker.patch('src.core.circuit_breaker.time.time', return_value=1000.0)
+        breaker = make_breaker(minimum_calls=1)
+        breaker.record_failure()
+
+        clock.return_value = 1031.0
+        breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.snapshot()['state'] == 'open'
+        assert breaker.snapshot()['retry_at'] == 1061.0
+
+    def test_abandoned_probe_expires(self, mocker):
+        clock = mocker.patch('src.core.circuit_breaker.time.time', return_value=1000.0)
+        breaker = make_breaker(minimum_calls=1)
+        breaker.record_failure()
+
+        clock.return_value = 1031.0
+        assert breaker.allow_request()
+        clock.return_value = 1061.0
+        assert not breaker.allow_request()
+        assert breaker.state == CircuitState.OPEN
+
+        clock.return_value = 1091.0
+        assert breaker.allow_request()
+
+    def test_disabled_in_config(self):
+        assert CircuitBreaker.from_config({'enabled': False}, name='sms') is None
+
+class TestFallbackSkipsOpenProvider:
+    def test_open_provider_skipped_without_call(self, system, mocker):
+        system.breakers = {msg_type: make_breaker(minimum_calls=1) for msg_type in MessageType}
+        telegram, sms = mocker.Mock(), mocker.Mock()
+        sms.send.return_value = DeliveryResult(success=True)
+        system.senders = {MessageType.TELEGRAM: telegram, MessageType.SMS: sms}
+        system.breakers[MessageType.TELEGRAM].record_failure()
+        message = Message(message_type=None, recipient="+7", content="hi")
+
+        assert system.send_with_fallback(message, [MessageType.TELEGRAM, MessageType.SMS])
+        telegram.send.assert_not_called()
+        assert system.get_circuit_states()['telegram']['state'] == 'open'
+
+    def test_recipient_errors_do_not_open_circuit(self, system, mocker):
+        system.breakers = {MessageType.TELEGRAM: make_breaker(minimum_calls=1)}
+        sender = mocker.Mock()
+        sender.send.return_value = DeliveryResult(success=False, error_type='RecipientError')
+        system.senders = {MessageType.TELEGRAM: sender}
+
+        system.send_message(Message(message_type=MessageType.TELEGRAM, recipient="1", content="hi"))
+
+        assert system.get_circuit_states()['telegram']['state'] == 'closed'
@@ -0,0 +1,47 @@
+import threading
+import time
+import pytest
+from src.core.concurrency import ProviderConcurrencyLimiter, ProviderWorkerPool
+from src.core.message import MessageType
+
+class TestProviderConcurrencyLimiter:
+    def test_limits_from_config(self):
+        limiter = ProviderConcurrencyLimiter.from_config({
+            'default_concurrency': 3,
+            'concurrency': {'email': 2}
+        })
+
+        assert limiter.limit(MessageType.EMAIL) == 2
+        assert limiter.limit(MessageType.SMS) == 3
+
+class TestProviderWorkerPool:
+    def test_lane_limit_is_respected(self):
+        limiter = ProviderConcurrencyLimiter({MessageType.EMAIL: 2})
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def task():
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.01)
+            with lock:
+                state['active'] -= 1
+
+        with ProviderWorkerPool(limiter) as pool:
+            futures = [pool.submit(MessageType.EMAIL, task) for _ in range(10)]
+            for future in futures:
+                future.result()
+
+        assert state['peak'] == 2
+
+    def test_lanes_do_not_block_each_other(self):
+        limiter = ProviderConcurrencyLimiter({MessageType.EMAIL: 1, MessageType.SMS: 1})
+        release = threading.Event()
+
+        with ProviderWorkerPool(limiter) as pool:
+            slow = pool.submit(MessageType.EMAIL, release.wait, 5)
+            fast = pool.submit(MessageType.SMS, lambda: 'sms')
+            assert fast.result(timeout=1) == 'sms'
+            release.set()
+            assert slow.result()
@@ -0,0 +1,198 @@
+import os
+import threading
+
+import pytest
+import yaml
+import main
+from src.core.exceptions import ConfigurationError
+from src.core.message import MessageType
+from src.utils.config import Config, ConfigWatcher, interpolate
+
+def write_config(path, config):
+    path.write_text(yaml.safe_dump(config), encoding='utf-8')
+    # Отметка времени меняется явно: запись в пределах одного тика файловой системы
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / 'config.yaml'
+    write_config(path, {
+        'startup': {'cache_file': str(tmp_path / 'credentials.json')},
+        'telegram': {'bot_token': 'token-1'},
+        'sms': {'api_key': 'key', 'folder_id': 'folder'},
+    })
+    return path
+
+class TestInterpolation:
+    def test_placeholders_expanded(self):
+        environ = {'TOKEN': 'abc', 'HOST': 'smtp.example.com'}
+        data = {
+            'token': '${TOKEN}',
+            'url': 'https://${HOST}:${PORT:-465}/send',
+            'missing': '${MISSING}',
+            'nested': [{'value': '${MISSING:-fallback}'}],
+        }
+
+        assert interpolate(data, environ) == {
+            'token': 'abc',
+            'url': 'https://smtp.example.com:465/send',
+            'missing': None,
+            'nested': [{'value': 'fallback'}],
+        }
+
+    def test_value_typed_by_default(self):
+        assert interpolate('${PORT:-587}', {}) == 587
+        assert interpolate('${PORT:-587}', {'PORT': '2525'}) == 2525
+        assert interpolate('${RATE:-0.5}', {}) == 0.5
+        assert interpolate('${TLS:-true}', {'TLS': 'False'}) is False
+        # Без значения по умолчанию строка из окружения не меняет тип
+        assert interpolate('${PASSWORD}', {'PASSWORD': '12345'}) == '12345'
+
+    def test_invalid_typed_value_rejected(self):
+        with pytest.raises(ConfigurationError):
+            interpolate('${PORT:-587}', {'PORT': 'abc'})
+
+    def test_file_values_interpolated(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('BOT_TOKEN_TEST', 'secret')
+        path = tmp_path / 'config.yaml'
+        path.write_text("telegram:\n  bot_token: ${BOT_TOKEN_TEST}\n  timeout: ${TIMEOUT_TEST:-15}\n", encoding='utf-8')
+
+        config = Config(str(path))
+
+        assert config.get('telegram.bot_token') == 'secret'
+        assert config.get('telegram.timeout') == 15
+
+class TestSnapshot:
+    def test_dotted_lookup(self, config_file):
+        config = Config(str(config_file))
+
+        assert config.get('telegram.bot_token') == 'token-1'
+        assert config.get('telegram.missing', 'default') == 'default'
+        assert config.get('telegram.bot_token.deeper') is None
+        assert config.get_provider_config('sms') == {'api_key': 'key', 'folder_id': 'folder'}
+
+    def test_sections_are_frozen(self, config_file):
+        config = Config(str(config_file))
+        section = config.get('telegram')
+
+        with pytest.raises(TypeError):
+            section['bot_token'] = 'other'
+        copy = dict(section)
+        copy['bot_token'] = 'other'
+        assert config.get('telegram.bot_token') == 'token-1'
+
+    def test_reload_swaps_snapshot_and_notifies(self, config_file):
+        config = Config(str(config_file))
+        changes = []
+        config.subscribe(lambda previous, snapshot: changes.append(snapshot.changed_sections(previous)))
+        write_config(config_file, {
+            'startup': dict(config.get('startup')),
+            'telegram': {'bot_token': 'token-2'},
+            'sms': {'api_key': 'key', 'folder_id': 'folder'},
+        })
+
+        assert config.reload()
+        assert config.get('telegram.bot_token') == 'token-2'
+        assert changes == [frozenset({'telegram'})]
+        assert not config.reload()
+
+    def test_broken_file_keeps_snapshot(self, config_file):
+        config = Config(str(config_file))
+        snapshot = config.snapshot
+        config_file.write_text('telegram: [unclosed', encoding='utf-8')
+
+        assert not config.reload()
+        assert config.snapshot is snapshot
+        assert config.get('telegram.bot_token') == 'token-1'
+
+    def test_watcher_detects_change(self, config_file):
+        config = Config(str(config_file))
+        watcher = ConfigWatcher(config)
+
+        assert not watcher.check()
+        write_config(config_file, {'telegram': {'bot_token': 'token-2'}})
+
+        assert watcher.check()
+        assert config.get('telegram.bot_token') == 'token-2'
+        assert config.get('sms') is None
+
+class TestHotReload:
+    @pytest.fixture
+    def create_sender(self, mocker):
+        return mocker.patch.object(
+            main.SenderFactory, 'create_sender',
+            side_effect=lambda msg_type, config: mocker.Mock(name=msg_type.value)
+        )
+
+    @pytest.fixture
+    def system(self, config_file, create_sender):
+        system = main.MessageDeliverySystem(str(config_file), startup_mode='eager')
+        yield system
+        system.close()
+
+    def test_only_affected_sender_rebuilt(self, system, config_file):
+        telegram = system.senders[MessageType.TELEGRAM]
+        sms = system.senders[MessageType.SMS]
+
+        write_config(config_file, {
+            'startup': dict(system.config.get('startup')),
+            'telegram': {'bot_token': 'token-2'},
+            'sms': {'api_key': 'key', 'folder_id': 'folder'},
+        })
+        system.config.reload()
+
+        assert system.senders[MessageType.SMS] is sms
+        assert system.senders[MessageType.TELEGRAM] is not telegram
+        telegram.close.assert_called_once()
+        sms.close.assert_not_called()
+
+    def test_retry_change_rebuilds_all(self, system):
+        senders = dict(system.senders)
+
+        system.config.set('retry', {'max_retries': 5})
+
+        assert system.retry_policy.max_retries == 5
+        for msg_type, sender in senders.items():
+            assert system.senders[msg_type] is not sender
+
+    def test_failed_validation_keeps_old_sender(self, system, create_sender, mocker):
+        old = system.senders[MessageType.TELEGRAM]
+        rejected = mocker.Mock()
+        rejected.validate_credentials.return_value = False
+        create_sender.side_effect = lambda msg_type, config: rejected
+
+        system.config.set('telegram.bot_token', 'token-2')
+
+        assert system.senders[MessageType.TELEGRAM] is old
+        assert system._get_sender(MessageType.TELEGRAM) is old
+        old.close.assert_not_called()
+        rejected.close.assert_called_once()
+
+    def test_removed_section_disables_sender(self, system):
+        system.config.set('sms', None)
+
+        assert system._get_sender(MessageType.SMS) is None
+
+    def test_in_flight_send_completes_on_old_sender(self, system, mocker):
+        old = system.senders[MessageType.TELEGRAM]
+        started, release = threading.Event(), threading.Event()
+
+        def slow_send(message):
+            started.set()
+            release.wait(5)
+            return mocker.Mock(success=True, message_id='1', error=None)
+
+        old.send.side_effect = slow_send
+        message = main.Message(MessageType.TELEGRAM, '123', 'Текст')
+        outcome = []
+        worker = threading.Thread(target=lambda: outcome.append(system.send_message(message)))
+        worker.start()
+        started.wait(5)
+
+        system.config.set('telegram.bot_token', 'token-2')
+        assert system.senders[MessageType.TELEGRAM] is not old
+        release.set()
+        worker.join(5)
+
+        assert outcome == [True]
@@ -0,0 +1,139 @@
+import sqlite3
+import time
+
+import pytest
+import yaml
+import main
+from src.core.delivery_log import DeliveryLog, STATUS_DELIVERED, STATUS_FAILED
+from src.core.exceptions import ConfigurationError
+from src.core.message import DeliveryResult, Message, MessagePriority, MessageType
+
+def sms(recipient='+79990000001'):
+    return Message(MessageType.SMS, recipient, 'Текст', priority=MessagePriority.HIGH)
+
+@pytest.fixture
+def log(tmp_path):
+    log = DeliveryLog(str(tmp_path / 'deliveries.db'), flush_interval=0.05).start()
+    yield log
+    log.close()
+
+class TestDeliveryLog:
+    def test_records_queryable_after_flush(self, log):
+        now = time.time()
+        log.record('sms', sms(), DeliveryResult(success=True, message_id='a', timestamp=now - 10))
+        log.record('sms', sms(), DeliveryResult(
+            success=False, error='Ошибка', error_type='NetworkError', attempts=3, timestamp=now
+        ))
+        log.record('email', sms('other@example.com'), DeliveryResult(success=True, timestamp=now))
+
+        assert log.flush()
+        history = log.query(recipient='+79990000001')
+
+        assert [row['status'] for row in history] == [STATUS_FAILED, STATUS_DELIVERED]
+        assert history[0]['error_type'] == 'NetworkError'
+        assert history[0]['attempts'] == 3
+        assert history[0]['priority'] == 'high'
+        assert history[1]['message_id'] == 'a'
+
+    def test_counts_and_summary(self, log):
+        now = time.time()
+        for offset, success in ((7200, False), (60, False), (30, True)):
+            log.record('sms', sms(), DeliveryResult(success=success, timestamp=now - offset))
+        log.record('telegram', sms('42'), DeliveryResult(success=True, timestamp=now))
+        log.flush()
+
+        assert log.count(provider='sms', status=STATUS_FAILED, since=now - 3600) == 1
+        assert log.count(provider='sms', status=STATUS_FAILED) == 2
+        assert log.summary(since=now - 3600) == {
+            'sms': {STATUS_DELIVERED: 1, STATUS_FAILED: 1},
+            'telegram': {STATUS_DELIVERED: 1, STATUS_FAILED: 0},
+        }
+        assert log.summary()['sms'][STATUS_FAILED] == 2
+
+    def test_wal_mode_and_indexes(self, log):
+        connection = sqlite3.connect(log.path)
+        try:
+            assert connection.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+            plan = connection.execute(
+                "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM deliveries WHERE provider = ? AND status = ? AND ts >= ?",
+                ('sms', STATUS_FAILED, 0)
+            ).fetchall()
+        finally:
+            connection.close()
+
+        assert 'deliveries_provider_status_ts' in str(plan)
+
+    def test_close_writes_pending_records(self, tmp_path):
+        log = DeliveryLog(str(tmp_path / 'deliveries.db'), flush_interval=10).start()
+        for i in range(1200):
+            log.record('sms', sms(f'+7999{i:07d}'), DeliveryResult(success=True))
+        log.close()
+
+        reopened = DeliveryLog(log.path)
+        assert reopened.count() == 1200
+        reopened.close()
+
+    def test_overflow_drops_instead_of_blocking(self, tmp_path):
+        log = DeliveryLog(str(tmp_path / 'deliveries.db'), max_queue=2)
+        for _ in range(5):
+            log.record('sms', sms(), DeliveryResult(success=True))
+
+        assert log.dropped == 3
+
+    def test_expired_records_purged(self, tmp_path):
+        log = DeliveryLog(str(tmp_path / 'deliveries.db'), retention_days=1, flush_interval=0.05).start()
+        log.record('sms', sms(), DeliveryResult(success=True, timestamp=time.time() - 2 * 86400))
+        log.record('sms', sms(), DeliveryResult(success=True))
+        log.flush()
+        log._purged_at = 0.0
+        log.flush()
+        time.sleep(0.1)
+
+        assert log.count() == 1
+        log.close()
+
+    def test_from_config(self, tmp_path):
+        assert DeliveryLog.from_config({}) is None
+        assert DeliveryLog.from_config({'enabled': False}) is None
+        with pytest.raises(ConfigurationError):
+            DeliveryLog.from_config({'enabled': True, 'backend': 'postgres'})
+
+        log = DeliveryLog.from_config({'enabled': True, 'path': str(tmp_path / 'log.db'), 'batch_size': 10})
+        assert log.batch_size == 10
+
+class TestDeliverySystemLog:
+    @pytest.fixture
+    def logged_system(self, tmp_path, mocker):
+        config = {
+            'startup': {'cache_file': str(tmp_path / 'credentials.json')},
+            'sms': {'api_key': 'key', 'folder_id': 'folder'},
+            'delivery_log': {'enabled': True, 'path': str(tmp_path / 'deliveries.db'), 'flush_interval': 0.05},
+        }
+        path = tmp_path / 'config.yaml'
+        path.write_text(yaml.safe_dump(config), encoding='utf-8')
+        sender = mocker.Mock()
+        sender.send.side_effect = [
+            DeliveryResult(success=True, message_id='1', timestamp=time.time()),
+            DeliveryResult(success=False, error='Ошибка', error_type='NetworkError', timestamp=time.time()),
+        ]
+        mocker.patch.object(main.SenderFactory, 'create_sender', return_value=sender)
+        system = main.MessageDeliverySystem(str(path), startup_mode='offline')
+        yield system
+        system.close()
+
+    def test_sends_recorded(self, logged_system):
+        system = logged_system
+        system.send_message(sms())
+        system.send_message(sms())
+        system.delivery_log.flush()
+
+        history = system.get_delivery_history('+79990000001')
+
+        assert [row['status'] for row in history] == [STATUS_FAILED, STATUS_DELIVERED]
+        assert system.count_deliveries(provider=MessageType.SMS, status=STATUS_FAILED, since=time.time() - 3600) == 1
+        assert system.query_deliveries(provider=MessageType.SMS, status=STATUS_DELIVERED)[0]['message_id'] == '1'
+        assert system.get_delivery_summary()['sms'] == {STATUS_DELIVERED: 1, STATUS_FAILED: 1}
+
+    def test_queries_require_enabled_log(self, system):
+        with pytest.raises(ConfigurationError):
+            system.get_delivery_history('+79990000001')
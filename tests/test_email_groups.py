@@ -0,0 +1,104 @@
+import pytest
+from benchmarks.fake_smtp import FakeSMTPServer
+from src.core.message import DeliveryResult, Message, MessagePriority, MessageType
+from src.core.metrics import DeliveryMetrics, MetricsRegistry
+from src.providers.email_sender import EmailSender
+
+def make_email(recipient, content='Новости недели', **kwargs):
+    return Message(MessageType.EMAIL, recipient, content, subject='Дайджест', **kwargs)
+
+@pytest.fixture
+def server():
+    with FakeSMTPServer(refused_recipients={'ghost@example.com'}) as server:
+        yield server
+
+@pytest.fixture
+def sender(server):
+    sender = EmailSender(
+        smtp_server='127.0.0.1', port=server.port, username='from@example.com',
+        password='secret', use_tls=False, use_ssl=False, max_retries=1
+    )
+    yield sender
+    sender.close()
+
+class TestEmailSenderGroup:
+    def test_group_sent_in_one_transaction(self, server, sender):
+        messages = [make_email(f'user{i}@example.com') for i in range(20)]
+
+        results = sender.send_group(messages)
+
+        assert all(result.success for result in results)
+        assert server.messages == 1
+        assert server.recipients == 20
+
+    def test_refusals_mapped_to_recipients(self, server, sender):
+        messages = [make_email('a@example.com'), make_email('ghost@example.com'), make_email('b@example.com')]
+
+        results = sender.send_group(messages)
+
+        assert [result.success for result in results] == [True, False, True]
+        assert results[1].error_type == 'RecipientError'
+        assert '550' in results[1].error
+
+    def test_all_refused(self, server, sender):
+        results = sender.send_group([make_email('ghost@example.com'), make_email('ghost@example.com')])
+
+        assert not any(result.success for result in results)
+        assert {result.error_type for result in results} == {'RecipientError'}
+        assert server.messages == 0
+
+    def test_metrics_per_recipient(self, server, sender, mocker):
+        metrics = DeliveryMetrics(MetricsRegistry())
+        mocker.patch('src.core.sender_core.DELIVERY_METRICS', metrics)
+        messages = [make_email(f'user{i}@example.com') for i in range(9)] + [make_email('ghost@example.com')]
+
+        sender.send_group(messages)
+
+        assert metrics.deliveries.value('email', 'success', '', 'normal') == 9
+        assert metrics.deliveries.value('email', 'failure', 'RecipientError', 'normal') == 1
+
+    def test_rate_limit_token_per_envelope_recipient(self, server, sender, mocker):
+        sender.rate_limiter = mocker.Mock()
+        messages = [make_email('a@example.com'), make_email('b@example.com'), make_email('a@example.com')]
+
+        sender.send_group(messages)
+
+        acquired = [call.args[0] for call in sender.rate_limiter.acquire.call_args_list]
+        assert sorted(acquired) == ['a@example.com', 'b@example.com']
+
+class TestBroadcastEmailGrouping:
+    @pytest.fixture
+    def system(self, system):
+        system.config.set('broadcast', {'email_group_size': 3})
+        return system
+
+    def test_identical_emails_grouped(self, system):
+        messages = [make_email(f'u{i}@example.com') for i in range(7)]
+        messages.insert(2, make_email('other@example.com', content='Другое'))
+        messages.append(make_email('vip@example.com', priority=MessagePriority.HIGH))
+
+        units = system._plan_units(messages, system._priority_order(messages), use_fallback=False)
+
+        assert [len(unit.indices) for unit in units] == [1, 3, 1, 3, 1]
+        assert units[0] == ('single', [8])
+
+    def test_results_mapped_back_in_order(self, system, mocker):
+        sender = mocker.Mock(spec=EmailSender)
+        sender.send_group.side_effect = lambda group: [
+            DeliveryResult(success=message.recipient != 'bad@example.com', error_type=None)
+            for message in group
+        ]
+        system.senders = {MessageType.EMAIL: sender}
+        messages = [make_email('a@example.com'), make_email('bad@example.com'), make_email('c@example.com')]
+
+        results = system.broadcast(messages)
+
+        assert sender.send_group.call_count == 1
+        assert [detail['success'] for detail in results['details']] == [True, False, True]
+
+    def test_grouping_disabled_with_fallback(self, system):
+        messages = [make_email(f'u{i}@example.com') for i in range(3)]
+
+        units = system._plan_units(messages, [0, 1, 2], use_fallback=True)
+
+        assert [unit.indices for unit in units] == [[0], [1], [2]]
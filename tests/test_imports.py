@@ -0,0 +1,61 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import src
+from benchmarks.bench_import import HEAVY_MODULES, parse_importtime
+from src.core.message import MessageType
+from src.providers.factory import SenderFactory
+
+ROOT = Path(__file__).parent.parent
+
+def loaded_modules(code: str) -> set:
+    completed = subprocess.run(
+        [sys.executable, '-c', f"import sys; {code}; print(' '.join(sys.modules))"],
+        capture_output=True, text=True, check=True, cwd=ROOT
+    )
+    return set(completed.stdout.split())
+
+class TestLazyImports:
+    def test_import_main_skips_broker_and_clients(self):
+        modules = loaded_modules('import main')
+
+        assert not modules & set(HEAVY_MODULES)
+        assert 'src.tasks' not in modules
+        assert 'src.providers.email_sender' not in modules
+
+    def test_sync_sender_does_not_load_aiohttp(self):
+        modules = loaded_modules(
+            "from src.providers.factory import SenderFactory; from src.core.message import MessageType; "
+            "SenderFactory.create_sender(MessageType.TELEGRAM, {'bot_token': 'token'})"
+        )
+
+        assert 'requests' in modules
+        assert 'aiohttp' not in modules
+        assert 'celery' not in modules
+
+    def test_package_exports_resolve_on_access(self):
+        assert src.Message is __import__('src.core.message', fromlist=['Message']).Message
+        assert 'SenderFactory' in dir(src)
+        with pytest.raises(AttributeError):
+            src.Missing
+
+    def test_factory_resolves_registered_path(self):
+        sender_class = SenderFactory._resolve(SenderFactory._senders, MessageType.EMAIL)
+
+        assert sender_class.__name__ == 'EmailSender'
+        assert SenderFactory._senders[MessageType.EMAIL] is sender_class
+
+class TestImportBenchmark:
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   yaml.reader\n"
+            "import time:      1500 |       1620 | main\n"
+        )
+
+        records = parse_importtime(stderr)
+
+        assert [(record.module, record.depth) for record in records] == [('yaml.reader', 1), ('main', 0)]
+        assert records[-1].cumulative_us == 1620
@@ -0,0 +1,107 @@
+import json
+import logging
+import logging.handlers
+import sys
+
+import pytest
+from src.core.base_sender import BaseMessageSender
+from src.core.message import DeliveryResult, Message, MessageType
+from src.utils.logger import ROOT_LOGGER, JsonFormatter, setup_logger, shutdown_loggers
+
+class FailingSender(BaseMessageSender):
+    def send(self, message):
+        return self._execute_with_retry(lambda _: DeliveryResult(success=False, error='timeout'), message)
+
+    def validate_credentials(self):
+        return True
+
+@pytest.fixture(autouse=True)
+def cleanup():
+    yield
+    shutdown_loggers()
+
+class TestSetupLogger:
+    def test_repeated_setup_does_not_duplicate_handlers(self, tmp_path):
+        log_file = str(tmp_path / 'app.log')
+        logger = setup_logger('test.idempotent', log_file=log_file)
+        handlers = list(logger.handlers)
+
+        assert setup_logger('test.idempotent', log_file=log_file) is logger
+        assert logger.handlers == handlers
+        assert len(handlers) == 2
+
+    def test_new_parameters_replace_handlers(self, tmp_path):
+        logger = setup_logger('test.replace', log_file=str(tmp_path / 'a.log'))
+        setup_logger('test.replace', log_file=str(tmp_path / 'b.log'))
+
+        logger.warning('запись')
+        for handler in logger.handlers:
+            handler.flush()
+
+        assert len(logger.handlers) == 2
+        assert (tmp_path / 'a.log').read_text(encoding='utf-8') == ''
+        assert 'запись' in (tmp_path / 'b.log').read_text(encoding='utf-8')
+
+    def test_async_writes_on_listener_thread(self, tmp_path):
+        log_file = tmp_path / 'async.log'
+        logger = setup_logger('test.async', log_file=str(log_file), async_logging=True)
+
+        assert [type(handler) for handler in logger.handlers] == [logging.handlers.QueueHandler]
+        for i in range(100):
+            logger.info('Сообщение %d', i)
+        shutdown_loggers()
+
+        lines = log_file.read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 100
+        assert lines[-1].endswith('Сообщение 99')
+        assert logger.handlers == []
+
+    def test_level_is_applied(self, tmp_path):
+        log_file = tmp_path / 'level.log'
+        logger = setup_logger('test.level', log_level='ERROR', log_file=str(log_file))
+
+        logger.warning('пропущено')
+        logger.error('записано')
+
+        assert log_file.read_text(encoding='utf-8').strip().endswith('записано')
+
+    def test_component_warnings_reach_queued_file(self, tmp_path):
+        log_file = tmp_path / 'system.log'
+        setup_logger(ROOT_LOGGER, log_file=str(log_file), async_logging=True)
+
+        FailingSender(max_retries=1).send(Message(MessageType.SMS, '+7', 'Текст'))
+        shutdown_loggers()
+
+        assert 'MessageSystem.FailingSender - WARNING - Попытка 1 не удалась: timeout' in log_file.read_text(encoding='utf-8')
+
+class TestJsonFormatter:
+    def test_formats_record_as_json_line(self):
+        record = logging.LogRecord('test', logging.WARNING, __file__, 1, 'Попытка %d: %s', (2, 'timeout'), None)
+        record.provider = 'sms'
+
+        data = json.loads(JsonFormatter().format(record))
+
+        assert data['level'] == 'WARNING'
+        assert data['logger'] == 'test'
+        assert data['msg'] == 'Попытка 2: timeout'
+        assert data['provider'] == 'sms'
+
+    def test_includes_exception(self):
+        try:
+            raise ValueError('сбой')
+        except ValueError:
+            record = logging.LogRecord('test', logging.ERROR, __file__, 1, 'ошибка', (), sys.exc_info())
+
+        data = json.loads(JsonFormatter().format(record))
+
+        assert 'ValueError: сбой' in data['exc']
+
+    def test_json_logger_writes_lines(self, tmp_path):
+        log_file = tmp_path / 'json.log'
+        logger = setup_logger('test.json', log_file=str(log_file), json_format=True)
+
+        logger.info('Отправлено %s', 'id-1', extra={'provider': 'email'})
+
+        data = json.loads(log_file.read_text(encoding='utf-8'))
+        assert data['msg'] == 'Отправлено id-1'
+        assert data['provider'] == 'email'
@@ -0,0 +1,61 @@
+import dataclasses
+import json
+import pytest
+from src import tasks
+from src.core.message import DeliveryResult, Message, MessagePriority, MessageType, intern_chain
+
+@pytest.fixture
+def message():
+    return Message(
+        MessageType.EMAIL, 'user@example.com', 'Текст', subject='Тема',
+        attachments=['report.pdf'], priority=MessagePriority.HIGH, metadata={'campaign': 7}
+    )
+
+class TestCompactMessage:
+    def test_instances_have_no_dict(self, message):
+        assert not hasattr(message, '__dict__')
+        assert not hasattr(DeliveryResult(success=True), '__dict__')
+        with pytest.raises(AttributeError):
+            message.unknown = 1
+
+    def test_constructor_api_unchanged(self):
+        message = Message(message_type=MessageType.SMS, recipient='+7', content='hi')
+
+        assert message.priority is MessagePriority.NORMAL
+        assert dataclasses.replace(message, content='bye').content == 'bye'
+
+    def test_tuple_roundtrip_through_json(self, message):
+        data = json.loads(json.dumps(message.to_tuple()))
+
+        assert Message.from_tuple(data) == message
+
+    def test_defaults_trimmed_from_tuple(self):
+        message = Message(MessageType.SMS, '+7', 'hi')
+
+        assert message.to_tuple() == ('sms', '+7', 'hi')
+
+    def test_bytes_roundtrip(self, message):
+        assert Message.from_bytes(message.to_bytes()) == message
+
+    def test_repeated_text_shared_after_decoding(self, message):
+        payloads = [json.loads(json.dumps(message.to_tuple())) for _ in range(2)]
+
+        first, second = (Message.from_tuple(payload) for payload in payloads)
+
+        assert first.content is second.content
+        assert first.subject is second.subject
+
+    def test_delivery_result_tuple_roundtrip(self):
+        result = DeliveryResult(success=False, error='timeout', error_type='NetworkError', attempts=3)
+
+        assert DeliveryResult.from_tuple(result.to_tuple()) == result
+
+    def test_chain_shared(self):
+        chain = intern_chain(['telegram', 'sms'])
+
+        assert chain == (MessageType.TELEGRAM, MessageType.SMS)
+        assert intern_chain([MessageType.TELEGRAM, MessageType.SMS]) is chain
+
+    def test_task_payload_accepts_both_formats(self, message):
+        assert tasks.decode_message(message.to_tuple()) == message
+        assert tasks.decode_message(message.to_dict()) == message
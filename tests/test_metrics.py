@@ -0,0 +1,158 @@
+import threading
+import urllib.request
+
+import pytest
+from src.core.exceptions import RecipientError
+from src.core.message import DeliveryResult, Message, MessagePriority, MessageType
+from src.core.metrics import DeliveryMetrics, MetricsExporter, MetricsRegistry
+from src.core.base_sender import BaseMessageSender
+
+class SMSStubSender(BaseMessageSender):
+    message_type = MessageType.SMS
+
+    def send(self, message):
+        return self._execute_with_retry(self._send, message)
+
+    def validate_credentials(self):
+        return True
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+class TestMetricsRegistry:
+    def test_counter_aggregates_threads(self, registry):
+        counter = registry.counter('sends_total', 'Отправки', ('provider',))
+
+        def work():
+            for _ in range(1000):
+                counter.inc('sms')
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc('email', amount=2)
+
+        assert counter.value('sms') == 8000
+        assert counter.value('email') == 2
+        # Шарды завершившихся потоков не теряются при повторном чтении
+        assert counter.value('sms') == 8000
+
+    def test_finished_thread_shards_merged(self, registry):
+        counter = registry.counter('sends_total', 'Отправки', ('provider',))
+        for _ in range(50):
+            thread = threading.Thread(target=counter.inc, args=('sms',))
+            thread.start()
+            thread.join()
+
+        assert len(counter._shards) <= 1
+        assert counter.value('sms') == 50
+
+    def test_histogram_quantiles(self, registry):
+        histogram = registry.histogram('latency_seconds', 'Задержка', ('provider',), buckets=(0.1, 0.2, 0.5, 1.0))
+        for value in [0.05] * 50 + [0.15] * 40 + [0.8] * 10:
+            histogram.observe(value, 'sms')
+
+        assert histogram.count('sms') == 100
+        assert histogram.quantile(0.5, 'sms') == pytest.approx(0.1)
+        assert 0.1 < histogram.quantile(0.9, 'sms') <= 0.2
+        assert 0.5 < histogram.quantile(0.99, 'sms') <= 1.0
+        assert histogram.quantile(0.5, 'email') is None
+
+    def test_label_mismatch(self, registry):
+        counter = registry.counter('sends_total', 'Отправки', ('provider',))
+
+        with pytest.raises(ValueError):
+            counter.inc()
+        with pytest.raises(ValueError):
+            registry.histogram('sends_total', 'Отправки', ('provider',))
+
+    def test_prometheus_text(self, registry):
+        registry.counter('sends_total', 'Отправки', ('provider',)).inc('s"ms')
+        registry.histogram('latency_seconds', 'Задержка', (), buckets=(0.1, 1.0)).observe(0.5)
+
+        text = registry.render()
+
+        assert '# TYPE sends_total counter' in text
+        assert 'sends_total{provider="s\\"ms"} 1' in text
+        assert 'latency_seconds_bucket{le="0.1"} 0' in text
+        assert 'latency_seconds_bucket{le="1"} 1' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+        assert 'latency_seconds_count 1' in text
+
+    def test_disabled_registry(self, registry):
+        counter = registry.counter('sends_total', 'Отправки')
+        registry.enabled = False
+        counter.inc()
+
+        assert counter.value() == 0
+
+class TestMetricsExporter:
+    def test_http_endpoint(self, registry):
+        registry.counter('sends_total', 'Отправки').inc()
+        exporter = MetricsExporter(registry, port=0).start()
+        try:
+            host, port = exporter.address
+            with urllib.request.urlopen(f'http://{host}:{port}/metrics') as response:
+                body = response.read().decode('utf-8')
+                content_type = response.headers['Content-Type']
+        finally:
+            exporter.stop()
+
+        assert 'sends_total 1' in body
+        assert content_type.startswith('text/plain; version=0.0.4')
+
+    def test_file_written_on_stop(self, registry, tmp_path):
+        registry.counter('sends_total', 'Отправки').inc()
+        path = tmp_path / 'metrics_{pid}.prom'
+        exporter = MetricsExporter(registry, path=str(path), interval=60).start()
+        exporter.stop()
+
+        assert 'sends_total 1' in open(exporter.path, encoding='utf-8').read()
+
+class TestDeliveryMetrics:
+    @pytest.fixture
+    def metrics(self, registry, mocker):
+        metrics = DeliveryMetrics(registry)
+        mocker.patch('src.core.sender_core.DELIVERY_METRICS', metrics)
+        return metrics
+
+    @pytest.fixture
+    def sender(self):
+        return SMSStubSender(max_retries=2, retry_delay=0)
+
+    def test_retry_records_outcome(self, metrics, sender, mocker):
+        message = Message(MessageType.SMS, '+79990000000', 'Код', priority=MessagePriority.HIGH)
+        send = mocker.Mock(side_effect=[Exception('timeout'), DeliveryResult(success=True)])
+
+        result = sender._execute_with_retry(send, message)
+
+        assert result.success
+        assert metrics.deliveries.value('sms', 'success', '', 'high') == 1
+        assert metrics.attempts.collect()[('sms', 'success')][1] == 1
+        assert metrics.summary()['sms']['success'] == 1
+
+    def test_recipient_error_labeled(self, metrics, sender, mocker):
+        message = Message(MessageType.SMS, '+79990000000', 'Код')
+        send = mocker.Mock(return_value=DeliveryResult(success=False, error_type=RecipientError.__name__))
+
+        sender._execute_with_retry(send, message)
+
+        assert metrics.deliveries.value('sms', 'failure', 'RecipientError', 'normal') == 1
+        assert metrics.latency.count('sms', 'failure', 'normal') == 1
+
+    def test_fallback_steps(self, system, registry, mocker):
+        metrics = DeliveryMetrics(registry)
+        system.metrics = metrics
+        failing = mocker.Mock()
+        failing.send.return_value = DeliveryResult(success=False, error='down', error_type='ProviderError')
+        working = mocker.Mock()
+        working.send.return_value = DeliveryResult(success=True)
+        system.senders = {MessageType.TELEGRAM: failing, MessageType.SMS: working}
+
+        assert system.send_with_fallback(Message(MessageType.TELEGRAM, '123', 'Текст'), [MessageType.TELEGRAM, MessageType.SMS])
+
+        assert metrics.fallback_steps.value('telegram', 'failure') == 1
+        assert metrics.fallback_steps.value('sms', 'success') == 1
@@ -0,0 +1,110 @@
+import base64
+import logging
+import os
+from email import message_from_bytes
+import pytest
+from benchmarks.fake_smtp import FakeSMTPServer
+from src.core.message import Message, MessageType
+from src.providers.email_sender import EmailSender
+from src.providers.mime_stream import iter_base64_file, iter_email_chunks, smtp_quote
+
+logger = logging.getLogger(__name__)
+
+def make_sender(server, **kwargs):
+    return EmailSender(
+        smtp_server='127.0.0.1', port=server.port, username='from@example.com',
+        password='secret', use_tls=False, use_ssl=False, max_retries=1, **kwargs
+    )
+
+class TestBase64Streaming:
+    @pytest.mark.parametrize('size', [0, 1, 57, 57 * 4, 57 * 4 + 13, 10000])
+    def test_chunks_decode_to_file(self, tmp_path, size):
+        path = tmp_path / 'data.bin'
+        path.write_bytes(os.urandom(size))
+
+        encoded = b''.join(iter_base64_file(str(path), chunk_size=57 * 2))
+
+        assert base64.b64decode(encoded) == path.read_bytes()
+        assert all(len(line) <= 76 for line in encoded.split(b'\r\n'))
+        assert not encoded.endswith(b'\r\n')
+
+    def test_chunk_size_must_align_with_lines(self, tmp_path):
+        path = tmp_path / 'data.bin'
+        path.write_bytes(b'x' * 100)
+
+        with pytest.raises(ValueError):
+            list(iter_base64_file(str(path), chunk_size=100))
+
+    def test_smtp_quote_escapes_leading_dots(self):
+        assert smtp_quote(b'.start\nmiddle.\n.end') == b'..start\r\nmiddle.\r\n..end'
+
+class TestStreamingEmail:
+    def test_streamed_message_matches_attachment(self, tmp_path):
+        path = tmp_path / 'large.bin'
+        path.write_bytes(os.urandom(200000))
+        message = Message(
+            message_type=MessageType.EMAIL, recipient='to@example.com',
+            subject='Отчет', content='.hidden line', attachments=[str(path), str(tmp_path / 'missing')]
+        )
+
+        raw = b''.join(iter_email_chunks('from@example.com', message, logger))
+        # Снятие SMTP-экранирования точек
+        parsed = message_from_bytes(b'\r\n'.join(
+            line[1:] if line.startswith(b'.') else line for line in raw.split(b'\r\n')
+        ))
+
+        text, attachment = parsed.get_payload()
+        assert text.get_payload() == '.hidden line'
+        assert attachment.get_filename() == 'large.bin'
+        assert attachment.get_payload(decode=True) == path.read_bytes()
+
+    def test_large_attachment_streamed_over_smtp(self, tmp_path, mocker):
+        path = tmp_path / 'large.bin'
+        path.write_bytes(os.urandom(300000))
+        message = Message(
+            message_type=MessageType.EMAIL, recipient='to@example.com',
+            content='see attachment', attachments=[str(path)]
+        )
+
+        with FakeSMTPServer(keep_messages=True) as server:
+            sender = make_sender(server, stream_threshold_mb=0.1)
+            buffered = mocker.spy(sender.pool, 'sendmail')
+            result = sender.send(message)
+            sender.close()
+
+        assert result.success
+        buffered.assert_not_called()
+        parsed = message_from_bytes(server.received[0])
+        assert parsed.get_payload()[1].get_payload(decode=True) == path.read_bytes()
+
+    def test_small_attachment_uses_buffered_path(self, tmp_path, mocker):
+        path = tmp_path / 'small.txt'
+        path.write_bytes(b'small')
+        message = Message(
+            message_type=MessageType.EMAIL, recipient='to@example.com',
+            content='hi', attachments=[str(path)]
+        )
+
+        with FakeSMTPServer() as server:
+            sender = make_sender(server)
+            streamed = mocker.spy(sender.pool, 'sendmail_stream')
+            assert sender.send(message).success
+            sender.close()
+
+        streamed.assert_not_called()
+
+    def test_refused_recipient_reported(self, tmp_path):
+        path = tmp_path / 'large.bin'
+        path.write_bytes(b'x' * 1000)
+        message = Message(
+            message_type=MessageType.EMAIL, recipient='ghost@example.com',
+            content='hi', attachments=[str(path)]
+        )
+
+        with FakeSMTPServer(refused_recipients={'ghost@example.com'}) as server:
+            sender = make_sender(server, stream_threshold_mb=0)
+            result = sender.send(message)
+            sender.close()
+
+        assert not result.success
+        assert result.error_type == 'RecipientError'
@@ -0,0 +1,104 @@
+import threading
+import time
+import pytest
+import main
+from src import tasks
+from src.core.concurrency import PrioritySemaphore
+from src.core.latency import QueueLatencyTracker
+from src.core.message import DeliveryResult, Message, MessagePriority, MessageType
+
+def make_message(recipient, priority):
+    return Message(MessageType.SMS, recipient, 'text', priority=priority)
+
+class TestPrioritySemaphore:
+    def test_released_slot_goes_to_highest_priority(self):
+        semaphore = PrioritySemaphore(1)
+        semaphore.acquire()
+        served = []
+
+        def waiter(name, priority):
+            semaphore.acquire(priority.rank)
+            served.append(name)
+            semaphore.release()
+
+        threads = []
+        for name, priority in [('low', MessagePriority.LOW), ('normal', MessagePriority.NORMAL),
+                               ('high', MessagePriority.HIGH)]:
+            thread = threading.Thread(target=waiter, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            while semaphore.waiting < len(threads):
+                time.sleep(0.001)
+
+        semaphore.release()
+        for thread in threads:
+            thread.join(timeout=1)
+
+        assert served == ['high', 'normal', 'low']
+
+class TestPriorityBroadcast:
+    @pytest.fixture
+    def system(self, system, mocker):
+        sender = mocker.Mock()
+        sender.send.return_value = DeliveryResult(success=True)
+        system.senders = {MessageType.SMS: sender}
+        return system
+
+    @pytest.mark.parametrize('concurrent', [False, True])
+    def test_high_priority_sent_first(self, system, mocker, concurrent):
+        system.concurrency = main.ProviderConcurrencyLimiter(default_limit=1)
+        messages = [
+            make_message('low', MessagePriority.LOW),
+            make_message('normal', MessagePriority.NORMAL),
+            make_message('high', MessagePriority.HIGH),
+        ]
+
+        results = system.broadcast(messages, concurrent=concurrent)
+
+        sent = [call.args[0].recipient for call in system.senders[MessageType.SMS].send.call_args_list]
+        assert sent == ['high', 'normal', 'low']
+        assert [detail['recipient'] for detail in results['details']] == ['low', 'normal', 'high']
+
+    def test_queue_latency_recorded_per_priority(self, system):
+        system.broadcast([make_message('a', MessagePriority.HIGH), make_message('b', MessagePriority.LOW)])
+
+        latency = system.get_queue_latency()
+
+        assert latency['high']['count'] == 1
+        assert latency['low']['count'] == 1
+        assert latency['normal']['count'] == 0
+
+class TestQueueLatencyTracker:
+    def test_percentiles_and_slo_violations(self):
+        tracker = QueueLatencyTracker.from_config({'latency_slo': {'high': 1.0}})
+
+        for seconds in [0.1] * 98 + [2.0, 3.0]:
+            tracker.record(MessagePriority.HIGH, seconds)
+
+        summary = tracker.snapshot()['high']
+        assert summary['count'] == 100
+        assert summary['p50'] == 0.1
+        assert summary['p99'] == 2.0
+        assert summary['max'] == 3.0
+        assert summary['slo_violations'] == 2
+
+class TestPriorityQueues:
+    def test_message_routed_to_priority_queue(self, mocker):
+        apply_async = mocker.patch.object(tasks.send_notification_task, 'apply_async')
+
+        tasks.send_message_async(make_message('+7', MessagePriority.HIGH), [MessageType.SMS])
+
+        assert apply_async.call_args.kwargs['queue'] == 'notifications.high'
+        assert 'enqueued_at' in apply_async.call_args.args[1]
+
+    def test_batches_split_by_priority(self, mocker):
+        mocker.patch.object(tasks.app, 'producer_or_acquire', return_value=mocker.MagicMock())
+        apply_async = mocker.patch.object(tasks.send_batch_task, 'apply_async')
+        messages = [make_message(str(i), MessagePriority.LOW) for i in range(3)]
+        messages.append(make_message('otp', MessagePriority.HIGH))
+
+        tasks.send_batch_async(messages, [MessageType.SMS], chunk_size=10)
+
+        queues = [call.kwargs['queue'] for call in apply_async.call_args_list]
+        assert queues == ['notifications.high', 'notifications.low']
+        assert [len(call.args[0][0]) for call in apply_async.call_args_list] == [1, 3]
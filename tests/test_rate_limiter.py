@@ -0,0 +1,107 @@
+import asyncio
+import threading
+
+import pytest
+from src.core.base_sender import BaseMessageSender
+from src.core.exceptions import RateLimitError
+from src.core.message import Message, MessageType, DeliveryResult
+from src.core.rate_limiter import RateLimiter, RedisRateLimiter, TokenBucket
+from src.providers.telegram_sender import apply_telegram_response
+
+class TestTokenBucket:
+    def test_burst_then_delay(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+    def test_block_for(self):
+        bucket = TokenBucket(rate=10, capacity=5)
+        bucket.block_for(2)
+
+        assert bucket.reserve() == pytest.approx(2.1, abs=0.01)
+
+class TestRateLimiter:
+    def test_from_config_disabled(self):
+        assert RateLimiter.from_config(None) is None
+
+    def test_per_recipient_bucket(self):
+        limiter = RateLimiter.from_config({'rate': 100, 'per_recipient_rate': 1, 'per_recipient_burst': 1})
+
+        assert limiter.reserve("chat-1") == 0
+        assert limiter.reserve("chat-2") == 0
+        assert limiter.reserve("chat-1") == pytest.approx(1.0, abs=0.01)
+
+    def test_recipient_buckets_are_bounded(self):
+        limiter = RateLimiter(per_recipient_rate=1, max_recipients=3)
+        for i in range(10):
+            limiter.reserve(f"chat-{i}")
+
+        assert len(limiter._recipients) == 3
+
+    def test_redis_aacquire_off_event_loop(self, mocker):
+        limiter = RedisRateLimiter('sms', rate=10)
+        threads = []
+        mocker.patch.object(limiter, '_call', side_effect=lambda *args: threads.append(threading.get_ident()) or 0.0)
+
+        async def run():
+            await limiter.aacquire("chat-1")
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+
+        assert threads and loop_thread not in threads
+
+class RateLimitedSender(BaseMessageSender):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def send(self, message):
+        return self._execute_with_retry(self._send, message)
+
+    def _send(self, message):
+        self.calls += 1
+        if self.calls == 1:
+            raise RateLimitError("429", retry_after=0.05)
+        return DeliveryResult(success=True)
+
+    def validate_credentials(self):
+        return True
+
+class TestRetryAfter:
+    def test_telegram_429_carries_retry_after(self):
+        with pytest.raises(RateLimitError) as error:
+            apply_telegram_response(DeliveryResult(success=False), {
+                'ok': False, 'error_code': 429, 'parameters': {'retry_after': 7}
+            })
+
+        assert error.value.retry_after == 7
+
+    def test_retry_after_penalizes_limiter(self, mocker):
+        sender = RateLimitedSender(max_retries=2, retry_delay=10, rate_limit={'rate': 100})
+        sleep = mocker.patch('time.sleep')
+        message = Message(message_type=MessageType.SMS, recipient="+7", content="hi")
+
+        assert sender.send(message).success
+        sleep.assert_called_once()
+        assert sleep.call_args[0][0] == pytest.approx(0.05, abs=0.02)
+
+    def test_retry_after_penalizes_recipient_bucket(self, mocker):
+        sender = RateLimitedSender(
+            max_retries=2, retry_delay=10, rate_limit={'per_recipient_rate': 100, 'per_recipient_burst': 10}
+        )
+        sleep = mocker.patch('time.sleep')
+        message = Message(message_type=MessageType.TELEGRAM, recipient="chat-1", content="hi")
+
+        assert sender.send(message).success
+        sleep.assert_called_once()
+        assert sleep.call_args[0][0] == pytest.approx(0.05, abs=0.02)
+        assert sender.rate_limiter.reserve("chat-2") == 0
+
+    def test_retry_after_slept_without_matching_bucket(self):
+        sender = RateLimitedSender(rate_limit={'per_recipient_rate': 1})
+
+        assert sender._retry_after_delay(RateLimitError("429", retry_after=0.5)) == 0.5
+        assert sender._retry_after_delay(RateLimitError("429", retry_after=0.5), "chat-1") == 0.0
@@ -0,0 +1,68 @@
+import pytest
+from src.core.base_sender import BaseMessageSender
+from src.core.exceptions import ConfigurationError
+from src.core.message import Message, MessageType, DeliveryResult
+from src.core.retry import RetryPolicy
+
+class FailingSender(BaseMessageSender):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def send(self, message):
+        return self._execute_with_retry(self._send, message)
+
+    def _send(self, message):
+        self.calls += 1
+        return DeliveryResult(success=False, error="boom")
+
+    def validate_credentials(self):
+        return True
+
+class TestRetryPolicy:
+    def test_from_config_accepts_delay_alias(self):
+        policy = RetryPolicy.from_config({'max_retries': 5, 'delay': 2})
+
+        assert policy.base_delay == 2
+        assert policy.max_retries == 5
+
+    def test_unknown_key_rejected(self):
+        with pytest.raises(ConfigurationError):
+            RetryPolicy.from_config({'retries': 3})
+
+    def test_exponential_backoff_is_capped(self):
+        policy = RetryPolicy(base_delay=1, multiplier=2, max_delay=5, jitter='none')
+
+        assert [policy.compute_delay(i) for i in range(4)] == [1, 2, 4, 5]
+
+    def test_full_jitter_within_bounds(self):
+        policy = RetryPolicy(base_delay=1, multiplier=2, max_delay=60)
+
+        assert all(0 <= policy.compute_delay(3) <= 8 for _ in range(100))
+
+    def test_max_elapsed_stops_retries(self):
+        policy = RetryPolicy(max_retries=10, max_elapsed=30)
+
+        assert policy.should_retry(0, elapsed=10)
+        assert not policy.should_retry(0, elapsed=31)
+        assert not policy.should_retry(9, elapsed=0)
+
+class TestSenderRetryLoop:
+    def test_backoff_delays_are_used(self, mocker):
+        sleep = mocker.patch('time.sleep')
+        policy = RetryPolicy(max_retries=3, base_delay=1, multiplier=3, jitter='none')
+        sender = FailingSender(retry_policy=policy)
+
+        sender.send(Message(message_type=MessageType.SMS, recipient="+7", content="hi"))
+
+        assert [call.args[0] for call in sleep.call_args_list] == [1, 3]
+        assert sender.calls == 3
+
+    def test_no_inline_retry_makes_single_attempt(self, mocker):
+        sleep = mocker.patch('time.sleep')
+        sender = FailingSender(retry_policy=RetryPolicy(max_retries=5, inline=False))
+
+        sender.send(Message(message_type=MessageType.SMS, recipient="+7", content="hi"))
+
+        assert sender.calls == 1
+        sleep.assert_not_called()
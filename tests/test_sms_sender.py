@@ -10,3 +10,9 @@ class TestYandexCloudSMSSender:
     def test_send_message_failure(self, mocker):
         # Тест неудачной отправки sms
         pass
+
+    def test_session_carries_auth_headers(self):
+        sender = YandexCloudSMSSender(api_key="key", folder_id="folder", keep_alive=False)
+
+        assert sender.session.headers['Authorization'] == 'Api-Key key'
+        assert sender.session.headers['Connection'] == 'close'
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from benchmarks.fake_smtp import FakeSMTPServer
+from src.core.message import DeliveryResult, Message, MessageType
+from src.providers.email_sender import EmailSender
+
+def make_email(i, recipient=None):
+    return Message(
+        MessageType.EMAIL, recipient or f'user{i}@example.com',
+        f'Персональное письмо {i}\n.Строка с точкой', subject=f'Счет №{i}'
+    )
+
+def make_sender(server, **kwargs):
+    return EmailSender(
+        smtp_server='127.0.0.1', port=server.port, username='from@example.com',
+        password='secret', use_tls=False, use_ssl=False, max_retries=1, **kwargs
+    )
+
+@pytest.fixture(params=[False, True], ids=['lock-step', 'pipelining'])
+def server(request):
+    with FakeSMTPServer(
+        pipelining=request.param, refused_recipients={'ghost@example.com'}, keep_messages=True
+    ) as server:
+        yield server
+
+class TestEmailSenderBatch:
+    def test_batch_sent_over_one_session(self, server):
+        sender = make_sender(server)
+        messages = [make_email(i) for i in range(25)]
+
+        results = sender.send_batch(messages)
+        sender.close()
+
+        assert all(result.success for result in results)
+        assert server.logins == 1
+        assert server.messages == 25
+        assert len(set(server.received)) == 25
+
+    def test_partial_failure(self, server):
+        sender = make_sender(server)
+        messages = [make_email(0), make_email(1, 'ghost@example.com'), make_email(2)]
+
+        results = sender.send_batch(messages)
+        sender.close()
+
+        assert [result.success for result in results] == [True, False, True]
+        assert results[1].error_type == 'RecipientError'
+        assert server.messages == 2
+
+    def test_reconnect_without_resending(self, server):
+        server.drop_after = 4
+        sender = make_sender(server)
+        messages = [make_email(i) for i in range(10)]
+
+        results = sender.send_batch(messages)
+        sender.close()
+
+        assert all(result.success for result in results)
+        assert server.messages == 10
+        assert server.logins == 3
+
+    def test_failed_reconnect_keeps_accepted(self, server, mocker):
+        server.drop_after = 2
+        sender = make_sender(server)
+        connect = sender.pool._connect
+        mocker.patch.object(sender.pool, '_connect', side_effect=[connect(), ConnectionRefusedError()])
+
+        results = sender.send_batch([make_email(i) for i in range(5)])
+        sender.close()
+
+        assert [result.success for result in results] == [True, True, False, False, False]
+        assert results[2].error_type == 'ConnectionRefusedError'
+        assert server.messages == 2
+
+    def test_session_message_limit(self, server):
+        sender = make_sender(server, max_messages_per_session=4)
+
+        results = sender.send_batch([make_email(i) for i in range(10)])
+        sender.close()
+
+        assert all(result.success for result in results)
+        assert server.logins == 3
+
+    def test_pipelining_saves_round_trips(self):
+        timings = {}
+        for pipelining in (False, True):
+            with FakeSMTPServer(pipelining=pipelining, round_trip_latency=0.005) as server:
+                sender = make_sender(server)
+                sender.send_batch([make_email(0)])
+                start = time.perf_counter()
+                assert all(result.success for result in sender.send_batch([make_email(i) for i in range(20)]))
+                timings[pipelining] = time.perf_counter() - start
+                sender.close()
+
+        assert timings[True] < timings[False] / 2
+
+class TestBroadcastEmailBatching:
+    @pytest.fixture
+    def system(self, system):
+        system.config.set('broadcast', {'email_group_size': 3, 'email_batch_size': 4})
+        return system
+
+    def test_distinct_emails_batched(self, system):
+        messages = [make_email(i) for i in range(6)]
+        messages.append(Message(MessageType.SMS, '+79990000000', 'Код 1234'))
+
+        units = system._plan_units(messages, system._priority_order(messages), use_fallback=False)
+
+        assert [(unit.kind, unit.indices) for unit in units] == [
+            ('batch', [0, 1, 2, 3]), ('batch', [4, 5]), ('single', [6])
+        ]
+
+    def test_results_mapped_back_in_order(self, system, mocker):
+        sender = mocker.Mock(spec=EmailSender)
+        sender.send_batch.side_effect = lambda batch: [
+            DeliveryResult(success=message.recipient != 'bad@example.com') for message in batch
+        ]
+        system.senders = {MessageType.EMAIL: sender}
+        messages = [make_email(0), make_email(1, 'bad@example.com'), make_email(2)]
+
+        results = system.broadcast(messages)
+
+        assert sender.send_batch.call_count == 1
+        assert [detail['success'] for detail in results['details']] == [True, False, True]
@@ -0,0 +1,43 @@
+import smtplib
+import pytest
+from src.providers.smtp_pool import SMTPConnectionPool
+
+class TestSMTPConnectionPool:
+    def test_sessions_are_reused(self, mocker):
+        connect = mocker.Mock(side_effect=lambda: mocker.Mock())
+        pool = SMTPConnectionPool(connect, size=2)
+
+        for _ in range(5):
+            pool.sendmail('from@example.com', 'to@example.com', 'body')
+
+        assert connect.call_count == 1
+
+    def test_session_rotated_after_limit(self, mocker):
+        connect = mocker.Mock(side_effect=lambda: mocker.Mock())
+        pool = SMTPConnectionPool(connect, size=1, max_messages_per_session=2)
+
+        for _ in range(4):
+            pool.sendmail('from@example.com', 'to@example.com', 'body')
+
+        assert connect.call_count == 2
+
+    def test_reconnect_on_server_disconnect(self, mocker):
+        broken = mocker.Mock()
+        broken.sendmail.side_effect = smtplib.SMTPServerDisconnected()
+        healthy = mocker.Mock()
+        healthy.sendmail.return_value = {}
+        pool = SMTPConnectionPool(mocker.Mock(side_effect=[broken, healthy]), size=1)
+
+        assert pool.sendmail('from@example.com', 'to@example.com', 'body') == {}
+        broken.quit.assert_called()
+
+    def test_stale_session_replaced_after_failed_noop(self, mocker):
+        stale = mocker.Mock()
+        stale.noop.return_value = (421, b'closing')
+        fresh = mocker.Mock()
+        pool = SMTPConnectionPool(mocker.Mock(side_effect=[stale, fresh]), size=1, health_check_interval=0)
+
+        pool.sendmail('from@example.com', 'to@example.com', 'body')
+        pool.sendmail('from@example.com', 'to@example.com', 'body')
+
+        fresh.sendmail.assert_called_once()
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+
+import pytest
+import yaml
+import main
+from src.core.message import MessageType
+from src.utils.credentials_cache import CredentialsCache
+
+@pytest.fixture
+def config_path(tmp_path):
+    config = {
+        'startup': {'cache_file': str(tmp_path / 'credentials.json'), 'validation_ttl': 3600},
+        'telegram': {'bot_token': 'token'},
+    }
+    path = tmp_path / 'config.yaml'
+    path.write_text(yaml.safe_dump(config), encoding='utf-8')
+    return str(path)
+
+@pytest.fixture
+def create_sender(mocker):
+    sender = mocker.Mock()
+    sender.validate_credentials.return_value = True
+    factory = mocker.patch.object(main.SenderFactory, 'create_sender', return_value=sender)
+    return factory
+
+class TestStartupModes:
+    def test_offline_mode_skips_network(self, config_path, create_sender):
+        system = main.MessageDeliverySystem(config_path, startup_mode='offline')
+
+        assert not create_sender.called
+        sender = system._get_sender(MessageType.TELEGRAM)
+
+        assert sender is create_sender.return_value
+        sender.validate_credentials.assert_not_called()
+
+    def test_lazy_mode_builds_on_first_use(self, config_path, create_sender):
+        system = main.MessageDeliverySystem(config_path, startup_mode='lazy')
+        assert not create_sender.called
+
+        system._get_sender(MessageType.TELEGRAM)
+        system._get_sender(MessageType.TELEGRAM)
+
+        create_sender.assert_called_once()
+        create_sender.return_value.validate_credentials.assert_called_once()
+
+    def test_eager_mode_validates_at_startup(self, config_path, create_sender):
+        system = main.MessageDeliverySystem(config_path, startup_mode='eager')
+
+        assert MessageType.TELEGRAM in system.senders
+        assert MessageType.EMAIL not in system.senders
+        create_sender.return_value.validate_credentials.assert_called_once()
+
+    def test_invalid_credentials_disable_sender(self, config_path, create_sender):
+        create_sender.return_value.validate_credentials.return_value = False
+        system = main.MessageDeliverySystem(config_path, startup_mode='background')
+
+        assert system._get_sender(MessageType.TELEGRAM) is None
+        create_sender.return_value.close.assert_called_once()
+
+    def test_unknown_mode_rejected(self, config_path):
+        with pytest.raises(ValueError):
+            main.MessageDeliverySystem(config_path, startup_mode='instant')
+
+class TestCredentialsCache:
+    def test_cached_validation_skips_network(self, config_path, create_sender):
+        main.MessageDeliverySystem(config_path, startup_mode='eager').close()
+        main.MessageDeliverySystem(config_path, startup_mode='eager').close()
+
+        create_sender.return_value.validate_credentials.assert_called_once()
+
+    def test_entry_expires_after_ttl(self, mocker):
+        cache = CredentialsCache(ttl=10)
+        clock = mocker.patch('src.utils.credentials_cache.time.time', return_value=100.0)
+        cache.mark_valid('sms:abc')
+
+        clock.return_value = 105.0
+        assert cache.is_valid('sms:abc')
+        clock.return_value = 111.0
+        assert not cache.is_valid('sms:abc')
+
+    def test_key_changes_with_credentials(self):
+        cache = CredentialsCache()
+        first = cache.make_key('sms', {'api_key': 'old'})
+        second = cache.make_key('sms', {'api_key': 'new'})
+
+        assert first != second
+        assert first == cache.make_key('sms', {'api_key': 'old'})
+
+    def test_key_not_plain_hash_of_secrets(self, tmp_path):
+        config = {'api_key': 'secret'}
+        plain = hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+        first = CredentialsCache(path=str(tmp_path / 'a' / 'cache.json')).make_key('sms', config)
+        second = CredentialsCache(path=str(tmp_path / 'b' / 'cache.json')).make_key('sms', config)
+
+        assert plain[:16] not in first
+        assert first != second
+
+    def test_key_stable_between_instances_with_path(self, tmp_path):
+        path = str(tmp_path / 'cache.json')
+        key = CredentialsCache(path=path).make_key('sms', {'api_key': 'secret'})
+
+        assert CredentialsCache(path=path).make_key('sms', {'api_key': 'secret'}) == key
+        assert os.stat(path + '.key').st_mode & 0o077 == 0
+
+    def test_memory_only_without_path(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        CredentialsCache().mark_valid('sms:abc')
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_concurrent_saves_keep_valid_file(self, tmp_path):
+        path = tmp_path / 'cache.json'
+        caches = [CredentialsCache(path=str(path)) for _ in range(4)]
+        threads = [
+            threading.Thread(target=lambda c=cache, n=n: [c.mark_valid(f'sms:{n}-{i}') for i in range(50)])
+            for n, cache in enumerate(caches)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert isinstance(json.loads(path.read_text(encoding='utf-8')), dict)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['cache.json', 'cache.json.key']
+
+    def test_entries_persist_between_instances(self, tmp_path):
+        path = tmp_path / 'cache.json'
+        CredentialsCache(path=str(path)).mark_valid('telegram:abc')
+
+        assert CredentialsCache(path=str(path)).is_valid('telegram:abc')
+
+    def test_invalidate_removes_entry(self):
+        cache = CredentialsCache()
+        cache.mark_valid('email:abc')
+        cache.invalidate('email:abc')
+
+        assert not cache.is_valid('email:abc')
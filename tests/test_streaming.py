@@ -0,0 +1,78 @@
+import threading
+import pytest
+from src.core.message import DeliveryResult, Message, MessageType
+from src.core.streaming import read_outcomes
+
+@pytest.fixture
+def system(system, mocker):
+    sender = mocker.Mock()
+    sender.send.side_effect = lambda message: DeliveryResult(success=message.recipient != 'bad')
+    system.senders = {MessageType.SMS: sender}
+    return system
+
+def generate(count, bad=()):
+    for i in range(count):
+        yield Message(MessageType.SMS, 'bad' if i in bad else f'+7{i}', 'text')
+
+class TestBroadcastStream:
+    def test_counts_results_from_generator(self, system):
+        stream = system.broadcast_stream(generate(50, bad={3, 7}), window=5)
+
+        outcomes = list(stream)
+
+        assert len(outcomes) == 50
+        assert sorted(outcome.index for outcome in outcomes) == list(range(50))
+        assert stream.stats == {'total': 50, 'successful': 48, 'failed': 2}
+
+    def test_in_flight_bounded_by_window(self, system, mocker):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def send(message):
+            with lock:
+                active.append(message)
+                peak.append(len(active))
+            with lock:
+                active.remove(message)
+            return DeliveryResult(success=True)
+
+        system.senders[MessageType.SMS].send.side_effect = send
+        consumed = []
+
+        def tracked():
+            for message in generate(40):
+                consumed.append(message)
+                yield message
+
+        stream = system.broadcast_stream(tracked(), window=3)
+        for done, _ in enumerate(stream, start=1):
+            assert len(consumed) - done <= 3
+
+        assert max(peak) <= 3
+
+    def test_outcomes_spilled_to_file(self, system, tmp_path):
+        path = tmp_path / 'results.tsv'
+
+        stats = system.broadcast_stream(generate(10, bad={4}), results_path=str(path)).run()
+
+        outcomes = sorted(read_outcomes(str(path)))
+        assert stats['failed'] == 1
+        assert [outcome.index for outcome in outcomes] == list(range(10))
+        assert outcomes[4].recipient == 'bad'
+        assert not outcomes[4].success
+        assert outcomes[0].message_type == 'sms'
+
+    def test_early_stop_consumes_no_more_messages(self, system):
+        consumed = []
+
+        def tracked():
+            for message in generate(1000):
+                consumed.append(message)
+                yield message
+
+        iterator = iter(system.broadcast_stream(tracked(), window=4))
+        next(iterator)
+        iterator.close()
+
+        assert len(consumed) == 4
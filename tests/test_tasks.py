@@ -0,0 +1,117 @@
+import time
+
+import pytest
+import main
+from src import tasks
+from src.core.retry import RetryPolicy
+from src.core.message import DeliveryResult, Message, MessagePriority, MessageType
+
+@pytest.fixture
+def fresh_worker(mocker):
+    mocker.patch.object(tasks, '_system', None)
+    system_class = mocker.patch.object(main, 'MessageDeliverySystem')
+    system_class.return_value.retry_policy = RetryPolicy(max_retries=3, base_delay=5, jitter='none')
+    return system_class
+
+class TestWorkerDeliverySystem:
+    def test_system_built_once_per_process(self, fresh_worker):
+        tasks.init_worker_process()
+        first = tasks.get_delivery_system()
+        second = tasks.get_delivery_system()
+
+        assert first is second
+        fresh_worker.assert_called_once_with(
+            tasks.CONFIG_PATH, validate_credentials=False, inline_retries=False
+        )
+
+    def test_task_reuses_warm_system(self, fresh_worker):
+        system = fresh_worker.return_value
+        system.send_with_fallback.return_value = True
+        message_data = {'message_type': 'sms', 'recipient': '+7', 'content': 'hi'}
+
+        for _ in range(3):
+            tasks.send_notification_task.apply(args=(dict(message_data), ['sms']))
+
+        fresh_worker.assert_called_once()
+        assert system.send_with_fallback.call_count == 3
+
+    def test_failed_task_rescheduled_with_countdown(self, fresh_worker, mocker):
+        fresh_worker.return_value.send_with_fallback.return_value = False
+        retry = mocker.patch.object(tasks.send_notification_task, 'retry', side_effect=RuntimeError)
+        message_data = {'message_type': 'sms', 'recipient': '+7', 'content': 'hi'}
+
+        tasks.send_notification_task.apply(args=(message_data, ['sms']))
+
+        assert retry.call_args.kwargs['countdown'] == 5
+        assert retry.call_args.kwargs['max_retries'] == 2
+
+class TestAuthenticationRevalidation:
+    def test_sender_disabled_when_credentials_invalid(self, system, mocker):
+        sender = mocker.Mock()
+        sender.validate_credentials.return_value = False
+        system.senders[MessageType.SMS] = sender
+
+        system._check_authentication(
+            MessageType.SMS, sender, DeliveryResult(success=False, error_type='AuthenticationError')
+        )
+
+        assert MessageType.SMS not in system.senders
+        sender.close.assert_called_once()
+
+class TestBatchTasks:
+    def test_batch_task_returns_compact_outcomes(self, fresh_worker, mocker):
+        system = fresh_worker.return_value
+        system.broadcast.return_value = {
+            'total': 2, 'successful': 1, 'failed': 1,
+            'details': [
+                {'type': 'sms', 'recipient': '+7', 'success': True},
+                {'type': 'email', 'recipient': 'a@b.c', 'success': False},
+            ]
+        }
+        batch = [Message(message_type=None, recipient=r, content='hi').to_dict() for r in ('+7', 'a@b.c')]
+        apply_async = mocker.patch.object(tasks.send_batch_task, 'apply_async')
+
+        outcome = tasks.send_batch_task.apply(args=(batch, ['sms', 'email'])).get()
+
+        assert outcome['outcomes'] == [['sms', 1], ['email', 0]]
+        assert system.broadcast.call_args.kwargs['concurrent'] is True
+        # Неудавшееся сообщение перепланировано отдельной пачкой с задержкой
+        args, kwargs = apply_async.call_args.args
+        assert args == ([batch[1]], ['sms', 'email'])
+        assert kwargs['attempt'] == 1
+        assert apply_async.call_args.kwargs['countdown'] == 5
+
+    def test_batched_message_latency_recorded_once(self, system, mocker):
+        mocker.patch.object(tasks, 'get_delivery_system', return_value=system)
+        sender = mocker.Mock()
+        sender.send.return_value = DeliveryResult(success=True)
+        system.senders = {MessageType.SMS: sender}
+        batch = [Message(MessageType.SMS, '+7', 'hi', priority=MessagePriority.HIGH).to_dict()]
+
+        tasks.send_batch_task.apply(args=(batch, []), kwargs={'enqueued_at': time.time() - 1})
+
+        assert system.get_queue_latency()['high']['count'] == 1
+
+    def test_send_batch_async_chunks_over_one_producer(self, mocker):
+        producer = mocker.MagicMock()
+        mocker.patch.object(tasks.app, 'producer_or_acquire', return_value=producer)
+        apply_async = mocker.patch.object(tasks.send_batch_task, 'apply_async')
+        messages = (Message(message_type=MessageType.SMS, recipient=str(i), content='hi') for i in range(5))
+
+        results = tasks.send_batch_async(messages, [MessageType.SMS], chunk_size=2)
+
+        assert len(results) == 3
+        sizes = [len(call.args[0][0]) for call in apply_async.call_args_list]
+        assert sizes == [2, 2, 1]
+        assert all(call.kwargs['producer'] is producer.__enter__.return_value
+                   for call in apply_async.call_args_list)
+
+class TestMessageSerialization:
+    def test_round_trip_keeps_priority(self):
+        message = Message(message_type=MessageType.SMS, recipient='+7', content='hi',
+                          priority=MessagePriority.HIGH)
+
+        restored = Message.from_dict(message.to_dict())
+
+        assert restored == message
+        assert 'subject' not in message.to_dict()
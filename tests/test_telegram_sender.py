@@ -10,3 +10,23 @@ class TestTelegramSender:
     def test_send_message_failure(self, mocker):
         # Тест неудачной отправки telegram
         pass
+
+    def test_requests_share_pooled_session(self, mocker):
+        sender = TelegramSender(bot_token="token", pool_size=4, max_retries=1)
+        post = mocker.patch.object(sender.session, 'post')
+        post.return_value.json.return_value = {'ok': True, 'result': {'message_id': 1}}
+        message = Message(message_type=MessageType.TELEGRAM, recipient="42", content="hi")
+
+        sender.send(message)
+        sender.send(message)
+
+        assert post.call_count == 2
+        assert sender.session.get_adapter("https://api.telegram.org")._pool_maxsize == 4
+
+    def test_close_releases_session(self, mocker):
+        sender = TelegramSender(bot_token="token")
+        close = mocker.patch.object(sender.session, 'close')
+
+        sender.close()
+
+        close.assert_called_once()
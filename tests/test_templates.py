@@ -0,0 +1,105 @@
+import pytest
+from src.core.circuit_breaker import CircuitBreaker
+from src.core.exceptions import ConfigurationError, ValidationError
+from src.core.message import DeliveryResult, Message, MessageType
+from src.core.templates import TemplateRegistry
+from src.providers.telegram_sender import build_telegram_payload
+
+WELCOME = {
+    'subject': 'Привет, {{ name }}',
+    'body': 'Здравствуйте, {{ name }}!',
+    'sms': {'body': '{{ name }}, код {{ code }}'},
+    'telegram': {'body': '<b>{{ name }}</b>, добро пожаловать'},
+}
+
+@pytest.fixture
+def registry():
+    return TemplateRegistry({'welcome': WELCOME})
+
+class TestTemplateRegistry:
+    def test_channel_variants(self, registry):
+        sms = registry.render('welcome', MessageType.SMS, {'name': 'Анна', 'code': 42})
+        email = registry.render('welcome', MessageType.EMAIL, {'name': 'Анна'})
+
+        assert sms.body == 'Анна, код 42'
+        assert sms.content_format == 'text'
+        assert email.body == 'Здравствуйте, Анна!'
+        assert email.subject == 'Привет, Анна'
+
+    def test_html_variant_escapes_variables(self, registry):
+        rendered = registry.render('welcome', MessageType.TELEGRAM, {'name': '<script>'})
+
+        assert rendered.content_format == 'html'
+        assert rendered.body == '<b>&lt;script&gt;</b>, добро пожаловать'
+        assert rendered.subject == 'Привет, &lt;script&gt;'
+
+    def test_templates_compiled_once(self, registry, mocker):
+        compile_ = mocker.spy(registry._environments['text'], 'from_string')
+
+        for i in range(10):
+            registry.render('welcome', MessageType.EMAIL, {'name': str(i)})
+
+        compile_.assert_not_called()
+
+    def test_missing_variable_rejected(self, registry):
+        with pytest.raises(ValidationError):
+            registry.render('welcome', MessageType.SMS, {'name': 'Анна'})
+
+    def test_unknown_template_rejected(self, registry):
+        with pytest.raises(ValidationError):
+            registry.render('missing', MessageType.SMS)
+
+    def test_syntax_error_reported_at_registration(self, registry):
+        with pytest.raises(ConfigurationError):
+            registry.register('broken', {'body': '{{ name '})
+
+    def test_loaded_from_file(self, tmp_path):
+        path = tmp_path / 'templates.yaml'
+        path.write_text("ping:\n  body: 'pong {{ n }}'\n", encoding='utf-8')
+
+        registry = TemplateRegistry.from_config({'file': str(path)})
+
+        assert registry.render('ping', MessageType.SMS, {'n': 1}).body == 'pong 1'
+
+class TestTemplateMessages:
+    def test_payload_carries_only_template(self):
+        message = Message.from_template(MessageType.SMS, '+7900', 'welcome', {'name': 'Анна'})
+
+        data = message.to_dict()
+
+        assert 'content' not in data
+        assert Message.from_dict(data) == message
+
+    def test_telegram_html_parse_mode(self):
+        message = Message(MessageType.TELEGRAM, '42', '<b>hi</b>', content_format='html')
+
+        assert build_telegram_payload(message)['parse_mode'] == 'HTML'
+
+    def test_fallback_renders_variant_per_channel(self, system, mocker):
+        system.templates.register('welcome', WELCOME)
+        telegram = mocker.Mock()
+        telegram.send.return_value = DeliveryResult(success=False, error='down')
+        sms = mocker.Mock()
+        sms.send.return_value = DeliveryResult(success=True)
+        system.senders = {MessageType.TELEGRAM: telegram, MessageType.SMS: sms}
+        message = Message.from_template(MessageType.TELEGRAM, '42', 'welcome', {'name': 'Анна', 'code': 7})
+
+        assert system.send_with_fallback(message, [MessageType.TELEGRAM, MessageType.SMS])
+
+        assert telegram.send.call_args.args[0].content_format == 'html'
+        assert sms.send.call_args.args[0].content == 'Анна, код 7'
+
+    def test_render_error_keeps_half_open_probe(self, system, mocker):
+        clock = mocker.patch('src.core.circuit_breaker.time.time', return_value=1000.0)
+        system.templates.register('welcome', WELCOME)
+        system.breakers = {MessageType.SMS: CircuitBreaker('sms', minimum_calls=1, window_size=1, open_timeout=30)}
+        system.breakers[MessageType.SMS].record_failure()
+        sms = mocker.Mock()
+        sms.send.return_value = DeliveryResult(success=True)
+        system.senders = {MessageType.SMS: sms}
+        clock.return_value = 1031.0
+
+        assert not system.send_message(Message.from_template(MessageType.SMS, '+7900', 'welcome', {'name': 'Анна'}))
+        assert system.send_message(Message(MessageType.SMS, '+7900', 'Код 7'))
+
+        assert system.get_circuit_states()['sms']['state'] == 'closed'
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+from benchmarks.fake_smtp import FakeSMTPServer
+from src.core.base_sender import BaseMessageSender
+from src.core.exceptions import ConfigurationError
+from src.core.message import DeliveryResult, Message, MessageType
+from src.core.tracing import (
+    NOOP_SPAN, STATUS_ERROR, FileSpanExporter, InMemorySpanExporter, RecordingTracer,
+    Tracer, set_tracer, span, tracer_from_config
+)
+from src.providers.email_sender import EmailSender
+
+class FlakySender(BaseMessageSender):
+    message_type = MessageType.SMS
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def send(self, message):
+        return self._execute_with_retry(self._send, message)
+
+    def _send(self, message):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("reset")
+        return DeliveryResult(success=True)
+
+    def validate_credentials(self):
+        return True
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    previous = set_tracer(RecordingTracer(exporter))
+    yield exporter
+    set_tracer(previous)
+
+def by_name(exporter):
+    return {recorded.name: recorded for recorded in exporter.spans}
+
+class TestTracer:
+    def test_noop_by_default(self):
+        assert span('sender.send') is NOOP_SPAN
+        with span('sender.send') as current:
+            current.set_attribute('attempts', 1)
+
+    def test_nested_spans(self, exporter):
+        with span('outer', {'provider': 'sms'}) as outer:
+            with span('inner'):
+                pass
+        with span('other'):
+            pass
+
+        spans = by_name(exporter)
+        assert spans['inner'].parent_id == outer.span_id
+        assert spans['inner'].trace_id == outer.trace_id
+        assert spans['other'].parent_id is None
+        assert spans['other'].trace_id != outer.trace_id
+        assert spans['outer'].attributes == {'provider': 'sms'}
+
+    def test_exception_marks_error(self, exporter):
+        with pytest.raises(ValueError):
+            with span('stage'):
+                raise ValueError("boom")
+
+        assert exporter.spans[0].status == STATUS_ERROR
+        assert 'boom' in exporter.spans[0].status_message
+
+    def test_config(self, tmp_path):
+        assert type(tracer_from_config({})) is Tracer
+        with pytest.raises(ConfigurationError):
+            tracer_from_config({'exporter': 'jaeger'})
+
+class TestSenderStages:
+    def test_retry_stages(self, exporter, mocker):
+        mocker.patch('time.sleep')
+        sender = FlakySender(max_retries=2, retry_delay=0.5)
+
+        sender.send(Message(MessageType.SMS, '+79990000000', 'Код'))
+
+        names = [recorded.name for recorded in exporter.spans]
+        assert names == ['sender.attempt', 'sender.retry_sleep', 'sender.attempt', 'sender.send']
+        root = exporter.spans[-1]
+        assert root.attributes['attempts'] == 2
+        assert exporter.spans[0].status == STATUS_ERROR
+        assert all(recorded.parent_id == root.span_id for recorded in exporter.spans[:-1])
+
+    def test_email_stages(self, exporter):
+        with FakeSMTPServer() as server:
+            sender = EmailSender(
+                smtp_server='127.0.0.1', port=server.port, username='from@example.com',
+                password='secret', use_tls=False, use_ssl=False, max_retries=1
+            )
+            sender.send(Message(MessageType.EMAIL, 'user@example.com', 'Текст', subject='Тема'))
+            sender.close()
+
+        spans = by_name(exporter)
+        assert {'sender.send', 'sender.attempt', 'email.build_mime', 'smtp.sendmail',
+                'smtp.connect', 'smtp.login'} <= set(spans)
+        assert spans['smtp.connect'].parent_id == spans['smtp.sendmail'].span_id
+        assert spans['smtp.sendmail'].parent_id == spans['sender.attempt'].span_id
+
+class TestFileSpanExporter:
+    def test_otlp_json_lines(self, tmp_path):
+        path = tmp_path / 'spans.jsonl'
+        tracer = RecordingTracer(FileSpanExporter(str(path), batch_size=2))
+        for name in ('a', 'b', 'c'):
+            with tracer.span(name, {'attempt': 1, 'provider': 'sms'}):
+                pass
+        tracer.close()
+
+        lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        assert len(lines) == 2
+        spans = [s for line in lines for s in line['resourceSpans'][0]['scopeSpans'][0]['spans']]
+        assert [s['name'] for s in spans] == ['a', 'b', 'c']
+        assert {'key': 'attempt', 'value': {'intValue': '1'}} in spans[0]['attributes']
+        assert int(spans[0]['endTimeUnixNano']) >= int(spans[0]['startTimeUnixNano'])
+        assert len(spans[0]['traceId']) == 32 and len(spans[0]['spanId']) == 16